@@ -0,0 +1,86 @@
+"""Benchmark rate snapshot encodings: JSON dict-of-floats vs binary codec.
+
+Run from the repository root:
+
+    python benchmarks/bench_codec.py
+"""
+
+import json
+import sys
+import timeit
+from bisect import bisect_right
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from codec import decode_rates, encode_rates  # noqa: E402
+
+RATES = {"MLC": 118.25, "USD": 120.0, "EUR": 130.5}
+FETCHED_AT = 1760918400
+DAY = 86400
+
+
+def deep_size(rates):
+    """Approximate in-memory size of a rates dict, keys and values included."""
+    return sys.getsizeof(rates) + sum(
+        sys.getsizeof(code) + sys.getsizeof(value) for code, value in rates.items()
+    )
+
+
+def bench(func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=5))
+    return seconds / number * 1e6
+
+
+def compare(label, records, number):
+    as_json = {"records": [[timestamp, rates] for timestamp, rates in records]}
+    json_data = json.dumps(as_json)
+    binary_data = encode_rates(records)
+
+    json_encode = bench(lambda: json.dumps(as_json), number)
+    json_decode = bench(lambda: json.loads(json_data), number)
+    binary_encode = bench(lambda: encode_rates(records), number)
+    binary_decode = bench(lambda: decode_rates(binary_data), number)
+    binary_read = bench(lambda: list(decode_rates(binary_data)), number)
+    target = records[len(records) // 2][0]
+
+    def json_lookup():
+        stored = json.loads(json_data)["records"]
+        index = bisect_right([timestamp for timestamp, _ in stored], target) - 1
+        return stored[index][1]
+
+    def binary_lookup():
+        decoded = decode_rates(binary_data)
+        return decoded.rates(decoded.find(target))
+
+    json_find = bench(json_lookup, number)
+    binary_find = bench(binary_lookup, number)
+    memory = sum(deep_size(rates) + sys.getsizeof(ts) for ts, rates in records)
+
+    print(f"{label} ({len(records)} records)")
+    print(f"  JSON size:                    {len(json_data):8d} bytes")
+    print(f"  Binary size:                  {len(binary_data):8d} bytes")
+    print(f"  Dict-of-floats in memory:     {memory:8d} bytes")
+    print(f"  JSON encode:                  {json_encode:8.2f} us")
+    print(f"  Binary encode:                {binary_encode:8.2f} us")
+    print(f"  JSON decode:                  {json_decode:8.2f} us")
+    print(f"  Binary decode (views):        {binary_decode:8.2f} us")
+    print(f"  Binary decode + read all:     {binary_read:8.2f} us")
+    print(f"  JSON decode + find one:       {json_find:8.2f} us")
+    print(f"  Binary decode + find one:     {binary_find:8.2f} us")
+
+
+def main():
+    compare("Snapshot", [(FETCHED_AT, RATES)], number=20000)
+    history = [
+        (
+            FETCHED_AT - day * DAY,
+            {code: rate + day / 10 for code, rate in RATES.items()},
+        )
+        for day in range(365)
+    ]
+    compare("History", history, number=200)
+
+
+if __name__ == "__main__":
+    main()
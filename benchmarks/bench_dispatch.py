@@ -0,0 +1,87 @@
+"""Benchmark per-request dispatch overhead: linear chain vs routing table.
+
+Run from the repository root:
+
+    python benchmarks/bench_dispatch.py
+"""
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from ask_sdk_core.attributes_manager import AttributesManager  # noqa: E402
+from ask_sdk_core.handler_input import HandlerInput  # noqa: E402
+from ask_sdk_core.serialize import DefaultSerializer  # noqa: E402
+from ask_sdk_model import RequestEnvelope  # noqa: E402
+from ask_sdk_runtime.dispatch_components.request_components import (  # noqa: E402
+    GenericRequestMapper,
+)
+from lambda_function import sb  # noqa: E402
+from routing import RoutingRequestMapper  # noqa: E402
+
+REQUESTS = [
+    ("LaunchRequest", None),
+    ("IntentRequest", "ExchangeRateIntent"),
+    ("IntentRequest", "ExchangeRateRequestIntent"),
+    ("IntentRequest", "ConvertCurrencyIntent"),
+    ("IntentRequest", "AMAZON.StopIntent"),
+    ("IntentRequest", "AMAZON.FallbackIntent"),
+    ("SessionEndedRequest", None),
+    ("IntentRequest", "UnknownIntent"),
+]
+
+
+def make_handler_input(request_type, intent_name):
+    request = {
+        "type": request_type,
+        "requestId": "amzn1.echo-api.request.bench",
+        "timestamp": "2026-01-01T00:00:00Z",
+        "locale": "es-US",
+    }
+    if intent_name:
+        request["intent"] = {"name": intent_name, "slots": {}}
+    event = {
+        "version": "1.0",
+        "context": {"System": {"user": {"userId": "amzn1.ask.account.bench"}}},
+        "request": request,
+    }
+    envelope = DefaultSerializer().deserialize(json.dumps(event), RequestEnvelope)
+    return HandlerInput(
+        request_envelope=envelope,
+        attributes_manager=AttributesManager(envelope),
+    )
+
+
+def bench(mapper, handler_inputs, number):
+    def run():
+        for handler_input in handler_inputs:
+            mapper.get_request_handler_chain(handler_input)
+
+    seconds = min(timeit.repeat(run, number=number, repeat=5))
+    return seconds / (number * len(handler_inputs)) * 1e6
+
+
+def main():
+    chains = sb.runtime_configuration_builder.request_handler_chains
+    handler_inputs = [make_handler_input(*request) for request in REQUESTS]
+    number = 2000
+
+    linear = bench(GenericRequestMapper(chains), handler_inputs, number)
+    routed = bench(RoutingRequestMapper(chains), handler_inputs, number)
+    build = min(timeit.repeat(lambda: sb.skill_configuration, number=200, repeat=5))
+
+    print(f"Handlers registered:            {len(chains)}")
+    print(f"Linear can_handle chain:        {linear:8.2f} us/request")
+    print(f"Routing table lookup:           {routed:8.2f} us/request")
+    print(f"Speedup:                        {linear / routed:8.1f}x")
+    print(
+        "Skill configuration rebuild:    "
+        f"{build / 200 * 1e6:8.2f} us/request (avoided by building once)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark full SDK envelope (de)serialisation vs the fast path.
+
+Run from the repository root:
+
+    python benchmarks/bench_fast_path.py
+"""
+
+import json
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from fast_path import FastPath  # noqa: E402
+from lambda_function import sb  # noqa: E402
+
+ENVELOPES_DIR = Path(__file__).parent.parent / "tests" / "envelopes"
+ENVELOPES = ["exchange_rate.json", "request_usd.json", "convert_euros.json"]
+FAST_PATH_INTENTS = (
+    "ExchangeRateIntent",
+    "ExchangeRateRequestIntent",
+    "ConvertCurrencyIntent",
+)
+
+
+def bench(invoke, events, number):
+    def run():
+        for event in events:
+            invoke(event, None)
+
+    seconds = min(timeit.repeat(run, number=number, repeat=5))
+    return seconds / (number * len(events)) * 1e6
+
+
+def main():
+    events = [json.loads((ENVELOPES_DIR / name).read_text()) for name in ENVELOPES]
+    full_pipeline = sb.lambda_handler()
+    fast_path = FastPath(sb.create(), FAST_PATH_INTENTS)
+    rates = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+
+    with tempfile.TemporaryDirectory() as directory:
+        with patch.object(sb.persistence_adapter, "directory", Path(directory)):
+            with patch("lambda_function.get_rounded_exchange_rates", lambda: rates):
+                full = bench(full_pipeline, events, 500)
+                fast = bench(fast_path.invoke, events, 500)
+
+    print(f"Full SDK pipeline:              {full:8.2f} us/request")
+    print(f"Fast path:                      {fast:8.2f} us/request")
+    print(f"Speedup:                        {full / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Load-test the skill's HTTP endpoint with the recorded envelopes.
+
+Start the server with signature checks off, then run the load test:
+
+    VERIFY_SIGNATURE=false VERIFY_TIMESTAMP=false gunicorn -c gunicorn.conf.py
+    python benchmarks/load_test.py --url http://127.0.0.1:8080/ --requests 2000
+"""
+
+import argparse
+import json
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ENVELOPES_DIR = Path(__file__).parent.parent / "tests" / "envelopes"
+
+
+def load_bodies():
+    return [path.read_bytes() for path in sorted(ENVELOPES_DIR.glob("*.json"))]
+
+
+def send(url, body):
+    request = urllib.request.Request(
+        url, data=body, headers={"Content-Type": "application/json"}
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=10) as response:
+        json.loads(response.read())
+    return time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8080/")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    bodies = load_bodies()
+    errors = 0
+    latencies = []
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [
+            executor.submit(send, args.url, bodies[i % len(bodies)])
+            for i in range(args.requests)
+        ]
+        for future in futures:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"Requests:    {args.requests} ({errors} errors)")
+    print(f"Concurrency: {args.concurrency}")
+    print(f"Throughput:  {len(latencies) / elapsed:8.1f} req/s")
+    if latencies:
+        print(f"Mean:        {statistics.mean(latencies) * 1000:8.2f} ms")
+        print(f"p50:         {percentile(latencies, 0.50) * 1000:8.2f} ms")
+        print(f"p99:         {percentile(latencies, 0.99) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Load-test the fleet-wide upstream throttle against a local store.
+
+Each process stands in for one container: it has its own rate cache and
+threads serving requests, and all of them share a throttle over one local
+directory, as containers share the S3 bucket. The upstream proxy is replaced
+by a stub that counts calls. Run from the repository root:
+
+    python benchmarks/throttle_load.py --containers 8 --duration 10 --rate 1
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from persistence import FileSystemObjectStore  # noqa: E402
+from rate_cache import RateCache  # noqa: E402
+from throttle import UpstreamThrottle  # noqa: E402
+
+RATES = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+UPSTREAM_LATENCY_SECONDS = 0.05
+
+
+def run_container(args, directory, deadline, upstream_calls, results):
+    throttle = UpstreamThrottle(
+        FileSystemObjectStore(directory), rate=args.rate, burst=args.burst
+    )
+    cache = RateCache(ttl=args.ttl, throttle=throttle)
+    cache.add_listener(throttle.publish)
+
+    def fetch():
+        upstream_calls.put(time.time())
+        time.sleep(UPSTREAM_LATENCY_SECONDS)
+        return RATES
+
+    served = [0, 0]
+
+    def serve():
+        while time.time() < deadline:
+            rates = cache.get_or_fetch(fetch)
+            served[rates is None] += 1
+
+    threads = [threading.Thread(target=serve) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put(tuple(served))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--containers", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--rate", type=float, default=1.0, help="tokens/s")
+    parser.add_argument("--burst", type=float, default=5)
+    parser.add_argument("--ttl", type=float, default=0.5, help="cache TTL (s)")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("fork")
+    upstream_calls, results = context.Queue(), context.Queue()
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.time()
+        deadline = start + args.duration
+        processes = [
+            context.Process(
+                target=run_container,
+                args=(args, directory, deadline, upstream_calls, results),
+            )
+            for _ in range(args.containers)
+        ]
+        for process in processes:
+            process.start()
+        outcomes = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.time() - start
+
+    calls = []
+    while not upstream_calls.empty():
+        calls.append(upstream_calls.get())
+    served = sum(ok for ok, _ in outcomes)
+    failed = sum(missing for _, missing in outcomes)
+    allowed = args.burst + args.rate * elapsed
+    # Without the throttle every container refetches once per TTL
+    unthrottled = args.containers * elapsed / args.ttl
+
+    print(f"Containers:     {args.containers} x {args.threads} threads")
+    print(f"Requests:       {served + failed} ({failed} without rates)")
+    print(f"Throughput:     {(served + failed) / elapsed:10.1f} req/s")
+    print(f"Upstream calls: {len(calls)} (bucket allows {allowed:.0f})")
+    print(f"Upstream rate:  {len(calls) / elapsed:10.2f} req/s (limit {args.rate})")
+    print(f"Unthrottled:    ~{unthrottled:.0f} calls")
+    if len(calls) > allowed:
+        sys.exit("Upstream calls exceeded the bucket")
+
+
+if __name__ == "__main__":
+    main()
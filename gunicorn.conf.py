@@ -0,0 +1,28 @@
+"""Gunicorn settings for serving the skill as an Alexa HTTPS endpoint.
+
+Usage: gunicorn -c gunicorn.conf.py
+
+Every worker process imports the skill on its own (no preload), so each
+worker builds its own skill and keeps its own in-process rate cache, shared
+by that worker's threads.
+"""
+
+import multiprocessing
+import os
+
+pythonpath = "lambda"
+wsgi_app = "webservice:application"
+
+bind = os.environ.get("BIND", "0.0.0.0:8080")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+preload_app = False
+timeout = 10
+keepalive = 75
+
+# Alexa only calls HTTPS endpoints; terminate TLS here or in a reverse proxy
+certfile = os.environ.get("SSL_CERTFILE")
+keyfile = os.environ.get("SSL_KEYFILE")
+
+accesslog = "-"
@@ -0,0 +1,461 @@
+import json
+import logging
+import os
+import time
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta, timezone
+
+import requests
+from botocore.exceptions import BotoCoreError, ClientError
+from codec import RATE_CODES
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "alerts/"
+ABOVE = "above"
+BELOW = "below"
+DIRECTIONS = (ABOVE, BELOW)
+
+# Live endpoint; skills still in development send to ``.../stages/development``
+PROACTIVE_EVENTS_URL = "https://api.amazonalexa.com/v1/proactiveEvents/"
+LWA_TOKEN_URL = "https://api.amazon.com/auth/o2/token"
+PROACTIVE_EVENTS_SCOPE = "alexa::proactive_events"
+EVENT_NAME = "AMAZON.MessageAlert.Activated"
+
+DEFAULT_BATCH_SIZE = 10
+DEFAULT_RATE_LIMIT = 10.0
+DEFAULT_MAX_PER_PASS = 50
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_TIMEOUT_SECONDS = 3
+EVENT_EXPIRY = timedelta(hours=12)
+# Tokens are renewed this long before they expire
+TOKEN_MARGIN_SECONDS = 60
+
+STORE_ERRORS = (ClientError, BotoCoreError, OSError, KeyError, ValueError)
+
+
+def get_key(currency):
+    """Return the key of a currency's subscription index."""
+    return f"{KEY_PREFIX}{currency}.json"
+
+
+class AlertIndex:
+    """Rate alert subscriptions, one sorted index per currency.
+
+    Each currency's document holds two lists of ``[threshold, user id]``
+    pairs sorted by threshold: alerts for the rate rising to or above the
+    threshold, and alerts for it falling to or below it. Finding who to
+    notify for a rate is a range query on each list: a prefix of the
+    rising alerts and a suffix of the falling ones. A user has at most one
+    alert per currency.
+
+    Documents are updated with conditional writes, so containers racing on
+    the same currency never lose each other's changes.
+
+    Args:
+        store: Object store with ``read_versioned`` and ``write_if_version``
+        max_attempts: Conditional writes tried before giving up
+    """
+
+    def __init__(self, store, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.store = store
+        self.max_attempts = max_attempts
+
+    def read(self, currency):
+        """Return a currency's index and its version.
+
+        Returns:
+            tuple: ({direction: [[threshold, user id], ...]}, version)
+        """
+        data, version = self.store.read_versioned(get_key(currency))
+        index = json.loads(data) if data else {}
+        index = {direction: index.get(direction, []) for direction in DIRECTIONS}
+        return index, version
+
+    def subscribe(self, user_id, currency, threshold, direction):
+        """Add or replace a user's alert for a currency.
+
+        Returns:
+            bool: True if the alert was stored
+        """
+
+        def change(index):
+            self._remove_user(index, user_id)
+            insort(index[direction], [threshold, user_id])
+            return True
+
+        return self._update(currency, change) is not None
+
+    def unsubscribe(self, user_id, currency):
+        """Remove a user's alert for a currency.
+
+        Returns:
+            bool: True if the user had an alert
+        """
+        return bool(
+            self._update(currency, lambda index: self._remove_user(index, user_id))
+        )
+
+    def pop_crossed(self, currency, rate, limit=None):
+        """Remove and return the alerts a rate has reached.
+
+        Args:
+            currency: Currency code
+            rate: Current rate of the currency
+            limit: Most alerts removed; the rest wait for the next pass
+
+        Returns:
+            list: ``(user id, threshold, direction)`` tuples, empty if none
+            were reached or the index could not be updated
+        """
+
+        def change(index):
+            above, below = index[ABOVE], index[BELOW]
+            rising = bisect_right([threshold for threshold, _ in above], rate)
+            falling = bisect_left([threshold for threshold, _ in below], rate)
+            crossed = [(entry, ABOVE) for entry in above[:rising]]
+            crossed += [(entry, BELOW) for entry in below[falling:]]
+            crossed = crossed[:limit]
+            for entry, direction in crossed:
+                index[direction].remove(entry)
+            return [
+                (user_id, threshold, direction)
+                for (threshold, user_id), direction in crossed
+            ]
+
+        return self._update(currency, change) or []
+
+    def restore(self, currency, alerts):
+        """Put back popped alerts whose notification could not be sent.
+
+        Users who set a new alert for the currency in the meantime keep the
+        new one.
+
+        Args:
+            currency: Currency code
+            alerts: ``(user id, threshold, direction)`` tuples
+
+        Returns:
+            bool: True if the alerts were put back
+        """
+
+        def change(index):
+            users = {user_id for d in DIRECTIONS for _, user_id in index[d]}
+            restored = False
+            for user_id, threshold, direction in alerts:
+                if user_id not in users:
+                    insort(index[direction], [threshold, user_id])
+                    users.add(user_id)
+                    restored = True
+            return restored
+
+        return self._update(currency, change) is not None
+
+    @staticmethod
+    def _remove_user(index, user_id):
+        removed = False
+        for direction in DIRECTIONS:
+            kept = [entry for entry in index[direction] if entry[1] != user_id]
+            removed = removed or len(kept) < len(index[direction])
+            index[direction] = kept
+        return removed
+
+    def _update(self, currency, change):
+        """Apply ``change`` to a currency's index with a conditional write.
+
+        ``change`` edits the index in place and returns a result; a falsy
+        result leaves the document unwritten. Lost races are retried with a
+        fresh copy.
+
+        Returns:
+            The result of ``change``, or None if the update failed
+        """
+        key = get_key(currency)
+        try:
+            for _ in range(self.max_attempts):
+                index, version = self.read(currency)
+                result = change(index)
+                if not result:
+                    return result
+                data = json.dumps(index, separators=(",", ":")).encode("utf-8")
+                if self.store.write_if_version(key, data, version):
+                    return result
+        except STORE_ERRORS as e:
+            logger.error(f"Rate alert index for {currency} unavailable: {e}")
+            return None
+        logger.warning(f"Gave up updating the rate alerts for {currency}")
+        return None
+
+
+class ProactiveEventsClient:
+    """Send notifications to the Alexa Proactive Events API.
+
+    Events go out in batches of ``batch_size`` over one pooled session, and
+    batches are spaced to stay under ``rate`` events per second. Without
+    client credentials no token is requested, so a local stand-in of the
+    API can replace it through ``url``.
+
+    Args:
+        url: Proactive events endpoint
+        client_id: Skill client id, for Login with Amazon tokens
+        client_secret: Skill client secret
+        batch_size: Events sent back to back before pacing
+        rate: Sustained events per second
+        session: ``requests.Session``, injectable for tests
+        clock: Monotonic clock, injectable for tests
+        sleep: Sleep function, injectable for tests
+    """
+
+    def __init__(
+        self,
+        url=PROACTIVE_EVENTS_URL,
+        client_id=None,
+        client_secret=None,
+        batch_size=DEFAULT_BATCH_SIZE,
+        rate=DEFAULT_RATE_LIMIT,
+        session=None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.url = url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.batch_size = batch_size
+        self.rate = rate
+        self.session = session or requests.Session()
+        self.clock = clock
+        self.sleep = sleep
+        self._token = None
+        self._token_expires = 0
+
+    def get_token(self):
+        """Return a cached Login with Amazon token, or None without credentials.
+
+        Raises:
+            requests.RequestException: If the token request fails
+        """
+        if not self.client_id:
+            return None
+        if self._token is None or self.clock() >= self._token_expires:
+            response = self.session.post(
+                LWA_TOKEN_URL,
+                data={
+                    "grant_type": "client_credentials",
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret,
+                    "scope": PROACTIVE_EVENTS_SCOPE,
+                },
+                timeout=DEFAULT_TIMEOUT_SECONDS,
+            )
+            response.raise_for_status()
+            body = response.json()
+            self._token = body["access_token"]
+            self._token_expires = (
+                self.clock() + body["expires_in"] - TOKEN_MARGIN_SECONDS
+            )
+        return self._token
+
+    def send(self, events):
+        """Send events in paced batches.
+
+        Args:
+            events: Proactive event bodies
+
+        Returns:
+            list: Events that were not accepted, empty if all were
+        """
+        try:
+            token = self.get_token()
+        except (requests.RequestException, KeyError, ValueError) as e:
+            logger.error(f"Could not get a proactive events token: {e}")
+            return list(events)
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+        failed = []
+        batch_started = None
+        for start in range(0, len(events), self.batch_size):
+            if batch_started is not None:
+                wait = self.batch_size / self.rate - (self.clock() - batch_started)
+                if wait > 0:
+                    self.sleep(wait)
+            batch_started = self.clock()
+            for event in events[start : start + self.batch_size]:
+                try:
+                    response = self.session.post(
+                        self.url,
+                        json=event,
+                        headers=headers,
+                        timeout=DEFAULT_TIMEOUT_SECONDS,
+                    )
+                    response.raise_for_status()
+                except requests.RequestException as e:
+                    logger.error(f"Proactive event {event['referenceId']} failed: {e}")
+                    failed.append(event)
+        return failed
+
+
+def build_event(user_id, message, now):
+    """Return a proactive message alert for one user.
+
+    Args:
+        user_id: Alexa user id of the recipient
+        message: What the alert is about, read as the message's sender
+        now: Aware datetime of the notification
+    """
+    return {
+        "timestamp": f"{now:%Y-%m-%dT%H:%M:%S}.00Z",
+        "referenceId": str(uuid.uuid4()),
+        "expiryTime": f"{now + EVENT_EXPIRY:%Y-%m-%dT%H:%M:%S}.00Z",
+        "event": {
+            "name": EVENT_NAME,
+            "payload": {
+                "state": {"status": "UNREAD", "freshness": "NEW"},
+                "messageGroup": {
+                    "creator": {"name": message},
+                    "count": 1,
+                    "urgency": "URGENT",
+                },
+            },
+        },
+        "relevantAudience": {"type": "Unicast", "payload": {"user": user_id}},
+    }
+
+
+class RateAlerts:
+    """Rate alerts: subscriptions plus an evaluation pass per rate refresh.
+
+    ``evaluate`` is meant as a background ``RateCache`` listener, since
+    popping the index and sending the notifications are network round trips.
+    Alerts whose notification is rejected are put back and retried on the
+    next refresh. Each alert fires once:
+    it is removed from the index before its notification is sent, so
+    containers evaluating the same rates never notify a user twice.
+
+    Args:
+        index: ``AlertIndex`` of the subscriptions
+        client: ``ProactiveEventsClient`` sending the notifications
+        describe: Callable ``(currency, threshold, direction, rate)``
+            returning the notification text
+        max_per_pass: Most notifications sent per evaluation; the rest are
+            sent on the next refresh
+        clock: Wall clock for the event timestamps, injectable for tests
+    """
+
+    def __init__(
+        self,
+        index,
+        client,
+        describe,
+        max_per_pass=DEFAULT_MAX_PER_PASS,
+        clock=time.time,
+    ):
+        self.index = index
+        self.client = client
+        self.describe = describe
+        self.max_per_pass = max_per_pass
+        self.clock = clock
+
+    def subscribe(self, user_id, currency, threshold, rate):
+        """Alert the user when the currency's rate reaches the threshold.
+
+        The direction is taken from the current rate: a threshold above it
+        waits for the rate to rise, one below it for the rate to fall.
+
+        Returns:
+            str: ``ABOVE`` or ``BELOW``, or None if it could not be stored
+        """
+        direction = ABOVE if threshold > rate else BELOW
+        if not self.index.subscribe(user_id, currency, threshold, direction):
+            return None
+        return direction
+
+    def collect(self, rates):
+        """Pop the alerts the rates have reached and build their events.
+
+        Returns:
+            list: ``((currency, user id, threshold, direction), event)``
+            pairs, at most ``max_per_pass``
+        """
+        now = datetime.fromtimestamp(self.clock(), timezone.utc)
+        pending = []
+        for currency in RATE_CODES:
+            remaining = self.max_per_pass - len(pending)
+            if currency not in rates or remaining <= 0:
+                continue
+            rate = rates[currency]
+            for user_id, threshold, direction in self.index.pop_crossed(
+                currency, rate, limit=remaining
+            ):
+                message = self.describe(currency, threshold, direction, rate)
+                alert = (currency, user_id, threshold, direction)
+                pending.append((alert, build_event(user_id, message, now)))
+        return pending
+
+    def evaluate(self, rates):
+        """Notify the users whose alerts the rates have reached.
+
+        Returns:
+            int: Number of notifications sent
+        """
+        pending = self.collect(rates)
+        if not pending:
+            return 0
+        failed = self.client.send([event for _, event in pending])
+        failed_ids = {event["referenceId"] for event in failed}
+
+        unsent = {}
+        for (currency, *alert), event in pending:
+            if event["referenceId"] in failed_ids:
+                unsent.setdefault(currency, []).append(tuple(alert))
+        for currency, alerts in unsent.items():
+            self.index.restore(currency, alerts)
+
+        sent = len(pending) - len(failed)
+        logger.info(f"Sent {sent} of {len(pending)} rate alerts")
+        return sent
+
+
+def get_rate_alerts(store, describe):
+    """Create the rate alerts configured by the environment.
+
+    Notifications need ``ALEXA_CLIENT_ID`` and ``ALEXA_CLIENT_SECRET``, the
+    skill's credentials for the Proactive Events API, or a
+    ``PROACTIVE_EVENTS_URL`` pointing at a stand-in. Notifications go to the
+    live endpoint unless ``PROACTIVE_EVENTS_URL`` overrides it, e.g. with
+    ``https://api.amazonalexa.com/v1/proactiveEvents/stages/development``
+    while the skill is in development. ``ALERTS_BATCH_SIZE``,
+    ``ALERTS_RATE_LIMIT`` (events per second) and ``ALERTS_MAX_PER_PASS``
+    tune the fan-out.
+
+    Args:
+        store: Object store shared by the fleet, e.g. the persistence adapter
+        describe: Notification text callable, see ``RateAlerts``
+
+    Returns:
+        RateAlerts: Alerts, or None when notifications cannot be sent
+    """
+    client_id = os.environ.get("ALEXA_CLIENT_ID")
+    url = os.environ.get("PROACTIVE_EVENTS_URL")
+    if not client_id and not url:
+        return None
+
+    try:
+        batch_size = int(os.environ.get("ALERTS_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+        rate = float(os.environ.get("ALERTS_RATE_LIMIT", DEFAULT_RATE_LIMIT))
+        max_per_pass = int(os.environ.get("ALERTS_MAX_PER_PASS", DEFAULT_MAX_PER_PASS))
+    except ValueError:
+        logger.warning("Ignoring invalid rate alert settings")
+        batch_size, rate = DEFAULT_BATCH_SIZE, DEFAULT_RATE_LIMIT
+        max_per_pass = DEFAULT_MAX_PER_PASS
+
+    client = ProactiveEventsClient(
+        url=url or PROACTIVE_EVENTS_URL,
+        client_id=client_id,
+        client_secret=os.environ.get("ALEXA_CLIENT_SECRET"),
+        batch_size=max(batch_size, 1),
+        rate=rate if rate > 0 else DEFAULT_RATE_LIMIT,
+    )
+    return RateAlerts(
+        AlertIndex(store), client, describe, max_per_pass=max(max_per_pass, 1)
+    )
@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+from botocore.exceptions import ClientError
+from codec import RATE_CODES
+from history import get_today
+from persistence import FileSystemObjectStore
+from snapshot import format_spanish_date
+from utils import get_env_flag, get_random_greeting
+
+logger = logging.getLogger(__name__)
+
+FEED_JSON_KEY = "briefing/feed.json"
+FEED_RSS_KEY = "briefing/feed.rss"
+FEED_TITLE = "Tasa de Cambio Cubana"
+SOURCE_URL = "https://eltoque.com/tasas-de-cambio-de-moneda-en-cuba-hoy"
+
+
+def render_text(rates, day, greeting):
+    """Return the spoken text of a briefing item."""
+    return (
+        f"{greeting}. Hoy {format_spanish_date(day)} el U. S. D. está en "
+        f"{rates['USD']} pesos, el Euro en {rates['EUR']} "
+        f"y el M. L. C. en {rates['MLC']}."
+    )
+
+
+def get_uid(rates, day):
+    """Return the item id of rounded rates on a day.
+
+    Flash Briefing tells new items by their id, so the same rates on the
+    same day always get the same one, whichever container publishes them.
+    """
+    quotes = "-".join(f"{code.lower()}{rates[code]:g}" for code in RATE_CODES)
+    return f"tasa-cambio-{day:%Y%m%d}-{quotes}"
+
+
+def render_json(item):
+    """Return a Flash Briefing JSON feed with a single item."""
+    return json.dumps(item, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def render_rss(item, published):
+    """Return an RSS 2.0 feed with a single item.
+
+    Args:
+        item: Flash Briefing item dict
+        published: Aware datetime of the update
+    """
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0">\n'
+        "  <channel>\n"
+        f"    <title>{escape(FEED_TITLE)}</title>\n"
+        f"    <link>{escape(SOURCE_URL)}</link>\n"
+        f"    <description>{escape(FEED_TITLE)}</description>\n"
+        "    <item>\n"
+        f'      <guid isPermaLink="false">{escape(item["uid"])}</guid>\n'
+        f"      <title>{escape(item['titleText'])}</title>\n"
+        f"      <description>{escape(item['mainText'])}</description>\n"
+        f"      <pubDate>{format_datetime(published)}</pubDate>\n"
+        f"      <link>{escape(item['redirectionUrl'])}</link>\n"
+        "    </item>\n"
+        "  </channel>\n"
+        "</rss>\n"
+    ).encode("utf-8")
+
+
+class BriefingFeed:
+    """Flash Briefing feed rendered once per rate change.
+
+    Meant as a background ``RateCache`` listener: each accepted snapshot
+    whose rounded rates differ from the published ones is rendered as a
+    one-item JSON feed (``briefing/feed.json``) and RSS feed
+    (``briefing/feed.rss``) in the store. Listeners are then served the
+    static documents, with no skill invocation or rate fetch per listener.
+    The stored feed is checked first, so containers fetching the same rates
+    do not publish them again. On Lambda, ``lambda_handler`` waits for the
+    background listeners before returning, so the feed is not left frozen
+    with the container.
+
+    Args:
+        store: Object store with ``read_bytes`` and ``write_bytes``
+        clock: Wall clock for the update time, injectable for tests
+        today: Returns the current date in Cuba, injectable for tests
+    """
+
+    def __init__(self, store, clock=time.time, today=get_today):
+        self.store = store
+        self.clock = clock
+        self.today = today
+        self._published = None
+
+    def build_item(self, rates, day):
+        """Return the Flash Briefing item for rounded rates on a day."""
+        updated = datetime.fromtimestamp(int(self.clock()), timezone.utc)
+        return {
+            "uid": get_uid(rates, day),
+            "updateDate": f"{updated:%Y-%m-%dT%H:%M:%S}.0Z",
+            "titleText": f"{FEED_TITLE}: el U. S. D. a {rates['USD']} pesos",
+            "mainText": render_text(rates, day, get_random_greeting()),
+            "redirectionUrl": SOURCE_URL,
+        }
+
+    def read_uid(self):
+        """Return the id of the item in the stored feed, or None."""
+        data = self.store.read_bytes(FEED_JSON_KEY)
+        return json.loads(data).get("uid") if data else None
+
+    def publish(self, rates):
+        """Render and store the feeds if the rounded rates or the day changed.
+
+        Args:
+            rates: Freshly fetched exchange rates dict
+
+        Returns:
+            bool: True if the feeds were written
+        """
+        rounded = {code: round(rates[code], 2) for code in RATE_CODES}
+        day = self.today()
+        uid = get_uid(rounded, day)
+        if uid == self._published:
+            return False
+
+        try:
+            if self.read_uid() == uid:
+                # Another container published these rates already
+                self._published = uid
+                return False
+
+            item = self.build_item(rounded, day)
+            published = datetime.fromtimestamp(int(self.clock()), timezone.utc)
+            self.store.write_bytes(
+                FEED_JSON_KEY, render_json(item), "application/json; charset=utf-8"
+            )
+            self.store.write_bytes(
+                FEED_RSS_KEY,
+                render_rss(item, published),
+                "application/rss+xml; charset=utf-8",
+            )
+        except (ClientError, OSError, ValueError) as e:
+            logger.error(f"Could not publish the briefing feed: {e}")
+            return False
+
+        self._published = uid
+        logger.info(f"Published briefing feed for {rounded}")
+        return True
+
+
+def get_briefing_feed(store):
+    """Create the briefing feed configured by the environment.
+
+    The feed is on unless ``BRIEFING_ENABLED`` is off. It is written to
+    ``BRIEFING_DIR`` when set, else to ``store``.
+
+    Args:
+        store: Default object store, e.g. the persistence adapter
+
+    Returns:
+        BriefingFeed: Feed, or None when it is off
+    """
+    if not get_env_flag("BRIEFING_ENABLED"):
+        return None
+
+    briefing_dir = os.environ.get("BRIEFING_DIR")
+    if briefing_dir:
+        store = FileSystemObjectStore(briefing_dir)
+    return BriefingFeed(store)
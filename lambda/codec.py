@@ -0,0 +1,221 @@
+import json
+import math
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+
+MAGIC = b"TCR"
+FORMAT_VERSION = 1
+CODE_WIDTH = 3
+RATE_CODES = ("USD", "EUR", "MLC")
+
+# magic, format version, number of currency codes, number of records
+HEADER = struct.Struct("<3sBBI")
+TIMESTAMP_TYPECODE = "q"
+RATE_TYPECODE = "d"
+ALIGNMENT = 8
+
+
+def _columns_offset(code_count):
+    end = HEADER.size + CODE_WIDTH * code_count
+    return -(-end // ALIGNMENT) * ALIGNMENT
+
+
+def _column(view, offset, length, typecode):
+    """Return a typed view of a little-endian column of the buffer."""
+    column = view[offset : offset + length * struct.calcsize(typecode)]
+    if sys.byteorder == "little":
+        return column.cast(typecode)
+    # Big-endian hosts have to copy the column to swap its bytes
+    values = array(typecode)
+    values.frombytes(column)
+    values.byteswap()
+    return memoryview(values)
+
+
+def _to_json(codes, records):
+    return json.dumps(
+        {
+            "version": FORMAT_VERSION,
+            "codes": list(codes),
+            "records": [[timestamp, rates] for timestamp, rates in records],
+        },
+        indent=2,
+    )
+
+
+class RateRecords(Sequence):
+    """Read-only view over encoded rate records, sorted by timestamp.
+
+    Timestamps and rates are typed ``memoryview`` columns over the encoded
+    buffer, so nothing is copied until a record is read.
+
+    Args:
+        codes: Currency codes, in column order
+        timestamps: Record timestamps in Unix seconds
+        values: Row-major rates, ``len(codes)`` per record (NaN if missing)
+    """
+
+    def __init__(self, codes, timestamps, values):
+        self.codes = codes
+        self.timestamps = timestamps
+        self.values = values
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, index):
+        """Return ``(timestamp, rates dict)`` for the record at ``index``."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("rate record index out of range")
+        return self.timestamps[index], self.rates(index)
+
+    def rates(self, index):
+        """Return the rates dict of the record at ``index``."""
+        width = len(self.codes)
+        row = self.values[index * width : (index + 1) * width]
+        return {
+            code: value
+            for code, value in zip(self.codes, row.tolist())
+            if not math.isnan(value)
+        }
+
+    def find(self, timestamp):
+        """Return the index of the latest record at or before ``timestamp``.
+
+        Returns:
+            int: Record index, or -1 if every record is later
+        """
+        return bisect_right(self.timestamps, timestamp) - 1
+
+    def to_json(self):
+        """Return the records as readable JSON, e.g. for debugging."""
+        return _to_json(self.codes, self)
+
+
+def encode_rates(records, codes=RATE_CODES, binary=True):
+    """Encode rate records, sorted by timestamp.
+
+    The binary layout is a header, the currency code dictionary, then the
+    timestamp column (int64) and the rates (float64, one row per record),
+    all little-endian and 8-byte aligned. Missing rates are stored as NaN.
+
+    Args:
+        records: Iterable of ``(unix_seconds, rates dict)``
+        codes: Currency codes stored, in column order
+        binary: Produce the compact binary format, or JSON when False
+
+    Returns:
+        bytes: Encoded records
+    """
+    records = sorted(
+        ((int(timestamp), rates) for timestamp, rates in records),
+        key=lambda record: record[0],
+    )
+
+    if not binary:
+        return _to_json(codes, records).encode("utf-8")
+    if any(len(code) != CODE_WIDTH or not code.isascii() for code in codes):
+        raise ValueError(f"Currency codes must be {CODE_WIDTH} ASCII characters")
+
+    timestamps = array(TIMESTAMP_TYPECODE, (timestamp for timestamp, _ in records))
+    values = array(
+        RATE_TYPECODE,
+        (float(rates.get(code, math.nan)) for _, rates in records for code in codes),
+    )
+    if sys.byteorder != "little":
+        timestamps.byteswap()
+        values.byteswap()
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(codes), len(records))
+    header += "".join(codes).encode("ascii")
+    header += b"\0" * (_columns_offset(len(codes)) - len(header))
+    return header + timestamps.tobytes() + values.tobytes()
+
+
+def decode_rates(data):
+    """Decode records produced by ``encode_rates`` (binary or JSON).
+
+    Args:
+        data: Encoded bytes, bytearray or memoryview
+
+    Returns:
+        RateRecords: View over the records
+
+    Raises:
+        ValueError: If the data is truncated, malformed or of a newer version
+    """
+    view = memoryview(data)
+    if view[:1] == b"{":
+        return _decode_json(view)
+
+    if len(view) < HEADER.size:
+        raise ValueError("Truncated rates data")
+    magic, version, code_count, count = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("Not encoded rates data")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported rates format version {version}")
+
+    codes_end = HEADER.size + CODE_WIDTH * code_count
+    raw_codes = bytes(view[HEADER.size : codes_end]).decode("ascii")
+    codes = tuple(
+        raw_codes[i : i + CODE_WIDTH] for i in range(0, len(raw_codes), CODE_WIDTH)
+    )
+
+    timestamps_offset = _columns_offset(code_count)
+    values_offset = timestamps_offset + count * struct.calcsize(TIMESTAMP_TYPECODE)
+    end = values_offset + count * code_count * struct.calcsize(RATE_TYPECODE)
+    if len(view) != end:
+        raise ValueError("Truncated rates data")
+
+    return RateRecords(
+        codes,
+        _column(view, timestamps_offset, count, TIMESTAMP_TYPECODE),
+        _column(view, values_offset, count * code_count, RATE_TYPECODE),
+    )
+
+
+def _decode_json(view):
+    try:
+        data = json.loads(bytes(view))
+        version = data["version"]
+        encoded = encode_rates(data["records"], codes=tuple(data["codes"]))
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid rates JSON: {e}") from e
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported rates format version {version}")
+    return decode_rates(encoded)
+
+
+def encode_snapshot(timestamp, rates, binary=True):
+    """Encode a single rate snapshot.
+
+    Args:
+        timestamp: Unix seconds the rates were fetched at
+        rates: Exchange rates dict
+        binary: Produce the compact binary format, or JSON when False
+
+    Returns:
+        bytes: Encoded snapshot
+    """
+    return encode_rates([(timestamp, rates)], binary=binary)
+
+
+def decode_snapshot(data):
+    """Decode a snapshot produced by ``encode_snapshot``.
+
+    Returns:
+        tuple: (Unix seconds, rates dict)
+
+    Raises:
+        ValueError: If the data does not hold exactly one snapshot
+    """
+    records = decode_rates(data)
+    if len(records) != 1:
+        raise ValueError(f"Expected one rate snapshot, found {len(records)}")
+    return records[0]
@@ -0,0 +1,244 @@
+import logging
+from types import SimpleNamespace
+
+from ask_sdk_core.attributes_manager import AttributesManager
+from ask_sdk_runtime.utils import UserAgentManager
+from utils import get_env_flag
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_FORMAT_VERSION = "1.0"
+APL_INTERFACE = "Alexa.Presentation.APL"
+
+
+class UnsupportedResponseError(Exception):
+    """Raised when a handler asks for a response the fast path cannot build."""
+
+
+def is_fast_path_enabled():
+    """Return True unless ``FAST_PATH_ENABLED`` turns the fast path off."""
+    return get_env_flag("FAST_PATH_ENABLED")
+
+
+def _ssml(speech):
+    """Wrap speech in <speak> tags the same way ``ResponseFactory`` does."""
+    if speech is None:
+        speech = ""
+    speech = speech.strip()
+    if speech.startswith("<speak>") and speech.endswith("</speak>"):
+        speech = speech[7:-8].strip()
+    return {"type": "SSML", "ssml": f"<speak>{speech}</speak>"}
+
+
+class FastResponseFactory:
+    """Minimal ``ResponseFactory`` that builds the response as a plain dict.
+
+    Supports the subset used by the skill's handlers (speech, reprompt and
+    end-of-session flag). Keys are emitted in the same order as the SDK
+    serializer so responses are byte-for-byte identical. Anything else
+    raises ``UnsupportedResponseError``, which sends the request back to the
+    full SDK pipeline.
+    """
+
+    def __init__(self):
+        self._output_speech = None
+        self._reprompt = None
+        self._should_end_session = None
+
+    def speak(self, speech, play_behavior=None):
+        if play_behavior is not None:
+            raise UnsupportedResponseError("play_behavior")
+        self._output_speech = _ssml(speech)
+        return self
+
+    def ask(self, reprompt, play_behavior=None):
+        if play_behavior is not None:
+            raise UnsupportedResponseError("play_behavior")
+        self._reprompt = {"outputSpeech": _ssml(reprompt)}
+        self._should_end_session = False
+        return self
+
+    def set_should_end_session(self, should_end_session):
+        self._should_end_session = should_end_session
+        return self
+
+    def __getattr__(self, name):
+        # Cards, directives and other ResponseFactory features
+        if name.startswith("_"):
+            raise AttributeError(name)
+        raise UnsupportedResponseError(name)
+
+    @property
+    def response(self):
+        response = {}
+        if self._output_speech is not None:
+            response["outputSpeech"] = self._output_speech
+        if self._reprompt is not None:
+            response["reprompt"] = self._reprompt
+        if self._should_end_session is not None:
+            response["shouldEndSession"] = self._should_end_session
+        return response
+
+
+class FastHandlerInput:
+    """Handler input backed by a lightweight view of the raw event."""
+
+    def __init__(self, request_envelope, attributes_manager, context):
+        self.request_envelope = request_envelope
+        self.attributes_manager = attributes_manager
+        self.context = context
+        self.response_builder = FastResponseFactory()
+        self.service_client_factory = None
+        self.template_factory = None
+
+
+def parse_envelope(event, intent_names):
+    """Build a lightweight request envelope view from a raw Lambda event.
+
+    Only the fields the skill's handlers read are extracted: request type,
+    intent name, slot values, session attributes and user id. Devices with
+    a screen are declined, since their responses carry APL directives that
+    ``FastResponseFactory`` does not build; the view therefore always
+    describes a voice-only device.
+
+    Args:
+        event: Raw request envelope dict from the Alexa service
+        intent_names: Intent names eligible for the fast path
+
+    Returns:
+        SimpleNamespace: Envelope view, or None if the event must go through
+        the full SDK pipeline
+    """
+    try:
+        request = event["request"]
+        if request["type"] != "IntentRequest":
+            return None
+
+        intent = request["intent"]
+        if intent["name"] not in intent_names:
+            return None
+
+        system = event["context"]["System"]
+        user_id = system["user"]["userId"]
+        if APL_INTERFACE in (system.get("device") or {}).get("supportedInterfaces", {}):
+            return None
+        raw_slots = intent.get("slots")
+        session = event.get("session")
+    except (KeyError, TypeError):
+        return None
+
+    slots = None
+    if raw_slots is not None:
+        slots = {
+            name: SimpleNamespace(name=name, value=slot.get("value"))
+            for name, slot in raw_slots.items()
+        }
+
+    return SimpleNamespace(
+        request=SimpleNamespace(
+            object_type="IntentRequest",
+            intent=SimpleNamespace(name=intent["name"], slots=slots),
+        ),
+        session=(
+            None
+            if session is None
+            else SimpleNamespace(attributes=session.get("attributes"))
+        ),
+        context=SimpleNamespace(
+            system=SimpleNamespace(
+                user=SimpleNamespace(user_id=user_id),
+                device=SimpleNamespace(
+                    supported_interfaces=SimpleNamespace(alexa_presentation_apl=None)
+                ),
+            )
+        ),
+    )
+
+
+class FastPath:
+    """Serve the skill's own intents straight from the raw event dict.
+
+    Skips deserialising the event into ``ask_sdk_model`` objects and
+    serialising the response back, while running the same request mappers,
+    interceptors and exception handlers as the skill's dispatcher. Events
+    it does not recognise are left to the full SDK pipeline.
+
+    Args:
+        skill: CustomSkill whose dispatcher configuration is reused
+        intent_names: Intent names eligible for the fast path
+    """
+
+    def __init__(self, skill, intent_names):
+        self.skill = skill
+        self.intent_names = frozenset(intent_names)
+        self.dispatcher = skill.request_dispatcher
+
+    def supports(self):
+        """Return True if the skill configuration allows the fast path."""
+        return self.skill.skill_id is None and self.skill.api_client is None
+
+    def invoke(self, event, context):
+        """Handle the event, or return None to use the full SDK pipeline."""
+        request_envelope = parse_envelope(event, self.intent_names)
+        if request_envelope is None:
+            return None
+
+        chain = None
+        for mapper in self.dispatcher.request_mappers:
+            chain = mapper.get_request_handler_chain(
+                FastHandlerInput(request_envelope, None, context)
+            )
+            if chain is not None:
+                break
+        if chain is None:
+            return None
+
+        attributes_manager = AttributesManager(
+            request_envelope=request_envelope,
+            persistence_adapter=self.skill.persistence_adapter,
+        )
+        handler_input = FastHandlerInput(request_envelope, attributes_manager, context)
+        try:
+            response = self._dispatch(handler_input, chain)
+        except UnsupportedResponseError as e:
+            # Nothing was saved yet: attributes are written by the interceptors
+            logger.info(f"Fast path cannot build {e}; using the full pipeline")
+            return None
+
+        response_envelope = {"version": RESPONSE_FORMAT_VERSION}
+        if request_envelope.session is not None:
+            response_envelope["sessionAttributes"] = (
+                attributes_manager.session_attributes
+            )
+        response_envelope["userAgent"] = UserAgentManager.get_user_agent()
+        if response is not None:
+            response_envelope["response"] = response
+        return response_envelope
+
+    def _dispatch(self, handler_input, chain):
+        dispatcher = self.dispatcher
+        try:
+            for interceptor in dispatcher.request_interceptors:
+                interceptor.process(handler_input=handler_input)
+            for interceptor in chain.request_interceptors:
+                interceptor.process(handler_input=handler_input)
+
+            response = chain.request_handler.handle(handler_input)
+
+            for interceptor in chain.response_interceptors:
+                interceptor.process(handler_input=handler_input, response=response)
+            for interceptor in dispatcher.response_interceptors:
+                interceptor.process(handler_input=handler_input, response=response)
+
+            return response
+        except UnsupportedResponseError:
+            raise
+        except Exception as e:
+            if dispatcher.exception_mapper is None:
+                raise
+            exception_handler = dispatcher.exception_mapper.get_handler(
+                handler_input, e
+            )
+            if exception_handler is None:
+                raise
+            return exception_handler.handle(handler_input, e)
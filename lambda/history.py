@@ -0,0 +1,241 @@
+import re
+import threading
+from bisect import bisect_right, insort
+from calendar import monthrange, timegm
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from codec import RATE_CODES, RateRecords, decode_rates, encode_rates
+from utils import get_env_flag
+
+HISTORY_PREFIX = "history/"
+RATES_TIMEZONE = "America/Havana"
+DEFAULT_MAX_CACHED_DATES = 64
+
+DAY_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+WEEK_PATTERN = re.compile(r"^(\d{4})-W(\d{2})(?:-WE)?$")
+MONTH_PATTERN = re.compile(r"^(\d{4})-(\d{2})$")
+
+
+def get_today():
+    """Return the current date in Cuba, where the rates are published."""
+    try:
+        return datetime.now(ZoneInfo(RATES_TIMEZONE)).date()
+    except ZoneInfoNotFoundError:
+        return datetime.now(timezone.utc).date()
+
+
+def get_shard_key(day):
+    """Return the storage key of the monthly document holding ``day``."""
+    return f"{HISTORY_PREFIX}{day:%Y-%m}.rates"
+
+
+def day_to_timestamp(day):
+    """Return the Unix timestamp of midnight UTC at the start of ``day``."""
+    return timegm(day.timetuple())
+
+
+def timestamp_to_day(timestamp):
+    """Return the UTC date of a Unix timestamp."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).date()
+
+
+def parse_date_slot(value, today):
+    """Resolve an ``AMAZON.DATE`` slot value to a single day.
+
+    Days are taken as is. Weeks and months ("la semana pasada", "en
+    septiembre") resolve to their last day, capped at ``today``.
+
+    Args:
+        value: Slot value, e.g. '2026-10-18', '2026-W41' or '2026-09'
+        today: Current date
+
+    Returns:
+        datetime.date: Requested day, or None if the value is not a
+        supported date
+    """
+    if not value:
+        return None
+
+    try:
+        if DAY_PATTERN.match(value):
+            return date.fromisoformat(value)
+
+        week_match = WEEK_PATTERN.match(value)
+        if week_match:
+            year, week = (int(group) for group in week_match.groups())
+            return min(date.fromisocalendar(year, week, 7), today)
+
+        month_match = MONTH_PATTERN.match(value)
+        if month_match:
+            year, month = (int(group) for group in month_match.groups())
+            return min(date(year, month, monthrange(year, month)[1]), today)
+    except ValueError:
+        return None
+
+    return None
+
+
+class RateHistory:
+    """Daily exchange rates kept as one sorted document per month.
+
+    Each month is stored under ``history/YYYY-MM.rates`` as records sorted by
+    day, in the compact format of ``codec`` (or JSON when
+    ``RATES_BINARY_ENCODING`` is off, for debugging). A lookup binary-searches
+    the sorted list of month keys and then the days inside one month, so only
+    a single document is read. Answers for recently asked dates are kept in a
+    bounded LRU and served without any I/O.
+
+    Args:
+        store: Object store with ``read_bytes``, ``write_bytes`` and
+            ``list_keys``, such as the skill's persistence adapter
+        max_cached_dates: Number of recently asked dates kept in memory
+        binary: Write months in the binary format; defaults to the
+            ``RATES_BINARY_ENCODING`` flag
+    """
+
+    def __init__(self, store, max_cached_dates=DEFAULT_MAX_CACHED_DATES, binary=None):
+        self.store = store
+        self.max_cached_dates = max_cached_dates
+        if binary is None:
+            binary = get_env_flag("RATES_BINARY_ENCODING")
+        self.binary = binary
+        self._lock = threading.Lock()
+        self._shard_keys = None
+        self._recent = OrderedDict()
+        self._last_recorded = None
+
+    @property
+    def shard_keys(self):
+        """Sorted keys of the monthly documents, listed on first use."""
+        if self._shard_keys is None:
+            self._shard_keys = self.store.list_keys(HISTORY_PREFIX)
+        return self._shard_keys
+
+    def lookup(self, day):
+        """Return the latest recorded rates on or before ``day``.
+
+        Args:
+            day: datetime.date to look up
+
+        Returns:
+            tuple: (datetime.date of the snapshot, rates dict), or None if
+            nothing was recorded on or before that day
+        """
+        with self._lock:
+            if day in self._recent:
+                self._recent.move_to_end(day)
+                return self._recent[day]
+
+            result = self._find(day)
+
+            self._recent[day] = result
+            if len(self._recent) > self.max_cached_dates:
+                self._recent.popitem(last=False)
+            return result
+
+    def record(self, rates, day=None):
+        """Store the rates for a day, replacing an earlier value that day.
+
+        Only the informal rates are kept; other markets in the snapshot are
+        ignored.
+
+        Args:
+            rates: Exchange rates dict
+            day: datetime.date of the snapshot, today in Cuba by default
+
+        Returns:
+            bool: True if the stored history changed
+        """
+        rates = {code: rates[code] for code in RATE_CODES if code in rates}
+        day = day or get_today()
+        timestamp = day_to_timestamp(day)
+
+        with self._lock:
+            if self._last_recorded == (timestamp, rates):
+                return False
+
+            key = get_shard_key(day)
+            records = dict(self._read_shard(key))
+            if records.get(timestamp) == rates:
+                self._last_recorded = (timestamp, rates)
+                return False
+            records[timestamp] = rates
+
+            self.store.write_bytes(
+                key, encode_rates(records.items(), binary=self.binary)
+            )
+            self._last_recorded = (timestamp, rates)
+
+            if self._shard_keys is not None and key not in self._shard_keys:
+                insort(self._shard_keys, key)
+            for cached_day in [d for d in self._recent if d >= day]:
+                del self._recent[cached_day]
+            return True
+
+    def clear_cache(self):
+        """Forget cached lookups and the month listing."""
+        with self._lock:
+            self._recent.clear()
+            self._shard_keys = None
+
+    def recent(self, day, count):
+        """Return the last ``count`` recorded days on or before ``day``.
+
+        Months are read newest first, and only until enough days were found.
+
+        Args:
+            day: datetime.date of the newest day to return
+            count: Maximum number of days
+
+        Returns:
+            list: (datetime.date, rates dict) pairs, oldest first
+        """
+        timestamp = day_to_timestamp(day)
+        found = []
+        with self._lock:
+            shard_keys = self._list_through(get_shard_key(day))
+            position = bisect_right(shard_keys, get_shard_key(day))
+            for shard_key in reversed(shard_keys[:position]):
+                records = self._read_shard(shard_key)
+                end = records.find(timestamp) + 1
+                start = max(end - (count - len(found)), 0)
+                found[:0] = [
+                    (timestamp_to_day(records.timestamps[index]), records.rates(index))
+                    for index in range(start, end)
+                ]
+                if len(found) >= count:
+                    break
+        return found
+
+    def _list_through(self, key):
+        if self.shard_keys and key > self.shard_keys[-1]:
+            # Another container may have started a newer month since listing
+            self._shard_keys = None
+        return self.shard_keys
+
+    def _find(self, day):
+        key = get_shard_key(day)
+        shard_keys = self._list_through(key)
+        timestamp = day_to_timestamp(day)
+        position = bisect_right(shard_keys, key)
+
+        # Stored months are never empty, so a day before the first record of
+        # its month is answered by the last record of the previous month
+        for shard_key in reversed(shard_keys[max(position - 2, 0) : position]):
+            records = self._read_shard(shard_key)
+            index = records.find(timestamp)
+            if index >= 0:
+                return (
+                    timestamp_to_day(records.timestamps[index]),
+                    records.rates(index),
+                )
+
+        return None
+
+    def _read_shard(self, key):
+        data = self.store.read_bytes(key)
+        if not data:
+            return RateRecords(RATE_CODES, [], [])
+        return decode_rates(data)
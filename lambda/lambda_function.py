@@ -1,30 +1,235 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import random
 
 import ask_sdk_core.utils as ask_utils
+from alerts import ABOVE, get_rate_alerts
 from ask_sdk_core.dispatch_components.exception_components import (
     AbstractExceptionHandler,
 )
-from ask_sdk_core.dispatch_components.request_components import AbstractRequestHandler
 from ask_sdk_core.handler_input import HandlerInput
-from ask_sdk_core.skill_builder import SkillBuilder
 from ask_sdk_model.response import Response
+from ask_sdk_model.ui import AskForPermissionsConsentCard
+from briefing import get_briefing_feed
+from history import RateHistory, get_today, parse_date_slot
+from markets import BUY, OFFICIAL, SELL, get_market_url, reset_session
+from matching import AliasMatcher
+from persistence import (
+    DEFAULT_AMOUNT,
+    FAVORITE_CURRENCY,
+    LAST_RATES,
+    S3ObjectStore,
+    SavePersistentAttributesResponseInterceptor,
+    get_persistence_adapter,
+    get_preferences,
+    remember_preferences,
+)
+from priming import (
+    after_restore,
+    before_snapshot,
+    is_pre_initialized,
+)
+from profiling import get_profiler
+from rate_cache import rate_cache
+from routing import INTENT_REQUEST, RoutedRequestHandler, RoutingSkillBuilder
+from snapshot import format_spanish_date, load_bundled_snapshot
+from throttle import get_upstream_throttle
+from tracing import tracer
 from utils import (
     get_random_exchange_explanation,
     get_random_greeting,
     get_rounded_exchange_rates,
 )
+from validation import DEFAULT_MIN_SAMPLES
+from visual import RatesVisual, supports_apl
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+CURRENCY_NAMES = {
+    "USD": "U. S. D.",
+    "EUR": "Euro",
+    "MLC": "M. L. C.",
+}
+
+CURRENCY_PLURAL_NAMES = {
+    "USD": "dólares",
+    "EUR": "euros",
+    "MLC": "M. L. C.",
+}
+
+# Curated vocabulary for the fuzzy currency matcher; accents, case and
+# punctuation are ignored, so only one spelling of each alias is needed
+CURRENCY_ALIASES = {
+    "usd": "USD",
+    "u. s. d.": "USD",
+    "dólar": "USD",
+    "dólares": "USD",
+    "dólar americano": "USD",
+    "dólares americanos": "USD",
+    "dólar estadounidense": "USD",
+    "dólares estadounidenses": "USD",
+    "fula": "USD",
+    "fulas": "USD",
+    "yuma": "USD",
+    "verdes": "USD",
+    "euro": "EUR",
+    "euros": "EUR",
+    "eur": "EUR",
+    "mlc": "MLC",
+    "m. l. c.": "MLC",
+    "eme ele ce": "MLC",
+    "moneda libremente convertible": "MLC",
+    # The CUC was retired in 2021; the MLC took over the stores it was used in
+    "peso convertible": "MLC",
+    "pesos convertibles": "MLC",
+    "cuc": "MLC",
+    "chavito": "MLC",
+    "chavitos": "MLC",
+}
+
+currency_matcher = AliasMatcher(CURRENCY_ALIASES)
+
+
+# None is the informal market the rest of the skill talks about
+INFORMAL = None
+
+MARKET_ALIASES = {
+    "compra": BUY,
+    "compran": BUY,
+    "comprar": BUY,
+    "venta": SELL,
+    "venden": SELL,
+    "vender": SELL,
+    "vende": SELL,
+    "oficial": OFFICIAL,
+    "banco central": OFFICIAL,
+    "del banco central": OFFICIAL,
+    "b. c. c.": OFFICIAL,
+    "bcc": OFFICIAL,
+    "informal": INFORMAL,
+    "la calle": INFORMAL,
+    "de la calle": INFORMAL,
+}
+
+MARKET_NAMES = {
+    BUY: "de compra",
+    SELL: "de venta",
+    OFFICIAL: "oficial del Banco Central",
+    INFORMAL: "de la calle",
+}
+
+MARKET_PHRASES = {
+    BUY: "Te compran",
+    SELL: "Te venden",
+    OFFICIAL: "En el Banco Central tienen",
+    INFORMAL: "En la calle está",
+}
+
+NOTIFICATIONS_PERMISSION = "alexa::devices:all:notifications:write"
+
+
+def match_currency(currency_type):
+    """Resolve a spoken currency to its code.
+
+    Misspelled or unaccented values ('dolares', 'fulas') are matched to the
+    nearest alias.
+
+    Returns:
+        tuple: (currency code or None, candidate codes when the value is
+        ambiguous, empty when it is unknown)
+    """
+    return currency_matcher.match(currency_type)
+
+
+def ask_which_currency(handler_input, candidates):
+    """Reprompt the user to pick one of the currencies they may have meant."""
+    names = [CURRENCY_NAMES[code] for code in candidates]
+    speak_output = (
+        f"Asere, no te entendí bien. Te refieres al {', al '.join(names[:-1])} "
+        f"o al {names[-1]}?"
+    )
+    return handler_input.response_builder.speak(speak_output).ask(speak_output).response
+
+
+def format_number(value: float) -> str:
+    """Format a number without a trailing '.0' when it is whole."""
+    return str(int(value)) if value == int(value) else str(value)
+
+
+def get_rates_or_snapshot() -> tuple:
+    """Return live rates, falling back to the bundled snapshot.
+
+    Returns:
+        tuple: (rates dict or None, spoken note about the snapshot date or
+        None when the rates are live)
+    """
+    with tracer.span("rates.get") as span:
+        currencies = get_rounded_exchange_rates()
+        if currencies is not None:
+            span.set_attribute("rates.source", "live")
+            return currencies, None
+
+        snapshot = load_bundled_snapshot()
+        span.set_attribute("rates.source", "none" if snapshot is None else "bundled")
+        if snapshot is None:
+            return None, None
+
+    logger.warning("Serving rates from the bundled snapshot")
+    snapshot_date = format_spanish_date(snapshot["fetched_at"])
+    stale_note = (
+        "Asere, ahora mismo no me puedo conectar. "
+        f"Estas son las tasas del {snapshot_date}"
+    )
+    return snapshot["rates"], stale_note
+
+
+# Daily rates live next to the users' attributes in the persistence store
+persistence_adapter = get_persistence_adapter()
+rate_history = RateHistory(persistence_adapter)
+
+
+def get_recent_rates():
+    """Return the rates of the last recorded days, enough to check outliers."""
+    days = rate_history.recent(get_today(), DEFAULT_MIN_SAMPLES)
+    return [rates for _, rates in days]
+
+
+def describe_alert(currency, threshold, direction, rate):
+    """Return the text of a rate alert notification."""
+    verb = "pasó de" if direction == ABOVE else "bajó de"
+    return (
+        f"Tasa de Cambio Cubana: el {CURRENCY_NAMES[currency]} {verb} "
+        f"{format_number(threshold)} pesos y está en {format_number(round(rate, 2))}"
+    )
+
+
+# The rates screen for devices with a display, rendered once per snapshot
+rates_visual = RatesVisual(rate_history)
 
-class LaunchRequestHandler(AbstractRequestHandler):
+
+def show_rates(handler_input, currencies):
+    """Attach the rates screen when the device supports APL.
+
+    Voice-only devices skip it entirely; the others get the directive
+    memoised for the current snapshot.
+    """
+    if not supports_apl(handler_input):
+        return
+    with tracer.span("visual.render"):
+        handler_input.response_builder.add_directive(rates_visual.directive(currencies))
+
+
+# Alerts are indexed next to the users' attributes; they need credentials for
+# the Proactive Events API (or a PROACTIVE_EVENTS_URL stand-in)
+rate_alerts = get_rate_alerts(persistence_adapter, describe_alert)
+
+
+class LaunchRequestHandler(RoutedRequestHandler):
     """Handler for Skill Launch."""
 
-    def can_handle(self, handler_input: HandlerInput) -> bool:
-        return ask_utils.is_request_type("LaunchRequest")(handler_input)
+    routes = (("LaunchRequest", None),)
 
     def handle(self, handler_input: HandlerInput) -> Response:
         logger.info("Processing LaunchRequest")
@@ -37,16 +242,15 @@ class LaunchRequestHandler(AbstractRequestHandler):
         )
 
 
-class ExchangeRateIntentHandler(AbstractRequestHandler):
+class ExchangeRateIntentHandler(RoutedRequestHandler):
     """Handler for Exchange Rates Intent."""
 
-    def can_handle(self, handler_input: HandlerInput) -> bool:
-        return ask_utils.is_intent_name("ExchangeRateIntent")(handler_input)
+    routes = ((INTENT_REQUEST, "ExchangeRateIntent"),)
 
     def handle(self, handler_input: HandlerInput) -> Response:
         """Return all exchange rates with dynamic USD/MLC comparison."""
         logger.info("Processing ExchangeRateIntent")
-        currencies = get_rounded_exchange_rates()
+        currencies, stale_note = get_rates_or_snapshot()
 
         if currencies is None:
             logger.warning("Failed to fetch exchange rates")
@@ -61,7 +265,7 @@ class ExchangeRateIntentHandler(AbstractRequestHandler):
         eur_value = currencies["EUR"]
 
         logger.info(f"Rates: USD={usd_value}, EUR={eur_value}, MLC={mlc_value}")
-        random_greeting = get_random_greeting()
+        random_greeting = stale_note or get_random_greeting()
 
         # Build dynamic comparison between USD and MLC
         usd_mlc_diff = abs(usd_value - mlc_value)
@@ -76,20 +280,23 @@ class ExchangeRateIntentHandler(AbstractRequestHandler):
             f"{random_greeting}. El M. L. C. está en {mlc_value} pesos. "
             f"{usd_phrase}. Y el Euro ni se diga, ese anda por los {eur_value} pesos"
         )
+        remember_preferences(handler_input, **{LAST_RATES: currencies})
+        if stale_note is None:
+            show_rates(handler_input, currencies)
 
-        return handler_input.response_builder.speak(speak_output).response
+        with tracer.span("speech.render", characters=len(speak_output)):
+            return handler_input.response_builder.speak(speak_output).response
 
 
-class ExchangeRateRequestIntentHandler(AbstractRequestHandler):
+class ExchangeRateRequestIntentHandler(RoutedRequestHandler):
     """Handler for Exchange Rates Request Intent."""
 
-    def can_handle(self, handler_input: HandlerInput) -> bool:
-        return ask_utils.is_intent_name("ExchangeRateRequestIntent")(handler_input)
+    routes = ((INTENT_REQUEST, "ExchangeRateRequestIntent"),)
 
     def handle(self, handler_input: HandlerInput) -> Response:
         """Return exchange rate for a specific currency requested by the user."""
         logger.info("Processing ExchangeRateRequestIntent")
-        currencies = get_rounded_exchange_rates()
+        currencies, stale_note = get_rates_or_snapshot()
 
         if currencies is None:
             logger.warning("Failed to fetch exchange rates")
@@ -117,12 +324,18 @@ class ExchangeRateRequestIntentHandler(AbstractRequestHandler):
         currency_type = currency_slot.value
         logger.info(f"Requested currency: {currency_type}")
 
-        currency_lower = currency_type.lower()
-        if currency_lower in ["usd", "u. s. d.", "dólar", "dólares"]:
+        with tracer.span("slots.resolve", slot="currency") as span:
+            currency_code, candidates = match_currency(currency_type)
+            span.set_attribute("currency", currency_code)
+
+        if candidates:
+            return ask_which_currency(handler_input, candidates)
+
+        if currency_code == "USD":
             text_output = f"El U. S. D. anda por los {usd_value} pesos."
-        elif currency_lower in ["euro", "euros", "eur"]:
+        elif currency_code == "EUR":
             text_output = f"El Euro más caliente que el caribe. {eur_value} pesos."
-        elif currency_lower in ["mlc", "m. l. c.", "eme ele ce"]:
+        elif currency_code == "MLC":
             mlc_usd_diff = abs(mlc_value - usd_value)
             if mlc_usd_diff < 5:
                 text_output = f"El M. L. C. casi igual que el dólar, {mlc_value} pesos."
@@ -138,22 +351,30 @@ class ExchangeRateRequestIntentHandler(AbstractRequestHandler):
                 f"No conozco ningún {currency_type}"
             )
 
-        random_greeting = get_random_greeting()
+        if currency_code is not None:
+            remember_preferences(
+                handler_input,
+                **{FAVORITE_CURRENCY: currency_code, LAST_RATES: currencies},
+            )
+            if stale_note is None:
+                show_rates(handler_input, currencies)
+
+        random_greeting = stale_note or get_random_greeting()
         speak_output = f"{random_greeting}. {text_output}"
 
-        return handler_input.response_builder.speak(speak_output).response
+        with tracer.span("speech.render", characters=len(speak_output)):
+            return handler_input.response_builder.speak(speak_output).response
 
 
-class ConvertCurrencyIntentHandler(AbstractRequestHandler):
+class ConvertCurrencyIntentHandler(RoutedRequestHandler):
     """Handler for Currency Conversion Intent."""
 
-    def can_handle(self, handler_input: HandlerInput) -> bool:
-        return ask_utils.is_intent_name("ConvertCurrencyIntent")(handler_input)
+    routes = ((INTENT_REQUEST, "ConvertCurrencyIntent"),)
 
     def handle(self, handler_input: HandlerInput) -> Response:
         """Convert amount from foreign currency to Cuban pesos."""
         logger.info("Processing ConvertCurrencyIntent")
-        currencies = get_rounded_exchange_rates()
+        currencies, stale_note = get_rates_or_snapshot()
 
         if currencies is None:
             logger.warning("Failed to fetch exchange rates")
@@ -189,51 +410,369 @@ class ConvertCurrencyIntentHandler(AbstractRequestHandler):
         currency_type = currency_slot.value
         logger.info(f"Converting {amount} {currency_type} to CUP")
 
-        # Get exchange rate
-        rate = None
-        currency_name = ""
-        currency_lower = currency_type.lower()
-        if currency_lower in ["usd", "u. s. d.", "dólar", "dólares"]:
-            rate = currencies["USD"]
-            currency_name = "dólares"
-        elif currency_lower in ["euro", "euros", "eur"]:
-            rate = currencies["EUR"]
-            currency_name = "euros"
-        elif currency_lower in ["mlc", "m. l. c.", "eme ele ce"]:
-            rate = currencies["MLC"]
-            currency_name = "M. L. C."
-        else:
+        with tracer.span("slots.resolve", slot="sourceCurrency") as span:
+            currency_code, candidates = match_currency(currency_type)
+            span.set_attribute("currency", currency_code)
+
+        if candidates:
+            return ask_which_currency(handler_input, candidates)
+
+        if currency_code is None:
             speak_output = (
                 f"Ni idea de lo que quieres decir compadre. "
                 f"No conozco ningún {currency_type}"
             )
             return handler_input.response_builder.speak(speak_output).response
 
+        currency_name = CURRENCY_PLURAL_NAMES[currency_code]
+
         # Calculate conversion
+        rate = currencies[currency_code]
         total_pesos = round(amount * rate, 2)
 
         # Format output
-        amount_str = str(int(amount)) if amount == int(amount) else str(amount)
-        total_str = (
-            str(int(total_pesos))
-            if total_pesos == int(total_pesos)
-            else str(total_pesos)
+        amount_str = format_number(amount)
+        total_str = format_number(total_pesos)
+
+        remember_preferences(
+            handler_input,
+            **{
+                FAVORITE_CURRENCY: currency_code,
+                DEFAULT_AMOUNT: amount,
+                LAST_RATES: currencies,
+            },
         )
 
-        random_greeting = get_random_greeting()
+        random_greeting = stale_note or get_random_greeting()
         speak_output = (
             f"{random_greeting}. {amount_str} {currency_name} "
             f"son {total_str} pesos cubanos."
         )
 
+        with tracer.span("speech.render", characters=len(speak_output)):
+            return handler_input.response_builder.speak(speak_output).response
+
+
+class MyRatesIntentHandler(RoutedRequestHandler):
+    """Handler for My Rates Intent ("cómo está lo mío")."""
+
+    routes = ((INTENT_REQUEST, "MyRatesIntent"),)
+
+    def handle(self, handler_input: HandlerInput) -> Response:
+        """Answer with the user's favourite currency and usual amount."""
+        logger.info("Processing MyRatesIntent")
+        preferences = get_preferences(handler_input)
+        currency_code = preferences.get(FAVORITE_CURRENCY)
+
+        if currency_code not in CURRENCY_NAMES:
+            speak_output = (
+                "Todavía no sé qué es lo tuyo asere. Pregúntame por el dólar, "
+                "el euro o el M. L. C. y me lo apunto."
+            )
+            return handler_input.response_builder.speak(speak_output).response
+
+        currencies, stale_note = get_rates_or_snapshot()
+
+        if currencies is None:
+            logger.warning("Failed to fetch exchange rates")
+            speak_output = (
+                "Coño asere, tengo un problema conectándome. "
+                "Intenta de nuevo en un ratito."
+            )
+            return handler_input.response_builder.speak(speak_output).response
+
+        rate = currencies[currency_code]
+        currency_name = CURRENCY_NAMES[currency_code]
+        text_output = f"El {currency_name} está en {format_number(rate)} pesos."
+
+        amount = preferences.get(DEFAULT_AMOUNT)
+        if amount:
+            total_pesos = round(amount * rate, 2)
+            plural_name = CURRENCY_PLURAL_NAMES[currency_code]
+            text_output += (
+                f" Tus {format_number(amount)} {plural_name} son "
+                f"{format_number(total_pesos)} pesos cubanos."
+            )
+
+        last_rate = (preferences.get(LAST_RATES) or {}).get(currency_code)
+        if last_rate is not None:
+            change = round(rate - last_rate, 2)
+            if change > 0:
+                text_output += (
+                    f" Subió {format_number(change)} pesos desde la última vez."
+                )
+            elif change < 0:
+                text_output += (
+                    f" Bajó {format_number(-change)} pesos desde la última vez."
+                )
+            else:
+                text_output += " Sigue igualito que la última vez."
+
+        remember_preferences(handler_input, **{LAST_RATES: currencies})
+
+        random_greeting = stale_note or get_random_greeting()
+        speak_output = f"{random_greeting}. {text_output}"
+
+        with tracer.span("speech.render", characters=len(speak_output)):
+            return handler_input.response_builder.speak(speak_output).response
+
+
+class HistoricalRateIntentHandler(RoutedRequestHandler):
+    """Handler for Historical Rate Intent ("a cómo estaba el dólar ayer")."""
+
+    routes = ((INTENT_REQUEST, "HistoricalRateIntent"),)
+
+    def handle(self, handler_input: HandlerInput) -> Response:
+        """Return the rates recorded on a past date, or the current ones today."""
+        logger.info("Processing HistoricalRateIntent")
+        slots = handler_input.request_envelope.request.intent.slots or {}
+        date_slot = slots.get("date")
+        currency_slot = slots.get("currency")
+
+        today = get_today()
+        day = parse_date_slot(date_slot.value if date_slot else None, today)
+
+        if day is None:
+            speak_output = (
+                "De qué día quieres saber la tasa asere? "
+                "Dime por ejemplo: ayer, o el tres de octubre."
+            )
+            return (
+                handler_input.response_builder.speak(speak_output)
+                .ask(speak_output)
+                .response
+            )
+
+        if day > today:
+            speak_output = (
+                "Asere, yo no adivino el futuro. Para la tasa de hoy "
+                "pregúntame cuál es la tasa de cambio."
+            )
+            return handler_input.response_builder.speak(speak_output).response
+
+        currency_code = None
+        if currency_slot and currency_slot.value:
+            currency_code, candidates = match_currency(currency_slot.value)
+            if candidates:
+                return ask_which_currency(handler_input, candidates)
+            if currency_code is None:
+                speak_output = (
+                    f"Ni idea de lo que quieres decir compadre. "
+                    f"No conozco ningún {currency_slot.value}"
+                )
+                return handler_input.response_builder.speak(speak_output).response
+
+        # Today is answered with the current rates, or today's record if they
+        # cannot be fetched
+        rates = get_rounded_exchange_rates() if day == today else None
+        if rates is not None:
+            text_output, verb = "Hoy", "está"
+        else:
+            found = rate_history.lookup(day)
+            if found is None:
+                speak_output = (
+                    f"No tengo apuntadas las tasas del {format_spanish_date(day)} "
+                    "asere."
+                )
+                return handler_input.response_builder.speak(speak_output).response
+
+            snapshot_day, rates = found
+            verb = "estaba"
+            if snapshot_day == day:
+                text_output = f"El {format_spanish_date(day)}"
+            else:
+                text_output = (
+                    f"Del {format_spanish_date(day)} no tengo nada, pero el "
+                    f"{format_spanish_date(snapshot_day)}"
+                )
+        rates = {code: round(rates[code], 2) for code in CURRENCY_NAMES}
+
+        if currency_code is not None:
+            text_output += (
+                f" el {CURRENCY_NAMES[currency_code]} {verb} en "
+                f"{format_number(rates[currency_code])} pesos."
+            )
+        else:
+            text_output += (
+                f" el U. S. D. {verb} en {format_number(rates['USD'])}, "
+                f"el Euro en {format_number(rates['EUR'])} "
+                f"y el M. L. C. en {format_number(rates['MLC'])} pesos."
+            )
+
+        speak_output = f"{get_random_greeting()}. {text_output}"
+
+        with tracer.span("speech.render", characters=len(speak_output)):
+            return handler_input.response_builder.speak(speak_output).response
+
+
+class MarketRateIntentHandler(RoutedRequestHandler):
+    """Handler for Market Rate Intent ("a cómo compran el dólar")."""
+
+    routes = ((INTENT_REQUEST, "MarketRateIntent"),)
+
+    def handle(self, handler_input: HandlerInput) -> Response:
+        """Return buy, sell, official or informal rates."""
+        logger.info("Processing MarketRateIntent")
+        slots = handler_input.request_envelope.request.intent.slots or {}
+        market_slot = slots.get("market")
+        currency_slot = slots.get("currency")
+
+        market_value = (market_slot.value or "").lower() if market_slot else ""
+        if market_value not in MARKET_ALIASES:
+            speak_output = (
+                "Qué tasa quieres saber asere: la de compra, "
+                "la de venta o la oficial?"
+            )
+            return (
+                handler_input.response_builder.speak(speak_output)
+                .ask(speak_output)
+                .response
+            )
+        market = MARKET_ALIASES[market_value]
+        if market is not INFORMAL and get_market_url(market) is None:
+            speak_output = (
+                f"Asere, la tasa {MARKET_NAMES[market]} no la tengo disponible. "
+                "Te puedo decir la de la calle."
+            )
+            return handler_input.response_builder.speak(speak_output).response
+
+        currency_code = None
+        if currency_slot and currency_slot.value:
+            currency_code, candidates = match_currency(currency_slot.value)
+            if candidates:
+                return ask_which_currency(handler_input, candidates)
+            if currency_code is None:
+                speak_output = (
+                    f"Ni idea de lo que quieres decir compadre. "
+                    f"No conozco ningún {currency_slot.value}"
+                )
+                return handler_input.response_builder.speak(speak_output).response
+
+        stale_note = None
+        if market is INFORMAL:
+            rates, stale_note = get_rates_or_snapshot()
+        else:
+            rates = get_rounded_exchange_rates(market)
+
+        if not rates or (currency_code is not None and currency_code not in rates):
+            name = MARKET_NAMES[market]
+            if currency_code is not None:
+                name += f" del {CURRENCY_NAMES[currency_code]}"
+            speak_output = (
+                f"Asere, ahora mismo no tengo la tasa {name}. Prueba en un ratito."
+            )
+            return handler_input.response_builder.speak(speak_output).response
+
+        codes = [currency_code] if currency_code else list(CURRENCY_NAMES)
+        quotes = [
+            f"el {CURRENCY_NAMES[code]} a {format_number(rates[code])}"
+            for code in codes
+            if code in rates
+        ]
+        if len(quotes) > 1:
+            quotes[-2:] = [f"{quotes[-2]} y {quotes[-1]}"]
+        text_output = f"{MARKET_PHRASES[market]} {', '.join(quotes)} pesos."
+
+        random_greeting = stale_note or get_random_greeting()
+        speak_output = f"{random_greeting}. {text_output}"
+
+        with tracer.span("speech.render", characters=len(speak_output)):
+            return handler_input.response_builder.speak(speak_output).response
+
+
+class RateAlertIntentHandler(RoutedRequestHandler):
+    """Handler for Rate Alert Intent ("avísame cuando el dólar pase de 400")."""
+
+    routes = ((INTENT_REQUEST, "RateAlertIntent"),)
+
+    def handle(self, handler_input: HandlerInput) -> Response:
+        """Subscribe the user to a one-off alert for a rate threshold."""
+        logger.info("Processing RateAlertIntent")
+        if rate_alerts is None:
+            speak_output = "Asere, las alertas no están disponibles ahora mismo."
+            return handler_input.response_builder.speak(speak_output).response
+
+        slots = handler_input.request_envelope.request.intent.slots or {}
+        currency_slot = slots.get("currency")
+        threshold_slot = slots.get("threshold")
+
+        if not currency_slot or not currency_slot.value:
+            speak_output = (
+                "De qué moneda quieres la alerta asere? Dime dólar, euro o M. L. C."
+            )
+            return (
+                handler_input.response_builder.speak(speak_output)
+                .ask(speak_output)
+                .response
+            )
+
+        currency_code, candidates = match_currency(currency_slot.value)
+        if candidates:
+            return ask_which_currency(handler_input, candidates)
+        if currency_code is None:
+            speak_output = (
+                f"Ni idea de lo que quieres decir compadre. "
+                f"No conozco ningún {currency_slot.value}"
+            )
+            return handler_input.response_builder.speak(speak_output).response
+
+        try:
+            threshold = float(threshold_slot.value)
+        except (AttributeError, TypeError, ValueError):
+            threshold = None
+        if threshold is None or threshold <= 0:
+            speak_output = "A cuántos pesos te aviso asere? Dime un número."
+            return (
+                handler_input.response_builder.speak(speak_output)
+                .ask(speak_output)
+                .response
+            )
+
+        rates = get_rounded_exchange_rates()
+        if rates is None:
+            speak_output = (
+                "Coño asere, tengo un problema conectándome. "
+                "Intenta de nuevo en un ratito."
+            )
+            return handler_input.response_builder.speak(speak_output).response
+
+        name = CURRENCY_NAMES[currency_code]
+        rate = format_number(rates[currency_code])
+        if threshold == rates[currency_code]:
+            speak_output = f"Asere, el {name} ya está en {rate} pesos."
+            return handler_input.response_builder.speak(speak_output).response
+
+        user_id = handler_input.request_envelope.context.system.user.user_id
+        direction = rate_alerts.subscribe(
+            user_id, currency_code, threshold, rates[currency_code]
+        )
+        if direction is None:
+            speak_output = (
+                "Asere, no pude guardar la alerta. Intenta de nuevo en un ratito."
+            )
+            return handler_input.response_builder.speak(speak_output).response
+
+        verb = "pase de" if direction == ABOVE else "baje de"
+        speak_output = (
+            f"Dale asere, te aviso cuando el {name} {verb} "
+            f"{format_number(threshold)} pesos. Ahora está en {rate}."
+        )
+        permissions = handler_input.request_envelope.context.system.user.permissions
+        if permissions is None or not permissions.consent_token:
+            speak_output += (
+                " Para recibir el aviso, activa las notificaciones de la skill "
+                "en la app de Alexa."
+            )
+            handler_input.response_builder.set_card(
+                AskForPermissionsConsentCard(permissions=[NOTIFICATIONS_PERMISSION])
+            )
         return handler_input.response_builder.speak(speak_output).response
 
 
-class WhyExchangeRateIntentHandler(AbstractRequestHandler):
+class WhyExchangeRateIntentHandler(RoutedRequestHandler):
     """Handler for Why Exchange Rate Intent."""
 
-    def can_handle(self, handler_input: HandlerInput) -> bool:
-        return ask_utils.is_intent_name("WhyExchangeRateIntent")(handler_input)
+    routes = ((INTENT_REQUEST, "WhyExchangeRateIntent"),)
 
     def handle(self, handler_input: HandlerInput) -> Response:
         """Return a random Cuban explanation for currency increase."""
@@ -243,11 +782,10 @@ class WhyExchangeRateIntentHandler(AbstractRequestHandler):
         return handler_input.response_builder.speak(speak_output).response
 
 
-class HelpIntentHandler(AbstractRequestHandler):
+class HelpIntentHandler(RoutedRequestHandler):
     """Handler for Help Intent."""
 
-    def can_handle(self, handler_input: HandlerInput) -> bool:
-        return ask_utils.is_intent_name("AMAZON.HelpIntent")(handler_input)
+    routes = ((INTENT_REQUEST, "AMAZON.HelpIntent"),)
 
     def handle(self, handler_input: HandlerInput) -> Response:
         speak_output = (
@@ -265,13 +803,13 @@ class HelpIntentHandler(AbstractRequestHandler):
         )
 
 
-class CancelOrStopIntentHandler(AbstractRequestHandler):
+class CancelOrStopIntentHandler(RoutedRequestHandler):
     """Single handler for Cancel and Stop Intent."""
 
-    def can_handle(self, handler_input: HandlerInput) -> bool:
-        return ask_utils.is_intent_name("AMAZON.CancelIntent")(
-            handler_input
-        ) or ask_utils.is_intent_name("AMAZON.StopIntent")(handler_input)
+    routes = (
+        (INTENT_REQUEST, "AMAZON.CancelIntent"),
+        (INTENT_REQUEST, "AMAZON.StopIntent"),
+    )
 
     def handle(self, handler_input: HandlerInput) -> Response:
         speak_output = "Cuidate bro!"
@@ -279,11 +817,10 @@ class CancelOrStopIntentHandler(AbstractRequestHandler):
         return handler_input.response_builder.speak(speak_output).response
 
 
-class FallbackIntentHandler(AbstractRequestHandler):
+class FallbackIntentHandler(RoutedRequestHandler):
     """Single handler for Fallback Intent."""
 
-    def can_handle(self, handler_input: HandlerInput) -> bool:
-        return ask_utils.is_intent_name("AMAZON.FallbackIntent")(handler_input)
+    routes = ((INTENT_REQUEST, "AMAZON.FallbackIntent"),)
 
     def handle(self, handler_input: HandlerInput) -> Response:
         speech = (
@@ -295,17 +832,16 @@ class FallbackIntentHandler(AbstractRequestHandler):
         return handler_input.response_builder.speak(speech).ask(reprompt).response
 
 
-class SessionEndedRequestHandler(AbstractRequestHandler):
+class SessionEndedRequestHandler(RoutedRequestHandler):
     """Handler for Session End."""
 
-    def can_handle(self, handler_input: HandlerInput) -> bool:
-        return ask_utils.is_request_type("SessionEndedRequest")(handler_input)
+    routes = (("SessionEndedRequest", None),)
 
     def handle(self, handler_input: HandlerInput) -> Response:
         return handler_input.response_builder.response
 
 
-class IntentReflectorHandler(AbstractRequestHandler):
+class IntentReflectorHandler(RoutedRequestHandler):
     """The intent reflector is used for interaction model testing and debugging.
 
     It will simply repeat the intent the user said. You can create custom
@@ -313,8 +849,7 @@ class IntentReflectorHandler(AbstractRequestHandler):
     to the request handler chain below.
     """
 
-    def can_handle(self, handler_input: HandlerInput) -> bool:
-        return ask_utils.is_request_type("IntentRequest")(handler_input)
+    routes = ((INTENT_REQUEST, None),)
 
     def handle(self, handler_input: HandlerInput) -> Response:
         intent_name = ask_utils.get_intent_name(handler_input)
@@ -347,21 +882,133 @@ class CatchAllExceptionHandler(AbstractExceptionHandler):
 
 
 # Skill builder configuration
-# Handler order matters - they're processed top to bottom
-sb = SkillBuilder()
+# Requests are dispatched through a routing table built from each handler's
+# ``routes``, so registration order does not matter
+sb = RoutingSkillBuilder(persistence_adapter=persistence_adapter)
 
 sb.add_request_handler(LaunchRequestHandler())
 sb.add_request_handler(HelpIntentHandler())
 sb.add_request_handler(ExchangeRateIntentHandler())
 sb.add_request_handler(ExchangeRateRequestIntentHandler())
 sb.add_request_handler(ConvertCurrencyIntentHandler())
+sb.add_request_handler(MyRatesIntentHandler())
+sb.add_request_handler(HistoricalRateIntentHandler())
+sb.add_request_handler(MarketRateIntentHandler())
+sb.add_request_handler(RateAlertIntentHandler())
 sb.add_request_handler(WhyExchangeRateIntentHandler())
 sb.add_request_handler(CancelOrStopIntentHandler())
 sb.add_request_handler(FallbackIntentHandler())
 sb.add_request_handler(SessionEndedRequestHandler())
-# IntentReflectorHandler must be last to avoid overriding custom handlers
+# IntentReflectorHandler only receives intents without a dedicated route
 sb.add_request_handler(IntentReflectorHandler())
 
 sb.add_exception_handler(CatchAllExceptionHandler())
 
-lambda_handler = sb.lambda_handler()
+# Every fresh fetch from the proxy is kept for historical questions, and the
+# last recorded days let a fresh container's validator catch outliers at once
+rate_cache.add_listener(rate_history.record)
+rate_cache.validator.seed = get_recent_rates
+
+# Containers share one token bucket toward the proxy and the latest snapshot
+# (UPSTREAM_RATE_LIMIT / UPSTREAM_BURST, 0 turns it off)
+rate_cache.throttle = get_upstream_throttle(persistence_adapter)
+if rate_cache.throttle is not None:
+    rate_cache.add_listener(rate_cache.throttle.publish)
+
+# Each rate change re-renders the static Flash Briefing feed (BRIEFING_ENABLED),
+# off the request path
+briefing_feed = get_briefing_feed(persistence_adapter)
+if briefing_feed is not None:
+    rate_cache.add_listener(briefing_feed.publish, background=True)
+
+# Each refresh notifies the users whose alert thresholds were reached, off the
+# request path
+if rate_alerts is not None:
+    rate_cache.add_listener(rate_alerts.evaluate, background=True)
+
+# Persistent attributes are loaded lazily and written once per request
+sb.add_global_response_interceptor(SavePersistentAttributesResponseInterceptor())
+
+# The skill's own intents skip full envelope (de)serialisation; profiling is
+# opt-in through PROFILE_ENABLED / PROFILE_SAMPLE_RATE
+skill_handler = sb.lambda_handler(
+    profiler=get_profiler(persistence_adapter),
+    fast_path_intents=(
+        "ExchangeRateIntent",
+        "ExchangeRateRequestIntent",
+        "ConvertCurrencyIntent",
+        "MyRatesIntent",
+        "HistoricalRateIntent",
+        "MarketRateIntent",
+        "WhyExchangeRateIntent",
+    ),
+)
+
+# Time kept free for Lambda to return the response after the drain
+DRAIN_MARGIN_MS = 500
+
+
+def lambda_handler(event, context):
+    """Answer an Alexa request, then drain the background listeners.
+
+    Lambda freezes the container as soon as the handler returns, so the
+    briefing feed and rate alerts queued by a refresh would otherwise wait
+    for the next invocation, or be lost with the container. Only the
+    invocation that refreshed the rates has anything to wait for, and the
+    wait is bounded by the time left before the function times out.
+    """
+    try:
+        return skill_handler(event, context)
+    finally:
+        timeout = None
+        if context is not None:
+            remaining = context.get_remaining_time_in_millis() - DRAIN_MARGIN_MS
+            timeout = max(remaining, 0) / 1000
+        if not rate_cache.wait_for_listeners(timeout):
+            logger.warning("Background rate listeners still running")
+
+
+# A HelpIntent runs through the whole SDK pipeline without fetching rates
+PRIMING_EVENT = {
+    "version": "1.0",
+    "context": {
+        "System": {
+            "application": {"applicationId": "amzn1.ask.skill.priming"},
+            "user": {"userId": "amzn1.ask.account.PRIMING"},
+            "device": {"deviceId": "amzn1.ask.device.PRIMING"},
+        }
+    },
+    "request": {
+        "type": "IntentRequest",
+        "requestId": "amzn1.echo-api.request.priming",
+        "locale": "es-US",
+        "timestamp": "2026-01-01T00:00:00Z",
+        "intent": {"name": "AMAZON.HelpIntent", "confirmationStatus": "NONE"},
+    },
+}
+
+
+def prime_container():
+    """Do during init what the first request would otherwise pay for.
+
+    Creates the S3 client, loads the bundled snapshot and the latest rates
+    (from the fleet's shared snapshot when there is one) and dispatches a
+    HelpIntent, which loads the SDK's lazily imported models and serialisers.
+    """
+    if isinstance(persistence_adapter, S3ObjectStore):
+        _ = persistence_adapter.client
+    load_bundled_snapshot()
+    get_rounded_exchange_rates()
+    lambda_handler(PRIMING_EVENT, None)
+
+
+# Pre-initialised containers (SnapStart, provisioned concurrency) prime during
+# init. Restored ones must not share connections, random state or rates
+# fetched before the snapshot with their siblings.
+before_snapshot(rate_cache.wait_for_listeners)
+before_snapshot(tracer.exporter.flush)
+after_restore(reset_session)
+after_restore(random.seed)
+after_restore(rate_cache.drop_stale)
+if is_pre_initialized():
+    prime_container()
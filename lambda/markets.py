@@ -0,0 +1,183 @@
+import contextvars
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+from codec import RATE_CODES
+from requests.adapters import HTTPAdapter
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+PROXY_URL = "https://tasa-cambio-cuba.vercel.app/api/exchange-rate"
+
+# Markets kept next to the informal mid rates, under these keys of a snapshot
+BUY = "buy"
+SELL = "sell"
+OFFICIAL = "official"
+MARKETS = (BUY, SELL, OFFICIAL)
+
+# Sources of the extra markets; a market whose variable is unset is off
+MARKET_URL_ENV = {
+    BUY: "SPREAD_RATES_URL",
+    SELL: "SPREAD_RATES_URL",
+    OFFICIAL: "OFFICIAL_RATES_URL",
+}
+
+DEFAULT_DEADLINE_SECONDS = 4.0
+
+# Reused across invocations so a warm container does not start new threads
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="markets")
+
+# Keeps connections to the proxy open between invocations; the pool has one
+# connection per fetch thread
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_maxsize=4))
+
+
+def reset_session():
+    """Close the pooled connections; the next request opens new ones.
+
+    Connections open when a container is snapshotted are dead once it is
+    restored.
+    """
+    session.close()
+
+
+def get_market_url(market):
+    """Return the configured source of a market, or None when it is off.
+
+    Buy and sell quotes come from ``SPREAD_RATES_URL`` and the official
+    rates from ``OFFICIAL_RATES_URL``. The proxy has no default for either,
+    so unconfigured markets cost no upstream request.
+    """
+    return os.environ.get(MARKET_URL_ENV[market]) or None
+
+
+def get_fetch_deadline():
+    """Return the seconds allowed to fetch every market (``RATES_DEADLINE``)."""
+    try:
+        return float(os.environ.get("RATES_DEADLINE", DEFAULT_DEADLINE_SECONDS))
+    except ValueError:
+        logger.warning("Ignoring invalid RATES_DEADLINE")
+        return DEFAULT_DEADLINE_SECONDS
+
+
+def fetch_json(url, timeout):
+    """GET a JSON document, traced as ``rates.http`` and ``rates.parse``.
+
+    Args:
+        url: Document URL
+        timeout: Seconds to wait for the connection and for each read
+
+    Returns:
+        Parsed JSON document
+
+    Raises:
+        requests.RequestException: If the request fails
+        ValueError: If the body is not JSON
+    """
+    with tracer.span("rates.http", url=url) as span:
+        response = session.get(url, timeout=timeout)
+        if span.recording:
+            # Elapsed covers connect, TLS, send and waiting for headers
+            span.set_attribute("http.status_code", response.status_code)
+            span.set_attribute(
+                "http.headers_ms", response.elapsed.total_seconds() * 1000
+            )
+        response.raise_for_status()
+    with tracer.span("rates.parse"):
+        return response.json()
+
+
+def parse_rates(data):
+    """Return the rates of a proxy document keyed by lowercase currency code.
+
+    Currencies the document does not quote are left out.
+    """
+    return {
+        code: float(data[code.lower()])
+        for code in RATE_CODES
+        if data.get(code.lower()) is not None
+    }
+
+
+def get_official_rates(timeout=DEFAULT_DEADLINE_SECONDS):
+    """Fetch the official Banco Central de Cuba rates (``OFFICIAL_RATES_URL``).
+
+    Returns:
+        dict: ``{"official": rates}``, or None if the request fails or the
+        market is not configured
+    """
+    url = get_market_url(OFFICIAL)
+    if url is None:
+        return None
+    try:
+        rates = parse_rates(fetch_json(url, timeout))
+    except (requests.RequestException, AttributeError, TypeError, ValueError) as e:
+        logger.error(f"Error fetching official rates: {e}")
+        return None
+    return {OFFICIAL: rates} if rates else None
+
+
+def get_spread_rates(timeout=DEFAULT_DEADLINE_SECONDS):
+    """Fetch informal buy and sell quotes (``SPREAD_RATES_URL``).
+
+    The document holds ``{"usd": {"buy": ..., "sell": ...}, ...}``.
+
+    Returns:
+        dict: ``{"buy": rates, "sell": rates}``, or None if the request fails
+        or the market is not configured
+    """
+    url = get_market_url(BUY)
+    if url is None:
+        return None
+    try:
+        data = fetch_json(url, timeout)
+        quotes = {
+            side: parse_rates(
+                {currency: quote.get(side) for currency, quote in data.items()}
+            )
+            for side in (BUY, SELL)
+        }
+    except (requests.RequestException, AttributeError, TypeError, ValueError) as e:
+        logger.error(f"Error fetching buy and sell rates: {e}")
+        return None
+    return {side: rates for side, rates in quotes.items() if rates} or None
+
+
+def fetch_concurrently(fetchers, deadline):
+    """Call fetchers in parallel and collect whatever arrives before a deadline.
+
+    Each fetcher is called with ``timeout=deadline`` in its own thread, with
+    the caller's tracing context. Fetchers still running at the deadline are
+    left to finish in the background and their results are dropped.
+
+    Args:
+        fetchers: Callables taking a ``timeout`` and returning a result or None
+        deadline: Seconds to wait for all of them
+
+    Returns:
+        list: One result per fetcher, None for failed or late ones
+    """
+    with tracer.span("rates.markets", deadline=deadline) as span:
+        futures = [
+            _executor.submit(contextvars.copy_context().run, fetch, timeout=deadline)
+            for fetch in fetchers
+        ]
+        done, _ = wait(futures, timeout=deadline)
+
+        results = []
+        for fetch, future in zip(fetchers, futures):
+            name = getattr(fetch, "__name__", repr(fetch))
+            if future not in done:
+                logger.warning(f"{name} missed the {deadline}s deadline")
+                results.append(None)
+            elif future.exception() is not None:
+                logger.error(f"{name} failed: {future.exception()}")
+                results.append(None)
+            else:
+                results.append(future.result())
+        span.set_attribute("markets.missing", sum(result is None for result in results))
+        return results
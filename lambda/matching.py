@@ -0,0 +1,135 @@
+import re
+import unicodedata
+from collections import defaultdict
+
+DEFAULT_NGRAM_SIZE = 3
+DEFAULT_THRESHOLD = 0.45
+DEFAULT_AMBIGUITY_MARGIN = 0.1
+# Aliases this short are codes ('usd', 'cuc'); 'usdt' is not a typo of them
+MIN_FUZZY_ALIAS_LENGTH = 4
+# Words that may come with a value without being part of it ('el euro')
+FILLER_WORDS = frozenset({"el", "la", "los", "las", "de", "del"})
+
+NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text):
+    """Lowercase, strip accents and punctuation, and collapse whitespace.
+
+    'Dólares' becomes 'dolares' and 'U. S. D.' becomes 'u s d'.
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return NON_ALPHANUMERIC.sub(" ", stripped).strip()
+
+
+def get_ngrams(text, size=DEFAULT_NGRAM_SIZE):
+    """Return the set of character n-grams of normalized text.
+
+    The text is padded with a space on each side, so the first and last
+    letters weigh as much as the ones in the middle.
+    """
+    padded = f" {text} "
+    return {padded[i : i + size] for i in range(max(len(padded) - size + 1, 1))}
+
+
+class AliasMatcher:
+    """Nearest-match lookup of spoken values in a fixed alias vocabulary.
+
+    Aliases are normalized and split into character n-grams once, in an
+    inverted index from n-gram to aliases. A lookup only scores the aliases
+    that share an n-gram with the value, using the Dice coefficient of the
+    two n-gram sets, and keeps the best score per target.
+
+    Short aliases such as currency codes only match exactly. A value of
+    several words only matches when each word is close to a word of the
+    vocabulary, so 'dólar canadiense' is not taken for 'dólar'.
+
+    Args:
+        aliases: Dict of alias to target, e.g. 'dólares' to 'USD'
+        size: Characters per n-gram
+        threshold: Lowest score accepted as a match, 0 to 1
+        ambiguity_margin: A runner-up target scoring within this margin of
+            the best one makes the value ambiguous
+    """
+
+    def __init__(
+        self,
+        aliases,
+        size=DEFAULT_NGRAM_SIZE,
+        threshold=DEFAULT_THRESHOLD,
+        ambiguity_margin=DEFAULT_AMBIGUITY_MARGIN,
+    ):
+        self.size = size
+        self.threshold = threshold
+        self.ambiguity_margin = ambiguity_margin
+        self.exact = {normalize(alias): target for alias, target in aliases.items()}
+        fuzzy = [alias for alias in self.exact if len(alias) >= MIN_FUZZY_ALIAS_LENGTH]
+        self._targets = [self.exact[alias] for alias in fuzzy]
+        self._words = {
+            word: get_ngrams(word, size) for alias in fuzzy for word in alias.split()
+        }
+        self._gram_counts = []
+        self._index = defaultdict(list)
+        for alias_id, alias in enumerate(fuzzy):
+            grams = get_ngrams(alias, size)
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._index[gram].append(alias_id)
+
+    def match(self, value):
+        """Find the target a spoken value most likely means.
+
+        Args:
+            value: Slot value as heard, e.g. 'dolares' or 'fulas'
+
+        Returns:
+            tuple: (target or None, candidates). The target is set for an
+            exact or confident match. Otherwise candidates lists the
+            targets the value is ambiguous between, best first, and is
+            empty when nothing is close enough.
+        """
+        text = normalize(value or "")
+        if text in self.exact:
+            return self.exact[text], []
+
+        words = [word for word in text.split() if word not in FILLER_WORDS]
+        if len(words) > 1 and not all(self._is_known_word(word) for word in words):
+            return None, []
+
+        grams = get_ngrams(text, self.size)
+        shared = defaultdict(int)
+        for gram in grams:
+            for alias_id in self._index.get(gram, ()):
+                shared[alias_id] += 1
+
+        scores = {}
+        for alias_id, count in shared.items():
+            score = 2 * count / (len(grams) + self._gram_counts[alias_id])
+            target = self._targets[alias_id]
+            scores[target] = max(score, scores.get(target, 0))
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        ranked = [
+            (target, score) for target, score in ranked if score >= self.threshold
+        ]
+        if not ranked:
+            return None, []
+
+        best_score = ranked[0][1]
+        close = [
+            target
+            for target, score in ranked
+            if best_score - score < self.ambiguity_margin
+        ]
+        if len(close) > 1:
+            return None, close
+        return ranked[0][0], []
+
+    def _is_known_word(self, word):
+        grams = get_ngrams(word, self.size)
+        return any(
+            2 * len(grams & word_grams) / (len(grams) + len(word_grams))
+            >= self.threshold
+            for word_grams in self._words.values()
+        )
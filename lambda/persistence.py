@@ -0,0 +1,372 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+import boto3
+from ask_sdk_core.attributes_manager import AbstractPersistenceAdapter
+from ask_sdk_core.dispatch_components.request_components import (
+    AbstractResponseInterceptor,
+)
+from ask_sdk_core.exceptions import AttributesManagerException
+from botocore.exceptions import BotoCoreError, ClientError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERSISTENCE_DIR = "/tmp/tasa-cambio-attributes"
+KEY_PREFIX = "users/"
+CONDITIONAL_WRITE_CONFLICTS = ("PreconditionFailed", "ConditionalRequestConflict")
+
+FAVORITE_CURRENCY = "favorite_currency"
+DEFAULT_AMOUNT = "default_amount"
+LAST_RATES = "last_rates"
+
+# Failures of the store that must not cost the user their answer
+PERSISTENCE_ERRORS = (
+    AttributesManagerException,
+    ClientError,
+    BotoCoreError,
+    OSError,
+    ValueError,
+)
+
+
+class TrackedAttributes(dict):
+    """Dict of persistent attributes that remembers which keys changed.
+
+    Only assignments that actually change a value mark the key as dirty, so
+    handlers can record the same preference on every turn without causing
+    a write.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dirty_keys = set()
+
+    @property
+    def dirty(self):
+        return bool(self.dirty_keys)
+
+    def mark_clean(self):
+        self.dirty_keys.clear()
+
+    def __setitem__(self, key, value):
+        if key not in self or self[key] != value:
+            self.dirty_keys.add(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.dirty_keys.add(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *args):
+        if key in self:
+            self.dirty_keys.add(key)
+        return super().pop(key, *args)
+
+    def clear(self):
+        self.dirty_keys.update(self.keys())
+        super().clear()
+
+
+def get_user_key(request_envelope):
+    """Build the storage key for the user behind a request.
+
+    Alexa user ids are long and contain characters that are awkward in file
+    names, so they are hashed into a stable key.
+
+    Args:
+        request_envelope: Request envelope from the Alexa service
+
+    Returns:
+        str: Storage key for the user's attributes
+    """
+    user_id = request_envelope.context.system.user.user_id
+    digest = hashlib.sha256(user_id.encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}{digest}.json"
+
+
+class S3ObjectStore:
+    """Documents stored as objects in the skill's S3 bucket.
+
+    Args:
+        bucket_name: S3 bucket holding the documents
+        region_name: AWS region of the bucket
+    """
+
+    def __init__(self, bucket_name, region_name=None):
+        self.bucket_name = bucket_name
+        self.region_name = region_name
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = boto3.client("s3", region_name=self.region_name)
+        return self._client
+
+    def read_bytes(self, key):
+        """Return the raw object stored under ``key``, or None."""
+        try:
+            response = self.client.get_object(Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+        return response["Body"].read()
+
+    def write_bytes(self, key, data, content_type="application/octet-stream"):
+        """Store raw bytes under ``key``."""
+        self.client.put_object(
+            Bucket=self.bucket_name, Key=key, Body=data, ContentType=content_type
+        )
+
+    def read_versioned(self, key):
+        """Return the raw object under ``key`` and its ETag, or (None, None)."""
+        try:
+            response = self.client.get_object(Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None, None
+            raise
+        return response["Body"].read(), response["ETag"]
+
+    def write_if_version(self, key, data, version):
+        """Store raw bytes only if the object is still at ``version``.
+
+        Args:
+            key: Object key
+            data: Bytes to store
+            version: ETag from ``read_versioned``, or None if the object
+                must not exist yet
+
+        Returns:
+            bool: True if written, False if another writer got there first
+        """
+        condition = {"IfNoneMatch": "*"} if version is None else {"IfMatch": version}
+        try:
+            self.client.put_object(
+                Bucket=self.bucket_name, Key=key, Body=data, **condition
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in CONDITIONAL_WRITE_CONFLICTS:
+                return False
+            raise
+        return True
+
+    def read(self, key):
+        """Return the document stored under ``key``, or {} if there is none."""
+        data = self.read_bytes(key)
+        return {} if data is None else json.loads(data)
+
+    def write(self, key, data):
+        """Store ``data`` as a JSON document under ``key``."""
+        self.write_bytes(
+            key, json.dumps(data).encode("utf-8"), content_type="application/json"
+        )
+
+    def delete(self, key):
+        """Remove the document stored under ``key``."""
+        self.client.delete_object(Bucket=self.bucket_name, Key=key)
+
+    def list_keys(self, prefix):
+        """Return the sorted keys of all documents starting with ``prefix``."""
+        keys = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            keys.extend(item["Key"] for item in page.get("Contents", []))
+        return sorted(keys)
+
+
+class FileSystemObjectStore:
+    """Documents stored as files in a local directory.
+
+    Used for local development and tests where S3 is not available.
+
+    Args:
+        directory: Root directory; keys map to paths below it
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def _path(self, key):
+        return self.directory / key
+
+    def read_bytes(self, key):
+        """Return the raw file stored under ``key``, or None."""
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def write_bytes(self, key, data, content_type=None):
+        """Atomically store raw bytes under ``key``."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+
+    def read_versioned(self, key):
+        """Return the raw file under ``key`` and a digest of it, or (None, None)."""
+        data = self.read_bytes(key)
+        if data is None:
+            return None, None
+        return data, hashlib.sha256(data).hexdigest()
+
+    def write_if_version(self, key, data, version):
+        """Store raw bytes only if the file is still at ``version``.
+
+        An exclusive lock on a sibling ``.lock`` file serializes writers, so
+        processes sharing the directory behave like conditional S3 writes.
+
+        Args:
+            key: File key
+            data: Bytes to store
+            version: Digest from ``read_versioned``, or None if the file must
+                not exist yet
+
+        Returns:
+            bool: True if written, False if another writer got there first
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path.with_name(path.name + ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if self.read_versioned(key)[1] != version:
+                    return False
+                self.write_bytes(key, data)
+                return True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read(self, key):
+        """Return the document stored under ``key``, or {} if there is none."""
+        data = self.read_bytes(key)
+        return {} if data is None else json.loads(data)
+
+    def write(self, key, data):
+        """Atomically store ``data`` as a JSON document under ``key``."""
+        self.write_bytes(key, json.dumps(data).encode("utf-8"))
+
+    def delete(self, key):
+        """Remove the document stored under ``key``."""
+        self._path(key).unlink(missing_ok=True)
+
+    def list_keys(self, prefix):
+        """Return the sorted keys of all documents starting with ``prefix``."""
+        if not self.directory.exists():
+            return []
+        keys = (
+            path.relative_to(self.directory).as_posix()
+            for path in self.directory.rglob("*")
+            if path.is_file() and path.suffix not in (".tmp", ".lock")
+        )
+        return sorted(key for key in keys if key.startswith(prefix))
+
+
+class BasePersistenceAdapter(AbstractPersistenceAdapter):
+    """Persistence adapter that skips writes when nothing changed.
+
+    Combined with an object store providing ``read``, ``write`` and
+    ``delete`` of a JSON document for a storage key.
+    """
+
+    def get_attributes(self, request_envelope):
+        data = self.read(get_user_key(request_envelope))
+        return TrackedAttributes(data or {})
+
+    def save_attributes(self, request_envelope, attributes):
+        if isinstance(attributes, TrackedAttributes) and not attributes.dirty:
+            logger.debug("Persistent attributes unchanged, skipping write")
+            return
+
+        self.write(get_user_key(request_envelope), dict(attributes))
+
+        if isinstance(attributes, TrackedAttributes):
+            attributes.mark_clean()
+
+    def delete_attributes(self, request_envelope):
+        self.delete(get_user_key(request_envelope))
+
+
+class S3PersistenceAdapter(S3ObjectStore, BasePersistenceAdapter):
+    """Store user attributes as JSON objects in the skill's S3 bucket."""
+
+
+class FileSystemPersistenceAdapter(FileSystemObjectStore, BasePersistenceAdapter):
+    """Store user attributes as JSON files in a local directory."""
+
+
+def get_persistence_adapter():
+    """Create the persistence adapter configured by the environment.
+
+    Uses S3 when ``S3_PERSISTENCE_BUCKET`` is set (Alexa-hosted skills),
+    otherwise falls back to the local directory in ``PERSISTENCE_DIR``.
+
+    Returns:
+        BasePersistenceAdapter: Adapter for the skill builder
+    """
+    bucket_name = os.environ.get("S3_PERSISTENCE_BUCKET")
+    if bucket_name:
+        return S3PersistenceAdapter(
+            bucket_name, region_name=os.environ.get("S3_PERSISTENCE_REGION")
+        )
+
+    return FileSystemPersistenceAdapter(
+        os.environ.get("PERSISTENCE_DIR", DEFAULT_PERSISTENCE_DIR)
+    )
+
+
+def get_preferences(handler_input):
+    """Return the user's stored preferences, loading them on first access.
+
+    Args:
+        handler_input: Handler input for the current request
+
+    Returns:
+        dict: Persistent attributes, or an empty dict if persistence is
+        not configured or the store cannot be read
+    """
+    try:
+        return handler_input.attributes_manager.persistent_attributes
+    except PERSISTENCE_ERRORS as e:
+        logger.warning(f"Persistence unavailable: {e}")
+        return {}
+
+
+def remember_preferences(handler_input, **values):
+    """Record preferences for the user; unchanged values are not rewritten.
+
+    Args:
+        handler_input: Handler input for the current request
+        **values: Preference names and their new values
+    """
+    get_preferences(handler_input).update(values)
+
+
+class SavePersistentAttributesResponseInterceptor(AbstractResponseInterceptor):
+    """Flush persistent attributes once, after the handler has responded.
+
+    Attributes that were never loaded are not touched, and adapters derived
+    from ``BasePersistenceAdapter`` skip the write when nothing changed.
+    """
+
+    def process(self, handler_input, response):
+        try:
+            handler_input.attributes_manager.save_persistent_attributes()
+        except PERSISTENCE_ERRORS as e:
+            logger.error(f"Error saving persistent attributes: {e}")
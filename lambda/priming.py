@@ -0,0 +1,81 @@
+import logging
+import os
+
+from utils import get_env_flag
+
+try:
+    # Only present in Lambda runtimes with SnapStart
+    import snapshot_restore_py
+except ImportError:
+    snapshot_restore_py = None
+
+logger = logging.getLogger(__name__)
+
+INITIALIZATION_TYPE_ENV = "AWS_LAMBDA_INITIALIZATION_TYPE"
+PRE_INITIALIZED_TYPES = ("snap-start", "provisioned-concurrency")
+
+_before_snapshot_hooks = []
+_after_restore_hooks = []
+
+
+def is_pre_initialized():
+    """Return True if this container is initialised ahead of its requests.
+
+    SnapStart and provisioned concurrency run init long before the first
+    request, so work done there is off the request path. ``PRIME_ON_INIT``
+    overrides the detection either way.
+    """
+    pre_initialized = os.environ.get(INITIALIZATION_TYPE_ENV) in PRE_INITIALIZED_TYPES
+    return get_env_flag("PRIME_ON_INIT", default=pre_initialized)
+
+
+def before_snapshot(hook):
+    """Register ``hook()`` to run before the container is snapshotted."""
+    _before_snapshot_hooks.append(hook)
+    return hook
+
+
+def after_restore(hook):
+    """Register ``hook()`` to run after the container is restored."""
+    _after_restore_hooks.append(hook)
+    return hook
+
+
+def _run(hooks, phase):
+    failed = 0
+    for hook in hooks:
+        try:
+            hook()
+        except Exception as e:
+            failed += 1
+            logger.error(f"{phase} hook {hook!r} failed: {e}", exc_info=True)
+    return failed
+
+
+def run_before_snapshot():
+    """Run the before-snapshot hooks in registration order.
+
+    Called by the platform, or directly to exercise the hooks locally. A
+    failing hook is logged and does not stop the others.
+
+    Returns:
+        int: Number of hooks that failed
+    """
+    return _run(_before_snapshot_hooks, "Before-snapshot")
+
+
+def run_after_restore():
+    """Run the after-restore hooks in registration order.
+
+    Called by the platform, or directly to exercise the hooks locally. A
+    failing hook is logged and does not stop the others.
+
+    Returns:
+        int: Number of hooks that failed
+    """
+    return _run(_after_restore_hooks, "After-restore")
+
+
+if snapshot_restore_py is not None:
+    snapshot_restore_py.register_before_snapshot(run_before_snapshot)
+    snapshot_restore_py.register_after_restore(run_after_restore)
@@ -0,0 +1,149 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import time
+import tracemalloc
+
+from persistence import FileSystemObjectStore
+from utils import get_env_flag
+
+logger = logging.getLogger(__name__)
+
+PROFILE_PREFIX = "profiles/"
+DEFAULT_TOP_FUNCTIONS = 25
+DEFAULT_TOP_ALLOCATIONS = 15
+
+UNSAFE_KEY_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def get_request_labels(event):
+    """Return the request id and intent (or request type) of a raw event.
+
+    Args:
+        event: Raw request envelope dict
+
+    Returns:
+        tuple: (request id, intent name or request type), safe for keys
+    """
+    request = event.get("request") or {}
+    request_id = request.get("requestId") or "unknown-request"
+    intent = (request.get("intent") or {}).get("name") or request.get("type")
+    return (
+        UNSAFE_KEY_CHARS.sub("_", request_id),
+        UNSAFE_KEY_CHARS.sub("_", intent or "unknown"),
+    )
+
+
+class InvocationProfiler:
+    """Profile sampled invocations with cProfile and tracemalloc.
+
+    Each profiled invocation writes one text report with the slowest
+    functions and the largest allocations to
+    ``profiles/<intent>/<request id>.txt`` in the given store.
+
+    Args:
+        store: Object store with ``write_bytes``
+        sample_rate: Fraction of invocations to profile, 0 to 1
+        top_functions: Functions listed, by cumulative time
+        top_allocations: Source lines listed, by allocated size
+    """
+
+    def __init__(
+        self,
+        store,
+        sample_rate=1.0,
+        top_functions=DEFAULT_TOP_FUNCTIONS,
+        top_allocations=DEFAULT_TOP_ALLOCATIONS,
+    ):
+        self.store = store
+        self.sample_rate = sample_rate
+        self.top_functions = top_functions
+        self.top_allocations = top_allocations
+
+    def should_profile(self):
+        """Return True if the next invocation is sampled."""
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def run(self, handler, event, context):
+        """Call ``handler(event, context)`` under the profilers.
+
+        The report is written even if the handler raises.
+        """
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            return profile.runcall(handler, event, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            self._save(event, profile, snapshot, elapsed_ms, peak)
+
+    def render(self, request_id, intent, profile, snapshot, elapsed_ms, peak):
+        """Return the text report of one profiled invocation."""
+        output = io.StringIO()
+        output.write(
+            f"request {request_id} intent {intent} "
+            f"wall {elapsed_ms:.1f} ms peak {peak / 1024:.1f} KiB\n\n"
+        )
+
+        stats = pstats.Stats(profile, stream=output)
+        stats.strip_dirs().sort_stats("cumulative").print_stats(self.top_functions)
+
+        output.write(f"Top {self.top_allocations} allocations by line:\n")
+        for stat in snapshot.statistics("lineno")[: self.top_allocations]:
+            output.write(f"{stat}\n")
+        return output.getvalue()
+
+    def _save(self, event, profile, snapshot, elapsed_ms, peak):
+        request_id, intent = get_request_labels(event)
+        key = f"{PROFILE_PREFIX}{intent}/{request_id}.txt"
+        try:
+            report = self.render(
+                request_id, intent, profile, snapshot, elapsed_ms, peak
+            )
+            self.store.write_bytes(key, report.encode("utf-8"), "text/plain")
+        except Exception as e:
+            # Diagnostics must never cost the invocation its response
+            logger.error(f"Could not save profile {key}: {e}")
+            return
+        logger.info(f"Saved profile {key} ({elapsed_ms:.1f} ms)")
+
+
+def get_profiler(store):
+    """Create the profiler configured by the environment.
+
+    ``PROFILE_ENABLED`` profiles every invocation; otherwise
+    ``PROFILE_SAMPLE_RATE`` (0 to 1) profiles that fraction of invocations.
+    Reports go to ``PROFILE_DIR`` when set, else to ``store``.
+
+    Args:
+        store: Default object store for reports, e.g. the persistence adapter
+
+    Returns:
+        InvocationProfiler: Profiler, or None when profiling is off
+    """
+    if get_env_flag("PROFILE_ENABLED", default=False):
+        sample_rate = 1.0
+    else:
+        try:
+            sample_rate = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+        except ValueError:
+            logger.warning("Ignoring invalid PROFILE_SAMPLE_RATE")
+            sample_rate = 0.0
+    if sample_rate <= 0:
+        return None
+
+    profile_dir = os.environ.get("PROFILE_DIR")
+    if profile_dir:
+        store = FileSystemObjectStore(profile_dir)
+    return InvocationProfiler(store, sample_rate=sample_rate)
@@ -0,0 +1,225 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from tracing import tracer
+from validation import RateValidator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 300
+
+
+class RateCache:
+    """Thread-safe in-process cache for the latest exchange rates.
+
+    One instance lives per process (a Lambda container or a web-service
+    worker) and is shared by all threads in it. Concurrent misses are
+    collapsed so only one thread calls the upstream proxy at a time.
+
+    With a validator, fetched snapshots it quarantines are discarded and the
+    previous snapshot is served for another TTL instead.
+
+    With a throttle, a miss first looks for a fresh snapshot shared by the
+    rest of the fleet, and only calls the upstream proxy if it gets a token
+    from the shared bucket. Without a token, the newest snapshot at hand is
+    served for another TTL. A failing throttle lets the call through.
+
+    Listeners run after the lock is released. Background listeners run in
+    order on one worker thread, so slow I/O never delays the request that
+    fetched the rates.
+
+    Args:
+        ttl: Seconds a fetched snapshot is considered fresh
+        clock: Monotonic clock, injectable for tests
+        wall_clock: Wall clock, used to age the snapshot across a restore
+        validator: Optional ``RateValidator`` for fetched snapshots
+        throttle: Optional ``UpstreamThrottle`` shared by the fleet
+    """
+
+    def __init__(
+        self,
+        ttl=DEFAULT_TTL_SECONDS,
+        clock=time.monotonic,
+        validator=None,
+        throttle=None,
+        wall_clock=time.time,
+    ):
+        self.ttl = ttl
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.validator = validator
+        self.throttle = throttle
+        self._lock = threading.Lock()
+        self._rates = None
+        self._fetched_at = None
+        self._fetched_wall = None
+        self._listeners = []
+        self._background = None
+
+    def add_listener(self, listener, background=False):
+        """Call ``listener(rates)`` after every successful upstream fetch.
+
+        Listeners run on the fetching thread, once the lock is released.
+        With ``background``, the call is queued on a worker thread instead,
+        for listeners doing slow I/O such as publishing or notifying. Errors
+        are logged and do not affect the fetched rates.
+        """
+        self._listeners.append((listener, background))
+
+    def wait_for_listeners(self, timeout=None):
+        """Wait until the queued background listeners have run.
+
+        Args:
+            timeout: Seconds to wait, or None to wait for as long as it takes
+
+        Returns:
+            bool: True if the queue is empty
+        """
+        if self._background is None:
+            return True
+        try:
+            self._background.submit(lambda: None).result(timeout)
+        except FutureTimeoutError:
+            return False
+        return True
+
+    def get(self):
+        """Return the cached rates if still fresh, otherwise None."""
+        rates, fetched_at = self._rates, self._fetched_at
+        if rates is None or self.clock() - fetched_at >= self.ttl:
+            return None
+        return rates
+
+    def set(self, rates, age=0):
+        """Store a snapshot fetched ``age`` seconds ago."""
+        self._rates, self._fetched_at = rates, self.clock() - age
+        self._fetched_wall = self.wall_clock() - age
+
+    def clear(self):
+        """Drop the cached snapshot."""
+        self._rates, self._fetched_at, self._fetched_wall = None, None, None
+
+    def drop_stale(self):
+        """Drop the snapshot if the wall clock says it outlived the TTL.
+
+        The monotonic clock does not count the time a container spends
+        snapshotted, so after a restore only the wall clock can tell how old
+        the snapshot is. Dropping it also stops it being served as a stale
+        fallback.
+
+        Returns:
+            bool: True if a snapshot was dropped
+        """
+        with self._lock:
+            if self._rates is None:
+                return False
+            if self.wall_clock() - self._fetched_wall < self.ttl:
+                return False
+            self.clear()
+            return True
+
+    def get_or_fetch(self, fetch):
+        """Return fresh cached rates, calling ``fetch`` on a miss.
+
+        Failed fetches (``fetch`` returning None) are not cached. Rejected
+        snapshots fall back to the previous one, if any.
+
+        Args:
+            fetch: Callable returning a rates dict or None
+
+        Returns:
+            dict: Exchange rates, or None if the fetch failed
+        """
+        with tracer.span("rates.cache") as span:
+            rates = self.get()
+            if rates is not None:
+                span.set_attribute("cache.tier", "memory")
+                return rates
+
+            rates, fresh = self._refresh(fetch, span)
+            if fresh:
+                self._notify(rates)
+            return rates
+
+    def _refresh(self, fetch, span):
+        """Return ``(rates, fresh)``, fetching under the lock on a miss.
+
+        ``fresh`` is True only for a snapshot just accepted from upstream.
+        """
+        with self._lock:
+            rates = self.get()
+            if rates is not None:
+                span.set_attribute("cache.tier", "memory")
+                return rates, False
+
+            if self.throttle is not None:
+                shared, age, allowed = self._check_throttle()
+                if shared is not None and age < self.ttl:
+                    span.set_attribute("cache.tier", "shared")
+                    self.set(shared, age)
+                    return shared, False
+
+                if not allowed:
+                    rates = shared or self._rates
+                    span.set_attribute("cache.tier", "throttled")
+                    if rates is not None:
+                        self.set(rates)
+                    return rates, False
+
+            rates = fetch()
+            if rates is None:
+                span.set_attribute("cache.tier", "none")
+                return None, False
+
+            if self.validator is not None and not self.validator.accept(rates):
+                rates = self._rates
+                span.set_attribute("cache.tier", "quarantined")
+                if rates is not None:
+                    self.set(rates)
+                return rates, False
+
+            span.set_attribute("cache.tier", "upstream")
+            self.set(rates)
+            return rates, True
+
+    def _check_throttle(self):
+        """Return ``(shared, age, allowed)`` from the throttle.
+
+        ``allowed`` is True if the upstream proxy may be called; a throttle
+        that fails allows the call.
+        """
+        try:
+            shared, age = self.throttle.read_shared()
+            if shared is not None and age < self.ttl:
+                return shared, age, False
+            return shared, age, self.throttle.acquire()
+        except Exception as e:
+            logger.error(f"Upstream throttle failed, allowing the call: {e}")
+            return None, None, True
+
+    def _notify(self, rates):
+        for listener, background in self._listeners:
+            if background:
+                if self._background is None:
+                    self._background = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="rate-listeners"
+                    )
+                self._background.submit(self._call, listener, rates)
+            else:
+                self._call(listener, rates)
+
+    def _call(self, listener, rates):
+        try:
+            listener(rates)
+        except Exception as e:
+            logger.error(f"Rate listener {listener!r} failed: {e}", exc_info=True)
+
+
+rate_cache = RateCache(
+    ttl=float(os.environ.get("RATES_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+    validator=RateValidator(),
+)
@@ -0,0 +1,154 @@
+import json
+
+from ask_sdk_core.dispatch_components.request_components import AbstractRequestHandler
+from ask_sdk_core.skill_builder import CustomSkillBuilder
+from ask_sdk_model import RequestEnvelope
+from ask_sdk_runtime.dispatch_components.request_components import (
+    AbstractRequestMapper,
+)
+from fast_path import FastPath, is_fast_path_enabled
+from tracing import tracer
+
+INTENT_REQUEST = "IntentRequest"
+
+
+def get_route_key(request):
+    """Return the routing key for an incoming request.
+
+    Args:
+        request: Request object from the request envelope
+
+    Returns:
+        tuple: ``(request_type, intent_name)``; intent name is None for
+        non-intent requests
+    """
+    request_type = request.object_type
+    if request_type == INTENT_REQUEST:
+        return request_type, request.intent.name
+    return request_type, None
+
+
+class RoutedRequestHandler(AbstractRequestHandler):
+    """Request handler whose ``can_handle`` is derived from its ``routes``.
+
+    Subclasses only declare ``routes``, so the routing table and the SDK's
+    linear ``can_handle`` dispatch can never disagree.
+    """
+
+    routes = ()
+
+    def can_handle(self, handler_input):
+        request_type, intent_name = get_route_key(
+            handler_input.request_envelope.request
+        )
+        routes = self.routes
+        return (request_type, intent_name) in routes or (request_type, None) in routes
+
+
+class RoutingRequestMapper(AbstractRequestMapper):
+    """Request mapper that dispatches with a single dict lookup.
+
+    Handlers declare the requests they serve in a ``routes`` class
+    attribute, a tuple of ``(request_type, intent_name)`` pairs. An intent
+    name of None registers the handler for every request of that type that
+    has no more specific route (e.g. ``IntentReflectorHandler``), so
+    registration order does not matter. Handlers without ``routes`` are
+    checked with ``can_handle`` after a table miss.
+
+    Args:
+        request_handler_chains: List of GenericRequestHandlerChain instances
+    """
+
+    def __init__(self, request_handler_chains):
+        self.routes = {}
+        self.unrouted_chains = []
+
+        for chain in request_handler_chains:
+            routes = getattr(chain.request_handler, "routes", None)
+            if not routes:
+                self.unrouted_chains.append(chain)
+                continue
+            for route in routes:
+                if route in self.routes:
+                    raise ValueError(f"Duplicate route {route}")
+                self.routes[route] = chain
+
+    def get_request_handler_chain(self, handler_input):
+        request_type, intent_name = get_route_key(
+            handler_input.request_envelope.request
+        )
+
+        chain = self.routes.get((request_type, intent_name))
+        if chain is None and intent_name is not None:
+            chain = self.routes.get((request_type, None))
+        if chain is not None:
+            return chain
+
+        for chain in self.unrouted_chains:
+            if chain.request_handler.can_handle(handler_input=handler_input):
+                return chain
+        return None
+
+
+class RoutingSkillBuilder(CustomSkillBuilder):
+    """Skill builder that uses ``RoutingRequestMapper`` for dispatch.
+
+    The skill and its routing table are built once, when ``lambda_handler``
+    is called at import, instead of on every invocation. Intents listed in
+    ``fast_path_intents`` are served from the raw event by ``FastPath``
+    unless ``FAST_PATH_ENABLED`` is off. With a ``profiler``, sampled
+    invocations run under it.
+    """
+
+    @property
+    def skill_configuration(self):
+        configuration = super().skill_configuration
+        configuration.request_mappers = [
+            RoutingRequestMapper(
+                self.runtime_configuration_builder.request_handler_chains
+            )
+        ]
+        return configuration
+
+    def lambda_handler(self, fast_path_intents=(), profiler=None):
+        skill = self.create()
+        fast_path = FastPath(skill, fast_path_intents)
+        if not (fast_path_intents and is_fast_path_enabled() and fast_path.supports()):
+            fast_path = None
+
+        def dispatch(event, context, span):
+            if fast_path is not None:
+                response_envelope = fast_path.invoke(event, context)
+                if response_envelope is not None:
+                    span.set_attribute("dispatch.path", "fast")
+                    return response_envelope
+
+            span.set_attribute("dispatch.path", "full")
+            request_envelope = skill.serializer.deserialize(
+                payload=json.dumps(event), obj_type=RequestEnvelope
+            )
+            response_envelope = skill.invoke(
+                request_envelope=request_envelope, context=context
+            )
+            return skill.serializer.serialize(response_envelope)
+
+        def handle(event, context):
+            with tracer.start_trace("lambda_handler") as span:
+                if span.recording:
+                    request = event.get("request") or {}
+                    span.set_attribute("request.id", request.get("requestId"))
+                    span.set_attribute("request.type", request.get("type"))
+                    span.set_attribute(
+                        "intent", (request.get("intent") or {}).get("name")
+                    )
+                return dispatch(event, context, span)
+
+        if profiler is None:
+            return handle
+
+        def wrapper(event, context):
+            if profiler.should_profile():
+                return profiler.run(handle, event, context)
+            return handle(event, context)
+
+        return wrapper
@@ -0,0 +1,100 @@
+"""Last-known-good exchange rate snapshot bundled with the deployment.
+
+Refresh it at build time so a cold container can still answer when the
+proxy is unreachable:
+
+    python lambda/snapshot.py
+"""
+
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+
+from codec import RATE_CODES
+from utils import get_exchange_rates
+
+SNAPSHOT_PATH = Path(__file__).parent / "rates_snapshot.json"
+
+MONTHS = [
+    "enero",
+    "febrero",
+    "marzo",
+    "abril",
+    "mayo",
+    "junio",
+    "julio",
+    "agosto",
+    "septiembre",
+    "octubre",
+    "noviembre",
+    "diciembre",
+]
+
+
+def format_spanish_date(date):
+    """Format a date the way it is spoken, e.g. '19 de octubre de 2026'.
+
+    Args:
+        date: datetime.date or datetime.datetime
+
+    Returns:
+        str: Spoken Spanish date
+    """
+    return f"{date.day} de {MONTHS[date.month - 1]} de {date.year}"
+
+
+@lru_cache(maxsize=1)
+def load_bundled_snapshot(path=SNAPSHOT_PATH):
+    """Load the bundled snapshot on first use.
+
+    Args:
+        path: Snapshot file location
+
+    Returns:
+        dict: ``{"rates": {...}, "fetched_at": datetime}`` with rounded rates,
+        or None if the file is missing or invalid
+    """
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        rates = {code: round(float(data["rates"][code]), 2) for code in RATE_CODES}
+        fetched_at = datetime.fromisoformat(data["fetched_at"])
+    except FileNotFoundError:
+        logging.warning(f"No bundled rate snapshot at {path}")
+        return None
+    except (KeyError, TypeError, ValueError) as e:
+        logging.error(f"Invalid bundled rate snapshot: {e}")
+        return None
+
+    return {"rates": rates, "fetched_at": fetched_at}
+
+
+def refresh_snapshot(path=SNAPSHOT_PATH):
+    """Fetch current rates and write them as the bundled snapshot.
+
+    Args:
+        path: Snapshot file location
+
+    Returns:
+        bool: True if the snapshot was written
+    """
+    rates = get_exchange_rates()
+    if rates is None:
+        return False
+
+    data = {
+        "fetched_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "rates": rates,
+    }
+    Path(path).write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    load_bundled_snapshot.cache_clear()
+    return True
+
+
+if __name__ == "__main__":
+    if not refresh_snapshot():
+        print("Could not fetch exchange rates; snapshot left unchanged.")
+        sys.exit(1)
+    print(f"Wrote {SNAPSHOT_PATH}")
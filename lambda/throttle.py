@@ -0,0 +1,172 @@
+import json
+import logging
+import os
+import time
+
+from botocore.exceptions import BotoCoreError, ClientError
+from codec import RATE_CODES, decode_rates, encode_rates
+from markets import MARKETS
+from utils import get_env_flag
+
+logger = logging.getLogger(__name__)
+
+BUCKET_KEY = "throttle/upstream.json"
+SHARED_RATES_KEY = "throttle/latest.rates"
+DEFAULT_RATE_LIMIT = 1.0
+DEFAULT_BURST = 5
+DEFAULT_MAX_SHARED_AGE_SECONDS = 3600
+DEFAULT_MAX_ATTEMPTS = 3
+
+STORE_ERRORS = (ClientError, BotoCoreError, OSError, KeyError, ValueError)
+
+
+class UpstreamThrottle:
+    """Fleet-wide limit on requests to the upstream proxy.
+
+    Every container shares one token bucket, a small document in the object
+    store updated with conditional writes: ``rate`` tokens per second are
+    added up to ``burst``, and each upstream call takes one. The last
+    accepted snapshot is published next to it, so containers that find it
+    fresh, or that get no token, serve it instead of calling out. It is
+    stored with one record per market: the informal rates first, then
+    ``markets.MARKETS`` in order.
+
+    If the store cannot be reached the throttle lets calls through, so an
+    outage of the store never stops the rates from refreshing.
+
+    Args:
+        store: Object store with ``read_versioned``, ``write_if_version``,
+            ``read_bytes`` and ``write_bytes``
+        rate: Tokens added per second, the fleet's sustained request rate
+        burst: Bucket capacity, the most requests allowed at once
+        max_shared_age: Oldest shared snapshot served when throttled, seconds
+        clock: Wall clock shared by containers, injectable for tests
+        binary: Publish snapshots in the binary format; defaults to the
+            ``RATES_BINARY_ENCODING`` flag
+        max_attempts: Conditional writes tried before giving up on a token
+    """
+
+    def __init__(
+        self,
+        store,
+        rate=DEFAULT_RATE_LIMIT,
+        burst=DEFAULT_BURST,
+        max_shared_age=DEFAULT_MAX_SHARED_AGE_SECONDS,
+        clock=time.time,
+        binary=None,
+        max_attempts=DEFAULT_MAX_ATTEMPTS,
+    ):
+        self.store = store
+        self.rate = rate
+        self.burst = burst
+        self.max_shared_age = max_shared_age
+        self.clock = clock
+        if binary is None:
+            binary = get_env_flag("RATES_BINARY_ENCODING")
+        self.binary = binary
+        self.max_attempts = max_attempts
+
+    def acquire(self):
+        """Take a token from the shared bucket.
+
+        Lost races are retried up to ``max_attempts`` times; a bucket that
+        stays contended counts as empty.
+
+        Returns:
+            bool: True if the caller may call the upstream proxy
+        """
+        try:
+            for _ in range(self.max_attempts):
+                data, version = self.store.read_versioned(BUCKET_KEY)
+                now = self.clock()
+                tokens = self._refill(data, now)
+                if tokens < 1:
+                    return False
+                state = {"tokens": tokens - 1, "updated": now}
+                encoded = json.dumps(state).encode("utf-8")
+                if self.store.write_if_version(BUCKET_KEY, encoded, version):
+                    return True
+        except STORE_ERRORS as e:
+            logger.error(f"Upstream throttle unavailable, allowing the call: {e}")
+            return True
+        return False
+
+    def _refill(self, data, now):
+        if not data:
+            return float(self.burst)
+        state = json.loads(data)
+        elapsed = max(now - state["updated"], 0)
+        return min(float(self.burst), state["tokens"] + elapsed * self.rate)
+
+    def read_shared(self):
+        """Return the snapshot published by the fleet and its age.
+
+        Returns:
+            tuple: (rates dict, age in seconds), or (None, None) if there is
+            no snapshot younger than ``max_shared_age``
+        """
+        try:
+            data = self.store.read_bytes(SHARED_RATES_KEY)
+            if not data:
+                return None, None
+            records = decode_rates(data)
+            fetched_at, rates = records[0]
+        except (IndexError, *STORE_ERRORS) as e:
+            logger.error(f"Could not read the shared rates: {e}")
+            return None, None
+
+        for index, market in enumerate(MARKETS[: len(records) - 1], start=1):
+            market_rates = records.rates(index)
+            if market_rates:
+                rates[market] = market_rates
+
+        age = max(self.clock() - fetched_at, 0)
+        if age >= self.max_shared_age:
+            return None, None
+        return rates, age
+
+    def publish(self, rates):
+        """Share a freshly fetched snapshot with the rest of the fleet.
+
+        Meant as a ``RateCache`` listener, so only accepted snapshots are
+        published.
+        """
+        now = self.clock()
+        records = [(now, {code: rates[code] for code in RATE_CODES if code in rates})]
+        records += [(now, rates.get(market, {})) for market in MARKETS]
+        data = encode_rates(records, binary=self.binary)
+        try:
+            self.store.write_bytes(SHARED_RATES_KEY, data)
+        except (ClientError, BotoCoreError, OSError) as e:
+            logger.error(f"Could not publish the shared rates: {e}")
+
+
+def get_upstream_throttle(store):
+    """Create the throttle configured by the environment.
+
+    ``UPSTREAM_RATE_LIMIT`` is the fleet's sustained upstream requests per
+    second (default 1, 0 turns the throttle off) and ``UPSTREAM_BURST`` the
+    bucket capacity (default 5). ``SHARED_RATES_MAX_AGE`` is the oldest
+    shared snapshot, in seconds, served to throttled containers.
+
+    Args:
+        store: Object store shared by the fleet, e.g. the persistence adapter
+
+    Returns:
+        UpstreamThrottle: Throttle, or None when it is off
+    """
+    try:
+        rate = float(os.environ.get("UPSTREAM_RATE_LIMIT", DEFAULT_RATE_LIMIT))
+        burst = float(os.environ.get("UPSTREAM_BURST", DEFAULT_BURST))
+        max_shared_age = float(
+            os.environ.get("SHARED_RATES_MAX_AGE", DEFAULT_MAX_SHARED_AGE_SECONDS)
+        )
+    except ValueError:
+        logger.warning("Ignoring invalid upstream throttle settings")
+        rate, burst = DEFAULT_RATE_LIMIT, DEFAULT_BURST
+        max_shared_age = DEFAULT_MAX_SHARED_AGE_SECONDS
+    if rate <= 0:
+        return None
+    return UpstreamThrottle(
+        store, rate=rate, burst=max(burst, 1), max_shared_age=max_shared_age
+    )
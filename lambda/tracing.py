@@ -0,0 +1,214 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_DELAY_SECONDS = 5.0
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace, with attributes.
+
+    Args:
+        tracer: Tracer that exports the span when it ends
+        name: Operation name, e.g. 'rates.fetch'
+        trace_id: Id shared by all spans of the trace
+        parent_id: Span id of the parent, None for the root span
+        attributes: Initial attributes
+    """
+
+    recording = True
+
+    def __init__(self, tracer, name, trace_id, parent_id=None, attributes=None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self.duration_ms = None
+        self._token = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        if exc_type is not None:
+            self.status = "error"
+            self.attributes["error.type"] = exc_type.__name__
+        _current_span.reset(self._token)
+        self.tracer.exporter.export(self.to_dict())
+        if self.parent_id is None:
+            self.tracer.exporter.maybe_flush()
+        return False
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": round(self.start_time, 6),
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Span used when the trace is not sampled; records nothing."""
+
+    recording = False
+
+    def set_attribute(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class BatchingExporter:
+    """Buffer finished spans and write them as JSON lines in batches.
+
+    A batch is written once ``max_batch_size`` spans are buffered, or when a
+    trace ends and the oldest buffered span is ``max_delay`` seconds old.
+    Whatever is left is written when the process exits.
+
+    Args:
+        path: File to append to, or '-' for stdout
+        max_batch_size: Spans buffered before a write
+        max_delay: Seconds a span may wait for its batch
+    """
+
+    def __init__(
+        self,
+        path="-",
+        max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+        max_delay=DEFAULT_MAX_DELAY_SECONDS,
+    ):
+        self.path = path
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._oldest = None
+
+    def export(self, span):
+        """Buffer a finished span dict."""
+        with self._lock:
+            if not self._buffer:
+                self._oldest = time.monotonic()
+            self._buffer.append(span)
+            full = len(self._buffer) >= self.max_batch_size
+        if full:
+            self.flush()
+
+    def maybe_flush(self):
+        """Write the batch if its oldest span has waited ``max_delay``."""
+        oldest = self._oldest
+        if oldest is not None and time.monotonic() - oldest >= self.max_delay:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered spans."""
+        with self._lock:
+            spans, self._buffer, self._oldest = self._buffer, [], None
+        if not spans:
+            return
+
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        try:
+            if self.path == "-":
+                sys.stdout.write(lines)
+                sys.stdout.flush()
+            else:
+                with open(self.path, "a", encoding="utf-8") as trace_file:
+                    trace_file.write(lines)
+        except OSError as e:
+            logger.error(f"Could not export {len(spans)} spans: {e}")
+
+
+class Tracer:
+    """Create spans with head-based sampling.
+
+    The sampling decision is made once, when a trace starts; spans opened
+    while no sampled trace is active are no-ops, so unsampled requests pay
+    for little more than a context variable lookup.
+
+    Args:
+        exporter: Exporter receiving finished spans
+        sample_rate: Fraction of traces recorded, 0 to 1
+    """
+
+    def __init__(self, exporter, sample_rate=0.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def start_trace(self, name, **attributes):
+        """Start a root span if this trace is sampled.
+
+        Returns:
+            Span: Context manager for the root span, or a no-op span
+        """
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return NOOP_SPAN
+        return Span(self, name, os.urandom(16).hex(), attributes=attributes)
+
+    def span(self, name, **attributes):
+        """Start a child of the current span, if a sampled trace is active.
+
+        Returns:
+            Span: Context manager for the child span, or a no-op span
+        """
+        parent = _current_span.get()
+        if parent is None:
+            return NOOP_SPAN
+        return Span(self, name, parent.trace_id, parent.span_id, attributes)
+
+
+def get_tracer():
+    """Create the tracer configured by the environment.
+
+    ``TRACE_SAMPLE_RATE`` (0 to 1, default 0) is the fraction of requests
+    traced. Spans are written as JSON lines to ``TRACE_FILE``, or to stdout
+    when it is unset or '-'.
+
+    Returns:
+        Tracer: Configured tracer
+    """
+    try:
+        sample_rate = float(os.environ.get("TRACE_SAMPLE_RATE", 0))
+    except ValueError:
+        logger.warning("Ignoring invalid TRACE_SAMPLE_RATE")
+        sample_rate = 0.0
+
+    exporter = BatchingExporter(os.environ.get("TRACE_FILE", "-"))
+    atexit.register(exporter.flush)
+    return Tracer(exporter, sample_rate=sample_rate)
+
+
+tracer = get_tracer()
@@ -5,6 +5,19 @@ import random
 import boto3
 import requests
 from botocore.exceptions import ClientError
+from markets import (
+    BUY,
+    MARKETS,
+    OFFICIAL,
+    PROXY_URL,
+    fetch_concurrently,
+    fetch_json,
+    get_fetch_deadline,
+    get_market_url,
+    get_official_rates,
+    get_spread_rates,
+)
+from rate_cache import rate_cache
 
 
 def create_presigned_url(object_name):
@@ -39,9 +52,12 @@ def create_presigned_url(object_name):
     return response
 
 
-def get_exchange_rates():
+def get_exchange_rates(timeout=5):
     """Fetch current exchange rates from the proxy API.
 
+    Args:
+        timeout: Seconds to wait for the connection and for each read
+
     Returns:
         dict: Exchange rates with keys 'USD', 'EUR', 'MLC' (float values)
         Returns None if API request fails
@@ -49,12 +65,8 @@ def get_exchange_rates():
     Raises:
         None - errors are caught and None is returned
     """
-    url = "https://tasa-cambio-cuba.vercel.app/api/exchange-rate"
-
     try:
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        data = response.json()
+        data = fetch_json(PROXY_URL, timeout)
 
         return {
             "USD": data["usd"],
@@ -66,18 +78,72 @@ def get_exchange_rates():
         return None
 
 
-def get_rounded_exchange_rates():
+def get_market_rates():
+    """Fetch the rates of every market concurrently, as one snapshot.
+
+    The informal mid rates are the snapshot's top-level 'USD', 'EUR' and
+    'MLC'; buy and sell quotes and the official rates are added under the
+    'buy', 'sell' and 'official' keys when their source is configured and
+    answers before ``RATES_DEADLINE``.
+
+    Returns:
+        dict: Rates snapshot, or None if the informal rates are unavailable
+    """
+    fetchers = [get_exchange_rates]
+    if get_market_url(BUY) is not None:
+        fetchers.append(get_spread_rates)
+    if get_market_url(OFFICIAL) is not None:
+        fetchers.append(get_official_rates)
+
+    rates, *markets = fetch_concurrently(fetchers, get_fetch_deadline())
+    if rates is None:
+        return None
+    for market_rates in markets:
+        rates.update(market_rates or {})
+    return rates
+
+
+def get_env_flag(name, default=True):
+    """Read a boolean flag from the environment.
+
+    Args:
+        name: Environment variable name
+        default: Value used when the variable is unset
+
+    Returns:
+        bool: False for "0", "false", "no" or "off" (any case), else True
+    """
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_rounded_exchange_rates(market=None):
     """Fetch and round exchange rates to 2 decimal places.
 
+    Rates are served from the per-process cache while fresh
+    (``RATES_CACHE_TTL`` seconds).
+
+    Args:
+        market: 'buy', 'sell' or 'official', or None for the informal mid
+            rates
+
     Returns:
         dict: Rounded exchange rates with keys 'USD', 'EUR', 'MLC' (float values)
-        Returns None if API request fails
+        Returns None if API request fails or the market is unavailable; a
+        market may lack some currencies
     """
-    currencies = get_exchange_rates()
+    currencies = rate_cache.get_or_fetch(get_market_rates)
 
     if currencies is None:
         return None
 
+    if market is not None:
+        if market not in MARKETS or not currencies.get(market):
+            return None
+        return {code: round(value, 2) for code, value in currencies[market].items()}
+
     return {
         "MLC": round(currencies["MLC"], 2),
         "USD": round(currencies["USD"], 2),
@@ -0,0 +1,200 @@
+import logging
+import math
+import threading
+from bisect import bisect_left, insort
+from collections import deque
+
+from codec import RATE_CODES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_SIZE = 24
+DEFAULT_MIN_SAMPLES = 3
+DEFAULT_THRESHOLD = 5.0
+DEFAULT_MIN_RELATIVE_SPREAD = 0.02
+DEFAULT_CONFIRM_AFTER = 3
+EUR_USD_RATIO_BOUNDS = (0.8, 1.5)
+MLC_USD_RATIO_BOUNDS = (0.25, 1.5)
+RATIO_BOUNDS = {"EUR": EUR_USD_RATIO_BOUNDS, "MLC": MLC_USD_RATIO_BOUNDS}
+
+# Scales the MAD to a standard deviation for normally distributed values
+MAD_SCALE = 1.4826
+
+
+class RollingWindow:
+    """Fixed-size window of recent values with median and MAD.
+
+    Values are also kept sorted, so each update and query touches at most
+    ``size`` values however long the process has been running.
+
+    Args:
+        size: Number of recent values kept
+    """
+
+    def __init__(self, size=DEFAULT_WINDOW_SIZE):
+        self.size = size
+        self._values = deque()
+        self._sorted = []
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, value):
+        """Add a value, dropping the oldest one when the window is full."""
+        if len(self._values) == self.size:
+            oldest = self._values.popleft()
+            del self._sorted[bisect_left(self._sorted, oldest)]
+        self._values.append(value)
+        insort(self._sorted, value)
+
+    def clear(self):
+        self._values.clear()
+        self._sorted.clear()
+
+    def median(self):
+        """Return the median of the window (it must not be empty)."""
+        return _median(self._sorted)
+
+    def mad(self):
+        """Return the median absolute deviation of the window."""
+        median = self.median()
+        return _median(sorted(abs(value - median) for value in self._sorted))
+
+
+def _median(sorted_values):
+    middle = len(sorted_values) // 2
+    if len(sorted_values) % 2:
+        return sorted_values[middle]
+    return (sorted_values[middle - 1] + sorted_values[middle]) / 2
+
+
+class RateValidator:
+    """Reject implausible rate snapshots before they are cached or spoken.
+
+    Every snapshot must contain positive, finite rates and plausible EUR and
+    MLC to USD ratios. Once a currency has ``min_samples`` accepted values, a
+    rate more than ``threshold`` scaled MADs away from the rolling median is
+    an outlier. The spread never drops below ``min_relative_spread`` of the
+    median, so flat markets do not reject every small move.
+
+    Rejected snapshots are quarantined. When the last ``confirm_after``
+    quarantined snapshots agree with each other the market has genuinely
+    moved, so the newest one is accepted and the windows restart from it.
+
+    With a ``seed``, the windows start from the snapshots it returns instead
+    of empty, so a fresh process can quarantine outliers from its first
+    fetch. It is called once, on the first snapshot, and a failing seed
+    leaves the windows empty.
+
+    Args:
+        window_size: Accepted values kept per currency
+        min_samples: Values needed before the outlier check applies
+        threshold: Allowed distance from the median, in scaled MADs
+        min_relative_spread: Lower bound for the spread, relative to the median
+        confirm_after: Agreeing quarantined snapshots that confirm a new level
+        seed: Optional callable returning recently accepted snapshots, oldest
+            first
+    """
+
+    def __init__(
+        self,
+        window_size=DEFAULT_WINDOW_SIZE,
+        min_samples=DEFAULT_MIN_SAMPLES,
+        threshold=DEFAULT_THRESHOLD,
+        min_relative_spread=DEFAULT_MIN_RELATIVE_SPREAD,
+        confirm_after=DEFAULT_CONFIRM_AFTER,
+        seed=None,
+    ):
+        self.min_samples = min_samples
+        self.threshold = threshold
+        self.min_relative_spread = min_relative_spread
+        self.windows = {code: RollingWindow(window_size) for code in RATE_CODES}
+        self.quarantined = deque(maxlen=confirm_after)
+        self.seed = seed
+        self._seeded = False
+        self._lock = threading.Lock()
+
+    def accept(self, rates):
+        """Validate a snapshot and record it if it is accepted.
+
+        Args:
+            rates: Freshly fetched exchange rates dict
+
+        Returns:
+            bool: True if the snapshot can be served, False if quarantined
+        """
+        with self._lock:
+            if not self._seeded:
+                self._seeded = True
+                self._seed()
+
+            problems = self._check_values(rates)
+            if problems:
+                logger.warning(f"Quarantined rates {rates}: {'; '.join(problems)}")
+                return False
+
+            problems = self._check_outliers(rates)
+            if problems:
+                self.quarantined.append(rates)
+                if not self._level_shift_confirmed():
+                    logger.warning(f"Quarantined rates {rates}: {'; '.join(problems)}")
+                    return False
+
+                logger.warning(f"Rates moved to a new level, accepting {rates}")
+                for window in self.windows.values():
+                    window.clear()
+
+            self.quarantined.clear()
+            for code, window in self.windows.items():
+                window.add(float(rates[code]))
+            return True
+
+    def _seed(self):
+        if self.seed is None:
+            return
+        try:
+            snapshots = list(self.seed())
+        except Exception as e:
+            logger.error(f"Could not seed the rate validator: {e}")
+            return
+        for snapshot in snapshots:
+            if not self._check_values(snapshot):
+                for code, window in self.windows.items():
+                    window.add(float(snapshot[code]))
+
+    def _check_values(self, rates):
+        problems = []
+        for code in RATE_CODES:
+            value = rates.get(code)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                problems.append(f"{code} is not a number")
+            elif not math.isfinite(value) or value <= 0:
+                problems.append(f"{code} is {value}")
+        if problems:
+            return problems
+
+        for code, (low, high) in RATIO_BOUNDS.items():
+            ratio = rates[code] / rates["USD"]
+            if not low <= ratio <= high:
+                problems.append(f"{code}/USD ratio {ratio:.2f} outside [{low}, {high}]")
+        return problems
+
+    def _check_outliers(self, rates):
+        problems = []
+        for code, window in self.windows.items():
+            if len(window) < self.min_samples:
+                continue
+            median = window.median()
+            spread = max(MAD_SCALE * window.mad(), self.min_relative_spread * median)
+            if abs(rates[code] - median) > self.threshold * spread:
+                problems.append(f"{code} {rates[code]} is far from median {median}")
+        return problems
+
+    def _level_shift_confirmed(self):
+        if len(self.quarantined) < self.quarantined.maxlen:
+            return False
+        for code in RATE_CODES:
+            values = [snapshot[code] for snapshot in self.quarantined]
+            if max(values) - min(values) > self.min_relative_spread * min(values):
+                return False
+        return True
@@ -0,0 +1,250 @@
+import logging
+import threading
+from datetime import timedelta
+
+from ask_sdk_model.interfaces.alexa.presentation.apl import RenderDocumentDirective
+from botocore.exceptions import ClientError
+from codec import RATE_CODES
+from history import get_today
+from snapshot import format_spanish_date
+
+logger = logging.getLogger(__name__)
+
+APL_TOKEN = "tasaCambioRates"
+TITLE = "Tasa de Cambio Cubana"
+TREND_DAYS = 14
+SPARKLINE_WIDTH = 160
+SPARKLINE_HEIGHT = 48
+STROKE_WIDTH = 3
+CURRENCY_LABELS = {"USD": "Dólar", "EUR": "Euro", "MLC": "MLC"}
+TREND_COLORS = {"up": "#E5533D", "down": "#3DBE7A", "flat": "#B0B7C3"}
+
+# Static part of the screen; only the datasource changes with the rates
+DOCUMENT = {
+    "type": "APL",
+    "version": "2023.3",
+    "theme": "dark",
+    "graphics": {
+        "sparkline": {
+            "type": "AVG",
+            "version": "1.2",
+            "width": SPARKLINE_WIDTH,
+            "height": SPARKLINE_HEIGHT,
+            "parameters": ["path", "color"],
+            "items": [
+                {
+                    "type": "path",
+                    "pathData": "${path}",
+                    "stroke": "${color}",
+                    "strokeWidth": STROKE_WIDTH,
+                    "strokeLineJoin": "round",
+                    "strokeLineCap": "round",
+                    "fill": "transparent",
+                }
+            ],
+        }
+    },
+    "mainTemplate": {
+        "parameters": ["rates"],
+        "items": [
+            {
+                "type": "Container",
+                "width": "100vw",
+                "height": "100vh",
+                "paddingLeft": "@marginHorizontal",
+                "paddingRight": "@marginHorizontal",
+                "paddingTop": "@spacingMedium",
+                "items": [
+                    {
+                        "type": "Text",
+                        "text": "${rates.title}",
+                        "style": "textStyleDisplay4",
+                    },
+                    {
+                        "type": "Text",
+                        "text": "${rates.subtitle}",
+                        "style": "textStyleHint",
+                        "paddingBottom": "@spacingMedium",
+                    },
+                    {
+                        "type": "Container",
+                        "data": "${rates.items}",
+                        "items": [
+                            {
+                                "type": "Container",
+                                "direction": "row",
+                                "alignItems": "center",
+                                "paddingBottom": "@spacingSmall",
+                                "items": [
+                                    {
+                                        "type": "Text",
+                                        "text": "${data.label}",
+                                        "style": "textStyleBody",
+                                        "width": "25%",
+                                    },
+                                    {
+                                        "type": "Text",
+                                        "text": "${data.value}",
+                                        "style": "textStyleDisplay5",
+                                        "width": "25%",
+                                    },
+                                    {
+                                        "type": "Text",
+                                        "text": "${data.change}",
+                                        "color": "${data.color}",
+                                        "style": "textStyleBody",
+                                        "width": "20%",
+                                    },
+                                    {
+                                        "type": "VectorGraphic",
+                                        "source": "sparkline",
+                                        "width": SPARKLINE_WIDTH,
+                                        "height": SPARKLINE_HEIGHT,
+                                        "path": "${data.sparkline}",
+                                        "color": "${data.color}",
+                                    },
+                                ],
+                            }
+                        ],
+                    },
+                ],
+            }
+        ],
+    },
+}
+
+
+def supports_apl(handler_input):
+    """Return True if the device can render APL documents."""
+    device = handler_input.request_envelope.context.system.device
+    interfaces = device.supported_interfaces if device is not None else None
+    return interfaces is not None and interfaces.alexa_presentation_apl is not None
+
+
+def format_rate(value):
+    """Format a rate without a trailing '.0', e.g. '412.5' or '410'."""
+    return f"{round(value, 2):g}"
+
+
+def sparkline_path(
+    values, width=SPARKLINE_WIDTH, height=SPARKLINE_HEIGHT, margin=STROKE_WIDTH
+):
+    """Return AVG path data drawing ``values`` as a line across the box.
+
+    The lowest value touches the bottom margin and the highest the top one;
+    constant values are drawn as a line through the middle.
+
+    Args:
+        values: Values, oldest first
+        width: Width of the box
+        height: Height of the box
+        margin: Space kept free above and below the line
+
+    Returns:
+        str: Path data such as ``'M0,45L80,3L160,24'``, empty with fewer
+        than two values
+    """
+    if len(values) < 2:
+        return ""
+
+    low, high = min(values), max(values)
+    step = width / (len(values) - 1)
+    scale = (height - 2 * margin) / (high - low) if high > low else 0
+    points = []
+    for index, value in enumerate(values):
+        y = margin + (high - value) * scale if scale else height / 2
+        points.append(f"{round(index * step, 1):g},{round(y, 1):g}")
+    return "M" + "L".join(points)
+
+
+def render_item(code, trend):
+    """Return the datasource row of one currency.
+
+    Args:
+        code: Currency code
+        trend: Daily rates of the currency, oldest first, ending with today's
+
+    Returns:
+        dict: Row with the label, rate, change since the previous day and
+        sparkline path
+    """
+    rate = trend[-1]
+    change = round(rate - trend[-2], 2) if len(trend) > 1 else 0
+    direction = "up" if change > 0 else "down" if change < 0 else "flat"
+    return {
+        "code": code,
+        "label": CURRENCY_LABELS[code],
+        "value": format_rate(rate),
+        "change": f"{change:+g}" if change else "=",
+        "color": TREND_COLORS[direction],
+        "sparkline": sparkline_path(trend),
+    }
+
+
+class RatesVisual:
+    """APL screen of the current rates, rendered once per rate snapshot.
+
+    The datasource and sparkline geometry only depend on the rounded rates
+    and the day, so the directive built for a snapshot is kept and handed
+    to every screen device until the rates change. Each sparkline shows the
+    last ``days`` daily rates from the history, ending with the current
+    rate.
+
+    Args:
+        history: ``RateHistory`` the trend is read from
+        days: Number of daily rates in each sparkline
+    """
+
+    def __init__(self, history, days=TREND_DAYS):
+        self.history = history
+        self.days = days
+        self._lock = threading.Lock()
+        self._rendered = None
+
+    def render(self, rates, day):
+        """Return the APL datasources for rounded rates on ``day``."""
+        try:
+            past = self.history.recent(day - timedelta(days=1), self.days - 1)
+        except (ClientError, OSError, ValueError) as e:
+            logger.error(f"Could not read the rate trend: {e}")
+            past = []
+
+        items = []
+        for code in RATE_CODES:
+            if code not in rates:
+                continue
+            trend = [record[code] for _, record in past if code in record]
+            items.append(render_item(code, trend + [rates[code]]))
+
+        return {
+            "rates": {
+                "title": TITLE,
+                "subtitle": format_spanish_date(day),
+                "items": items,
+            }
+        }
+
+    def directive(self, rates, day=None):
+        """Return the render directive for the rates, memoised per snapshot.
+
+        Args:
+            rates: Rounded exchange rates dict
+            day: datetime.date of the rates, today in Cuba by default
+
+        Returns:
+            RenderDocumentDirective: Directive showing the rates
+        """
+        key = (day or get_today(), tuple(rates.get(code) for code in RATE_CODES))
+        rendered = self._rendered
+        if rendered is not None and rendered[0] == key:
+            return rendered[1]
+
+        with self._lock:
+            if self._rendered is None or self._rendered[0] != key:
+                directive = RenderDocumentDirective(
+                    token=APL_TOKEN,
+                    document=DOCUMENT,
+                    datasources=self.render(rates, key[0]),
+                )
+                self._rendered = (key, directive)
+            return self._rendered[1]
@@ -0,0 +1,108 @@
+import json
+import logging
+
+from ask_sdk_core.exceptions import AskSdkException
+from ask_sdk_webservice_support.verifier import VerificationException
+from ask_sdk_webservice_support.webservice_handler import WebserviceSkillHandler
+from lambda_function import sb
+from utils import get_env_flag
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+JSON_CONTENT_TYPE = "application/json;charset=utf-8"
+
+
+def get_request_headers(environ):
+    """Extract HTTP request headers from a WSGI environ.
+
+    Args:
+        environ: WSGI environ dict
+
+    Returns:
+        dict: Header names (e.g. ``Signature-256``) mapped to their values
+    """
+    headers = {}
+    for key, value in environ.items():
+        if key.startswith("HTTP_"):
+            name = key[5:].replace("_", "-").title()
+            headers[name] = value
+    if environ.get("CONTENT_TYPE"):
+        headers["Content-Type"] = environ["CONTENT_TYPE"]
+    return headers
+
+
+class SkillWebService:
+    """WSGI application serving the skill as an Alexa HTTPS endpoint.
+
+    Reuses the handlers registered on the Lambda ``SkillBuilder``. Request
+    signature and timestamp verification are on by default and can be turned
+    off with ``VERIFY_SIGNATURE`` / ``VERIFY_TIMESTAMP`` for local testing.
+
+    Args:
+        skill: CustomSkill instance to dispatch requests to
+        verify_signature: Verify the Alexa request signature
+        verify_timestamp: Reject requests with a stale timestamp
+    """
+
+    def __init__(self, skill, verify_signature=True, verify_timestamp=True):
+        self.skill_handler = WebserviceSkillHandler(
+            skill=skill,
+            verify_signature=verify_signature,
+            verify_timestamp=verify_timestamp,
+        )
+
+    def __call__(self, environ, start_response):
+        method = environ.get("REQUEST_METHOD", "GET")
+        if method == "GET":
+            return self._respond(start_response, "200 OK", {"status": "ok"})
+        if method != "POST":
+            return self._respond(
+                start_response, "405 Method Not Allowed", {"error": "POST only"}
+            )
+
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            length = 0
+        body = environ["wsgi.input"].read(length).decode("utf-8")
+
+        try:
+            response = self.skill_handler.verify_request_and_dispatch(
+                http_request_headers=get_request_headers(environ),
+                http_request_body=body,
+            )
+        except VerificationException as e:
+            logger.warning(f"Request verification failed: {e}")
+            return self._respond(
+                start_response, "400 Bad Request", {"error": "Invalid request"}
+            )
+        except AskSdkException as e:
+            logger.error(f"Error handling skill request: {e}", exc_info=True)
+            return self._respond(
+                start_response,
+                "500 Internal Server Error",
+                {"error": "Internal error"},
+            )
+
+        return self._respond(start_response, "200 OK", response)
+
+    def _respond(self, start_response, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        start_response(
+            status,
+            [("Content-Type", JSON_CONTENT_TYPE), ("Content-Length", str(len(body)))],
+        )
+        return [body]
+
+
+def create_app():
+    """Build the WSGI application configured by the environment."""
+    return SkillWebService(
+        sb.create(),
+        verify_signature=get_env_flag("VERIFY_SIGNATURE"),
+        verify_timestamp=get_env_flag("VERIFY_TIMESTAMP"),
+    )
+
+
+application = create_app()
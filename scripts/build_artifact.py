@@ -0,0 +1,416 @@
+"""Build a slim deployment artifact for the skill.
+
+The skill is imported and every envelope in ``tests/envelopes`` is run
+through it (with canned proxy responses) to find the modules it actually
+uses. Only those modules and their packages' data files are copied, next to
+precompiled bytecode: ``/var/task`` is read-only on Lambda, so without it
+every cold start compiles every module again. With ``--zip`` the
+pure-Python dependencies are packed in one zip-importable bundle.
+
+The artifact is then imported and exercised in isolation, and the cold
+import time and size are reported against the plain source layout. The
+directory layout ships sources and bytecode, so it compares with the plain
+layout's cached bytecode row, not with the one without bytecode.
+
+Run from the repository root, with the Python version of the Lambda
+runtime (bytecode is version specific):
+
+    python scripts/build_artifact.py           # build/slim/
+    python scripts/build_artifact.py --zip     # build/slim/ with deps.zip
+"""
+
+import argparse
+import importlib.machinery
+import importlib.util
+import json
+import os
+import py_compile
+import shutil
+import site
+import statistics
+import subprocess
+import sys
+import tempfile
+import zipfile
+from datetime import timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCE_DIR = ROOT / "lambda"
+ENVELOPES_DIR = ROOT / "tests" / "envelopes"
+BUILD_DIR = ROOT / "build" / "slim"
+
+# Pre-installed in the Lambda Python runtime, hence not in requirements.txt
+PROVIDED = {"boto3", "botocore", "s3transfer", "jmespath"}
+SOURCE_EXCLUDES = {"__init__.py", "requirements.txt"}
+PYTHON_SUFFIXES = (".py", ".pyc", ".pyi")
+# Type-checker markers, unused at runtime
+SKIPPED_DATA = {"py.typed"}
+EXTENSION_SUFFIXES = tuple(importlib.machinery.EXTENSION_SUFFIXES)
+
+ZIP_NAME = "deps.zip"
+ZIP_HANDLER = "zip_handler.py"
+ZIP_HANDLER_SOURCE = """\
+import os
+import sys
+
+# Dependencies are imported from the bundle next to this file
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), {!r}))
+
+from lambda_function import lambda_handler  # noqa: E402, F401
+"""
+
+# The trace writes to a scratch directory, never to the real bucket
+SKIPPED_ENV = {"S3_PERSISTENCE_BUCKET"}
+
+PROXY_RATES = {"usd": 120.0, "eur": 130.0, "mlc": 118.0}
+
+IMPORT_TIMER = """\
+import time
+started = time.perf_counter()
+import lambda_function
+print(time.perf_counter() - started)
+"""
+
+
+def exercise(output):
+    """Run every envelope through the skill and write the imported files.
+
+    Runs in a child process, so only the skill's own imports are seen.
+    """
+    import markets
+    import requests
+
+    def get(url, timeout=None):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.elapsed = timedelta(0)
+        if url.endswith("/spread"):
+            body = {
+                code: {"buy": rate - 2, "sell": rate + 2}
+                for code, rate in PROXY_RATES.items()
+            }
+        else:
+            body = PROXY_RATES
+        response._content = json.dumps(body).encode("utf-8")
+        return response
+
+    # Patched before the skill is imported, as priming fetches the rates
+    markets.session.get = get
+    import lambda_function
+
+    for path in sorted(ENVELOPES_DIR.glob("*.json")):
+        response = lambda_function.lambda_handler(
+            json.loads(path.read_text(encoding="utf-8")), None
+        )
+        if "response" not in response:
+            raise RuntimeError(f"{path.name} did not get a response")
+
+    files = {
+        module.__file__
+        for module in list(sys.modules.values())
+        if getattr(module, "__file__", None)
+    }
+    Path(output).write_text(json.dumps(sorted(files)), encoding="utf-8")
+
+
+def run_exercise(python_path, isolated, env):
+    """Exercise the skill in a child process and return the imported files."""
+    with tempfile.TemporaryDirectory() as scratch:
+        output = Path(scratch) / "modules.json"
+        command = [sys.executable]
+        if isolated:
+            command.append("-S")
+        command += [__file__, "--exercise", str(output)]
+        result = subprocess.run(
+            command,
+            capture_output=True,
+            text=True,
+            env=dict(
+                {key: value for key, value in env.items() if key not in SKIPPED_ENV},
+                PYTHONPATH=os.pathsep.join(map(str, python_path)),
+                PERSISTENCE_DIR=str(Path(scratch) / "store"),
+                PRIME_ON_INIT="true",
+                # Canned by exercise(), so the market sources are traced too
+                SPREAD_RATES_URL="https://proxy.invalid/spread",
+                OFFICIAL_RATES_URL="https://proxy.invalid/official",
+                TRACE_SAMPLE_RATE="1",
+                TRACE_FILE=str(Path(scratch) / "traces.jsonl"),
+                PROFILE_ENABLED="true",
+            ),
+        )
+        if result.returncode != 0:
+            sys.exit(f"Exercising the skill failed:\n{result.stderr}")
+        return [Path(name) for name in json.loads(output.read_text())]
+
+
+def get_site_dirs():
+    dirs = site.getsitepackages() + [site.getusersitepackages()]
+    return [Path(path).resolve() for path in dirs if Path(path).is_dir()]
+
+
+def classify(files):
+    """Split imported files into the skill's modules and dependency files.
+
+    Returns:
+        tuple: (skill files, {site-packages dir: [relative paths]})
+    """
+    site_dirs = get_site_dirs()
+    own, dependencies = [], {}
+    for path in files:
+        path = path.resolve()
+        if path.parent == SOURCE_DIR:
+            own.append(path)
+            continue
+        for site_dir in site_dirs:
+            if site_dir in path.parents:
+                relative = path.relative_to(site_dir)
+                if get_top_level(relative) not in PROVIDED:
+                    dependencies.setdefault(site_dir, []).append(relative)
+                break
+    return own, dependencies
+
+
+def get_top_level(relative):
+    """Return the importable top-level name of a site-packages path."""
+    name = relative.parts[0]
+    for suffix in EXTENSION_SUFFIXES + (".py",):
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def get_data_files(site_dir, relative_files):
+    """Return the non-Python files of every package directory used."""
+    data = set()
+    for directory in {path.parent for path in relative_files if len(path.parts) > 1}:
+        for path in (site_dir / directory).iterdir():
+            if (
+                path.is_file()
+                and path.name not in SKIPPED_DATA
+                and not path.name.endswith(PYTHON_SUFFIXES + EXTENSION_SUFFIXES)
+            ):
+                data.add(directory / path.name)
+    return data
+
+
+def compile_source(source, target, display_name):
+    """Write the bytecode of ``source`` where the importer looks for it.
+
+    Hash-based, unchecked bytecode is used as is: the importer neither reads
+    the source's timestamp nor tries to rewrite the cache.
+    """
+    py_compile.compile(
+        str(source),
+        cfile=str(target),
+        dfile=display_name,
+        doraise=True,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+
+
+def build(output, own, dependencies, zip_dependencies):
+    """Write the slim artifact to ``output``.
+
+    Args:
+        output: Artifact directory, replaced if it exists
+        own: The skill's modules, as returned by ``classify``
+        dependencies: Dependency files, as returned by ``classify``
+        zip_dependencies: Pack pure-Python dependencies in one zip
+
+    Returns:
+        int: Number of dependency files shipped
+    """
+    shutil.rmtree(output, ignore_errors=True)
+    output.mkdir(parents=True)
+
+    for path in sorted(SOURCE_DIR.iterdir()):
+        if path.is_file() and path.suffix != ".py" and path.name not in SOURCE_EXCLUDES:
+            shutil.copy2(path, output / path.name)
+    for path in own:
+        shutil.copy2(path, output / path.name)
+        compile_source(
+            path, importlib.util.cache_from_source(output / path.name), path.name
+        )
+
+    archive = None
+    if zip_dependencies:
+        archive = zipfile.ZipFile(output / ZIP_NAME, "w", zipfile.ZIP_DEFLATED)
+        (output / ZIP_HANDLER).write_text(
+            ZIP_HANDLER_SOURCE.format(ZIP_NAME), encoding="utf-8"
+        )
+        compile_source(
+            output / ZIP_HANDLER,
+            importlib.util.cache_from_source(output / ZIP_HANDLER),
+            ZIP_HANDLER,
+        )
+
+    count = 0
+    for site_dir, relative_files in dependencies.items():
+        # Extension modules cannot be imported from a zip
+        on_disk = {
+            get_top_level(path)
+            for path in relative_files
+            if path.name.endswith(EXTENSION_SUFFIXES)
+        }
+        for relative in sorted(
+            set(relative_files) | get_data_files(site_dir, relative_files)
+        ):
+            count += 1
+            source = site_dir / relative
+            if archive is not None and get_top_level(relative) not in on_disk:
+                if relative.suffix == ".py":
+                    # zipimport reads sourceless bytecode stored next to the module
+                    with tempfile.TemporaryDirectory() as scratch:
+                        compiled = Path(scratch) / "module.pyc"
+                        compile_source(source, compiled, str(relative))
+                        archive.write(compiled, str(relative.with_suffix(".pyc")))
+                else:
+                    archive.write(source, str(relative))
+                continue
+
+            target = output / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target)
+            if relative.suffix == ".py":
+                compile_source(
+                    source, importlib.util.cache_from_source(target), str(relative)
+                )
+
+    if archive is not None:
+        archive.close()
+    return count
+
+
+def get_provided_dir(scratch):
+    """Link the runtime-provided packages into a directory of their own."""
+    provided = Path(scratch) / "provided"
+    provided.mkdir()
+    for site_dir in get_site_dirs():
+        for path in site_dir.iterdir():
+            if path.name in PROVIDED and not (provided / path.name).exists():
+                (provided / path.name).symlink_to(path)
+    return provided
+
+
+def time_import(python_path, entry, runs, env):
+    """Return the median cold import time of ``entry`` in fresh processes.
+
+    One untimed import runs first, so bytecode caches the environment allows
+    are written before the timed ones.
+    """
+    timer = IMPORT_TIMER.replace("lambda_function", entry)
+    samples = []
+    for _ in range(runs + 1):
+        result = subprocess.run(
+            [sys.executable, "-S", "-c", timer],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=dict(env, PYTHONPATH=os.pathsep.join(map(str, python_path))),
+        )
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples[1:])
+
+
+def get_size(paths, bytecode=True):
+    """Return the total size of the files at or under ``paths``."""
+    total = 0
+    for path in paths:
+        for candidate in path.rglob("*") if path.is_dir() else [path]:
+            if not candidate.is_file():
+                continue
+            if not bytecode and "__pycache__" in candidate.parts:
+                continue
+            total += candidate.stat().st_size
+    return total
+
+
+def get_full_layout(dependencies):
+    """Return the paths a plain ``pip install -t`` artifact would ship."""
+    paths = [SOURCE_DIR]
+    for site_dir, relative_files in dependencies.items():
+        paths += sorted({site_dir / relative.parts[0] for relative in relative_files})
+    return paths
+
+
+def format_size(size):
+    return f"{size / 1024:,.0f} KiB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, default=BUILD_DIR)
+    parser.add_argument(
+        "--zip", action="store_true", help=f"bundle dependencies in {ZIP_NAME}"
+    )
+    parser.add_argument("--runs", type=int, default=7, help="imports timed per layout")
+    parser.add_argument("--exercise", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.exercise:
+        exercise(args.exercise)
+        return
+
+    own, dependencies = classify(
+        run_exercise([SOURCE_DIR], isolated=False, env=os.environ)
+    )
+    count = build(args.output, own, dependencies, args.zip)
+    print(f"Wrote {args.output}: {len(own)} skill modules, {count} dependency files")
+
+    base_env = {
+        key: value for key, value in os.environ.items() if not key.startswith("PYTHON")
+    }
+    with tempfile.TemporaryDirectory() as scratch:
+        provided = get_provided_dir(scratch)
+        slim_path = [args.output, provided]
+
+        # The artifact must work without anything else from site-packages
+        bundle = [args.output / ZIP_NAME] if args.zip else []
+        run_exercise(bundle + slim_path, isolated=True, env=base_env)
+
+        full = get_full_layout(dependencies)
+        full_path = [SOURCE_DIR] + get_site_dirs()
+        # A read-only /var/task without .pyc files compiles on every cold start
+        no_cache_env = dict(
+            base_env,
+            PYTHONDONTWRITEBYTECODE="1",
+            PYTHONPYCACHEPREFIX=str(Path(scratch) / "empty"),
+        )
+        cache = Path(scratch) / "cache"
+        cache_env = dict(base_env, PYTHONPYCACHEPREFIX=str(cache))
+        rows = [
+            (
+                "source, no bytecode",
+                time_import(full_path, "lambda_function", args.runs, no_cache_env),
+                get_size(full, bytecode=False),
+            ),
+            (
+                "source, cached bytecode",
+                time_import(full_path, "lambda_function", args.runs, cache_env),
+                get_size(full, bytecode=False)
+                + get_size([cache / path.relative_to(path.anchor) for path in full]),
+            ),
+            (
+                "slim, precompiled" + (f" + {ZIP_NAME}" if args.zip else ""),
+                time_import(
+                    slim_path,
+                    "zip_handler" if args.zip else "lambda_function",
+                    args.runs,
+                    base_env,
+                ),
+                get_size([args.output]),
+            ),
+        ]
+
+    print(f"\nCold import of lambda_function (median of {args.runs} processes)")
+    print("boto3, botocore, s3transfer and jmespath come from the runtime")
+    print("slim ships .py and .pyc files: compare it with cached bytecode\n")
+    print(f"{'layout':<32} {'import':>10} {'size':>12}")
+    for label, seconds, size in rows:
+        print(f"{label:<32} {seconds * 1000:>8.1f}ms {format_size(size):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Local stand-in for the Alexa Proactive Events API.
+
+Accepts the rate alerts the skill sends and prints one line per event, so
+the fan-out can be exercised without skill credentials:
+
+    python scripts/proactive_events_stand_in.py --port 8090
+    PROACTIVE_EVENTS_URL=http://127.0.0.1:8090/ make serve
+"""
+
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REQUIRED_FIELDS = ("timestamp", "referenceId", "expiryTime", "event")
+
+
+class ProactiveEventsHandler(BaseHTTPRequestHandler):
+    def do_POST(self):  # noqa: N802
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            event = json.loads(self.rfile.read(length))
+            missing = [field for field in REQUIRED_FIELDS if field not in event]
+            user = event["relevantAudience"]["payload"]["user"]
+            message = event["event"]["payload"]["messageGroup"]["creator"]["name"]
+        except (KeyError, TypeError, ValueError):
+            missing = ["a valid event body"]
+        if missing:
+            self.send_response(400)
+            self.end_headers()
+            self.wfile.write(f"Missing {', '.join(missing)}".encode("utf-8"))
+            return
+
+        print(f"{time.strftime('%H:%M:%S')} {user}: {message}", flush=True)
+        self.send_response(202)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), ProactiveEventsHandler)
+    print(f"Proactive events stand-in on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
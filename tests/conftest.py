@@ -0,0 +1,30 @@
+"""Fakes shared by the test modules."""
+
+
+class FakeClock:
+    """Clock that only moves when a test moves it.
+
+    Usable as a ``clock`` and, through ``sleep``, as a ``sleep`` function.
+    """
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class ListExporter:
+    """Span exporter that keeps the exported spans in a list."""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def maybe_flush(self):
+        pass
@@ -0,0 +1,392 @@
+"""Tests for lambda/alerts.py."""
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from alerts import (
+    ABOVE,
+    BELOW,
+    LWA_TOKEN_URL,
+    PROACTIVE_EVENTS_URL,
+    AlertIndex,
+    ProactiveEventsClient,
+    RateAlerts,
+    build_event,
+    get_key,
+    get_rate_alerts,
+)
+from botocore.exceptions import EndpointConnectionError
+from persistence import FileSystemObjectStore
+
+from tests.conftest import FakeClock
+
+
+def describe(currency, threshold, direction, rate):
+    return f"{currency} {direction} {threshold} at {rate}"
+
+
+def make_index(tmp_path, subscriptions=()):
+    index = AlertIndex(FileSystemObjectStore(tmp_path))
+    for user_id, currency, threshold, direction in subscriptions:
+        index.subscribe(user_id, currency, threshold, direction)
+    return index
+
+
+class TestAlertIndex:
+    """Tests for AlertIndex."""
+
+    def test_subscriptions_are_sorted_per_currency(self, tmp_path):
+        """Test each currency keeps its alerts sorted by threshold."""
+        index = make_index(
+            tmp_path,
+            [
+                ("ana", "USD", 400.0, ABOVE),
+                ("luis", "USD", 380.0, ABOVE),
+                ("eva", "USD", 300.0, BELOW),
+                ("ana", "EUR", 500.0, ABOVE),
+            ],
+        )
+
+        usd, _ = index.read("USD")
+
+        assert usd == {
+            ABOVE: [[380.0, "luis"], [400.0, "ana"]],
+            BELOW: [[300.0, "eva"]],
+        }
+        assert index.read("EUR")[0][ABOVE] == [[500.0, "ana"]]
+        assert index.read("MLC")[0] == {ABOVE: [], BELOW: []}
+
+    def test_one_alert_per_user_and_currency(self, tmp_path):
+        """Test a new alert replaces the user's previous one."""
+        index = make_index(
+            tmp_path, [("ana", "USD", 400.0, ABOVE), ("ana", "USD", 300.0, BELOW)]
+        )
+
+        assert index.read("USD")[0] == {ABOVE: [], BELOW: [[300.0, "ana"]]}
+
+        assert index.unsubscribe("ana", "USD")
+        assert not index.unsubscribe("ana", "USD")
+        assert index.read("USD")[0] == {ABOVE: [], BELOW: []}
+
+    def test_pop_crossed_is_a_range_query(self, tmp_path):
+        """Test a rate reaches a prefix of rising and a suffix of falling alerts."""
+        index = make_index(
+            tmp_path,
+            [
+                ("a", "USD", 395.0, ABOVE),
+                ("b", "USD", 400.0, ABOVE),
+                ("c", "USD", 420.0, ABOVE),
+                ("d", "USD", 350.0, BELOW),
+                ("e", "USD", 400.0, BELOW),
+                ("f", "USD", 410.0, BELOW),
+            ],
+        )
+
+        crossed = index.pop_crossed("USD", 400.0)
+
+        assert crossed == [
+            ("a", 395.0, ABOVE),
+            ("b", 400.0, ABOVE),
+            ("e", 400.0, BELOW),
+            ("f", 410.0, BELOW),
+        ]
+        assert index.read("USD")[0] == {
+            ABOVE: [[420.0, "c"]],
+            BELOW: [[350.0, "d"]],
+        }
+        assert index.pop_crossed("USD", 400.0) == []
+
+    def test_pop_crossed_limit(self, tmp_path):
+        """Test alerts over the limit stay for the next pass."""
+        index = make_index(
+            tmp_path, [(f"user{n}", "USD", 300.0 + n, ABOVE) for n in range(5)]
+        )
+
+        assert len(index.pop_crossed("USD", 400.0, limit=3)) == 3
+        assert [user for user, _, _ in index.pop_crossed("USD", 400.0)] == [
+            "user3",
+            "user4",
+        ]
+
+    def test_lost_race_is_retried(self, tmp_path):
+        """Test a conditional write lost to another container is retried."""
+        store = FileSystemObjectStore(tmp_path)
+        index = AlertIndex(store)
+        index.subscribe("ana", "USD", 400.0, ABOVE)
+        write_if_version = store.write_if_version
+
+        def racing_write(key, data, version):
+            # Another container subscribes between our read and our write
+            store.write_if_version = write_if_version
+            AlertIndex(store).subscribe("luis", "USD", 380.0, ABOVE)
+            return write_if_version(key, data, version)
+
+        store.write_if_version = racing_write
+        index.subscribe("eva", "USD", 300.0, BELOW)
+
+        assert index.read("USD")[0] == {
+            ABOVE: [[380.0, "luis"], [400.0, "ana"]],
+            BELOW: [[300.0, "eva"]],
+        }
+
+    def test_restore_keeps_newer_alerts(self, tmp_path):
+        """Test unsent alerts are put back unless the user set a new one."""
+        index = make_index(tmp_path, [("ana", "USD", 500.0, ABOVE)])
+
+        assert index.restore("USD", [("ana", 400.0, ABOVE), ("luis", 380.0, ABOVE)])
+
+        assert index.read("USD")[0][ABOVE] == [[380.0, "luis"], [500.0, "ana"]]
+
+    @pytest.mark.parametrize(
+        "error",
+        [OSError("disk full"), EndpointConnectionError(endpoint_url="https://s3")],
+    )
+    def test_store_errors(self, error):
+        """Test an unreachable store neither raises nor reports alerts."""
+        store = Mock()
+        store.read_versioned.side_effect = error
+        index = AlertIndex(store)
+
+        assert not index.subscribe("ana", "USD", 400.0, ABOVE)
+        assert index.pop_crossed("USD", 500.0) == []
+
+    def test_contended_index_gives_up(self):
+        """Test an index that stays contended is left alone."""
+        store = Mock()
+        store.read_versioned.return_value = (None, None)
+        store.write_if_version.return_value = False
+
+        assert not AlertIndex(store, max_attempts=2).subscribe(
+            "ana", "USD", 400.0, ABOVE
+        )
+        assert store.write_if_version.call_count == 2
+        store.write_if_version.assert_called_with(
+            get_key("USD"), b'{"above":[[400.0,"ana"]],"below":[]}', None
+        )
+
+
+class TestProactiveEventsClient:
+    """Tests for ProactiveEventsClient."""
+
+    def make_client(self, **kwargs):
+        clock = FakeClock()
+        session = Mock()
+        client = ProactiveEventsClient(
+            url="http://stand-in.test/events",
+            session=session,
+            clock=clock,
+            sleep=clock.sleep,
+            **kwargs,
+        )
+        return client, session, clock
+
+    def test_batches_are_paced(self):
+        """Test batches are spaced to stay under the rate limit."""
+        client, session, clock = self.make_client(batch_size=2, rate=4)
+        sent_at = []
+
+        def post(*args, **kwargs):
+            sent_at.append(clock.now)
+            return Mock()
+
+        session.post.side_effect = post
+        events = [{"referenceId": str(n)} for n in range(5)]
+
+        assert client.send(events) == []
+
+        assert sent_at == [0.0, 0.0, 0.5, 0.5, 1.0]
+        url = session.post.call_args.args[0]
+        assert url == "http://stand-in.test/events"
+        assert session.post.call_args.kwargs["headers"] == {}
+
+    def test_token_is_cached(self):
+        """Test a Login with Amazon token is fetched once and renewed on expiry."""
+        client, session, clock = self.make_client(client_id="id", client_secret="s")
+        token = Mock()
+        token.json.side_effect = [
+            {"access_token": "first", "expires_in": 3600},
+            {"access_token": "second", "expires_in": 3600},
+        ]
+        session.post.side_effect = lambda url, **kwargs: (
+            token if url == LWA_TOKEN_URL else Mock()
+        )
+
+        client.send([{"referenceId": "1"}])
+        client.send([{"referenceId": "2"}])
+        clock.now += 3600
+        client.send([{"referenceId": "3"}])
+
+        headers = [
+            call.kwargs["headers"]
+            for call in session.post.call_args_list
+            if call.args[0] != LWA_TOKEN_URL
+        ]
+        assert headers == [
+            {"Authorization": "Bearer first"},
+            {"Authorization": "Bearer first"},
+            {"Authorization": "Bearer second"},
+        ]
+
+    def test_failures(self):
+        """Test rejected events are returned and a failed token sends nothing."""
+        client, session, _ = self.make_client()
+        rejected = Mock()
+        rejected.raise_for_status.side_effect = requests.HTTPError("403")
+        session.post.side_effect = [Mock(), rejected]
+
+        events = [{"referenceId": "1"}, {"referenceId": "2"}]
+        assert client.send(events) == [{"referenceId": "2"}]
+
+        client, session, _ = self.make_client(client_id="id", client_secret="s")
+        session.post.side_effect = requests.ConnectionError("down")
+        assert client.send(events) == events
+        assert session.post.call_count == 1
+
+
+class TestRateAlerts:
+    """Tests for RateAlerts."""
+
+    def test_subscribe_infers_the_direction(self, tmp_path):
+        """Test a threshold above the rate waits for a rise, below for a fall."""
+        index = make_index(tmp_path)
+        alerts = RateAlerts(index, Mock(), describe)
+
+        assert alerts.subscribe("ana", "USD", 400.0, 390.0) == ABOVE
+        assert alerts.subscribe("luis", "USD", 380.0, 390.0) == BELOW
+        assert index.read("USD")[0] == {
+            ABOVE: [[400.0, "ana"]],
+            BELOW: [[380.0, "luis"]],
+        }
+
+    def test_evaluate_notifies_once(self, tmp_path):
+        """Test reached alerts are sent once, in one fan-out."""
+        index = make_index(
+            tmp_path,
+            [
+                ("ana", "USD", 400.0, ABOVE),
+                ("luis", "EUR", 420.0, BELOW),
+                ("eva", "MLC", 300.0, ABOVE),
+            ],
+        )
+        client = Mock()
+        client.send.return_value = []
+        alerts = RateAlerts(index, client, describe, clock=lambda: 1760918400.0)
+        rates = {"USD": 401.0, "EUR": 415.0, "MLC": 250.0, "buy": {"USD": 399.0}}
+
+        assert alerts.evaluate(rates) == 2
+        assert alerts.evaluate(rates) == 0
+
+        (events,), _ = client.send.call_args_list[0]
+        assert [event["relevantAudience"]["payload"]["user"] for event in events] == [
+            "ana",
+            "luis",
+        ]
+        message = events[0]["event"]["payload"]["messageGroup"]["creator"]["name"]
+        assert message == "USD above 400.0 at 401.0"
+        client.send.assert_called_once()
+
+    def test_collect_does_not_send(self, tmp_path):
+        """Test collecting pops the reached alerts without notifying anyone."""
+        index = make_index(tmp_path, [("ana", "USD", 400.0, ABOVE)])
+        client = Mock()
+        alerts = RateAlerts(index, client, describe)
+
+        pending = alerts.collect({"USD": 401.0})
+
+        assert [alert for alert, _ in pending] == [("USD", "ana", 400.0, ABOVE)]
+        assert alerts.collect({"USD": 401.0}) == []
+        client.send.assert_not_called()
+
+    def test_unsent_alerts_are_retried(self, tmp_path):
+        """Test alerts whose notification failed fire on the next refresh."""
+        index = make_index(
+            tmp_path, [("ana", "USD", 400.0, ABOVE), ("luis", "USD", 390.0, ABOVE)]
+        )
+        client = Mock()
+        client.send.side_effect = lambda events: events[1:]
+        alerts = RateAlerts(index, client, describe)
+
+        assert alerts.evaluate({"USD": 401.0}) == 1
+        assert index.read("USD")[0][ABOVE] == [[400.0, "ana"]]
+
+        client.send.side_effect = lambda events: []
+        assert alerts.evaluate({"USD": 401.0}) == 1
+        assert index.read("USD")[0][ABOVE] == []
+
+    def test_max_per_pass(self, tmp_path):
+        """Test a large fan-out is spread over several refreshes."""
+        index = make_index(
+            tmp_path, [(f"user{n}", "USD", 400.0, ABOVE) for n in range(5)]
+        )
+        client = Mock()
+        client.send.return_value = []
+        alerts = RateAlerts(index, client, describe, max_per_pass=3)
+
+        assert alerts.evaluate({"USD": 401.0}) == 3
+        assert alerts.evaluate({"USD": 401.0}) == 2
+
+
+class TestBuildEvent:
+    """Tests for build_event function."""
+
+    def test_message_alert_for_one_user(self):
+        """Test the event is a unicast message alert that expires."""
+        from datetime import datetime, timezone
+
+        event = build_event(
+            "amzn1.ask.account.X",
+            "USD above 400",
+            datetime(2026, 10, 19, tzinfo=timezone.utc),
+        )
+
+        assert event["timestamp"] == "2026-10-19T00:00:00.00Z"
+        assert event["expiryTime"] == "2026-10-19T12:00:00.00Z"
+        assert event["event"]["name"] == "AMAZON.MessageAlert.Activated"
+        assert event["relevantAudience"] == {
+            "type": "Unicast",
+            "payload": {"user": "amzn1.ask.account.X"},
+        }
+
+
+class TestGetRateAlerts:
+    """Tests for get_rate_alerts function."""
+
+    def test_disabled_without_credentials(self, monkeypatch, tmp_path):
+        """Test alerts are off when notifications cannot be sent."""
+        monkeypatch.delenv("ALEXA_CLIENT_ID", raising=False)
+        monkeypatch.delenv("PROACTIVE_EVENTS_URL", raising=False)
+
+        assert get_rate_alerts(FileSystemObjectStore(tmp_path), describe) is None
+
+    def test_stand_in(self, monkeypatch, tmp_path):
+        """Test PROACTIVE_EVENTS_URL sends to a stand-in without a token."""
+        monkeypatch.delenv("ALEXA_CLIENT_ID", raising=False)
+        monkeypatch.setenv("PROACTIVE_EVENTS_URL", "http://127.0.0.1:8090/")
+        monkeypatch.setenv("ALERTS_BATCH_SIZE", "5")
+        monkeypatch.setenv("ALERTS_RATE_LIMIT", "2")
+        monkeypatch.setenv("ALERTS_MAX_PER_PASS", "20")
+
+        alerts = get_rate_alerts(FileSystemObjectStore(tmp_path), describe)
+
+        assert alerts.client.url == "http://127.0.0.1:8090/"
+        assert alerts.client.get_token() is None
+        assert (alerts.client.batch_size, alerts.client.rate) == (5, 2.0)
+        assert alerts.max_per_pass == 20
+
+    def test_live_endpoint_by_default(self, monkeypatch, tmp_path):
+        """Test the skill's credentials send to the live endpoint."""
+        monkeypatch.setenv("ALEXA_CLIENT_ID", "id")
+        monkeypatch.setenv("ALEXA_CLIENT_SECRET", "secret")
+        monkeypatch.delenv("PROACTIVE_EVENTS_URL", raising=False)
+
+        alerts = get_rate_alerts(FileSystemObjectStore(tmp_path), describe)
+
+        assert alerts.client.url == PROACTIVE_EVENTS_URL
+        assert "/stages/" not in PROACTIVE_EVENTS_URL
@@ -0,0 +1,159 @@
+"""Tests for lambda/briefing.py."""
+
+import json
+import sys
+import xml.etree.ElementTree as ET
+from datetime import date
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from briefing import (
+    FEED_JSON_KEY,
+    FEED_RSS_KEY,
+    SOURCE_URL,
+    BriefingFeed,
+    get_briefing_feed,
+    get_uid,
+    render_text,
+)
+from persistence import FileSystemObjectStore
+from rate_cache import RateCache
+
+RATES = {"USD": 120.004, "EUR": 130.5, "MLC": 118.0}
+NOW = 1760918400.0  # 2025-10-20 00:00:00 UTC
+TODAY = date(2025, 10, 19)
+
+
+def make_feed(store, now=NOW, today=TODAY):
+    return BriefingFeed(store, clock=lambda: now, today=lambda: today)
+
+
+def make_store():
+    store = Mock()
+    store.read_bytes.return_value = None
+    return store
+
+
+class TestRenderText:
+    """Tests for render_text function."""
+
+    def test_reads_rates_and_date(self):
+        """Test the briefing says the greeting, date and every rate."""
+        text = render_text(
+            {"USD": 120.0, "EUR": 130.5, "MLC": 118.0}, date(2025, 10, 19), "Asere"
+        )
+
+        assert text == (
+            "Asere. Hoy 19 de octubre de 2025 el U. S. D. está en 120.0 pesos, "
+            "el Euro en 130.5 y el M. L. C. en 118.0."
+        )
+
+
+class TestBriefingFeed:
+    """Tests for BriefingFeed."""
+
+    def test_writes_json_feed(self, tmp_path):
+        """Test the JSON feed holds one Flash Briefing item."""
+        store = FileSystemObjectStore(tmp_path)
+
+        assert make_feed(store).publish(RATES)
+
+        item = json.loads(store.read_bytes(FEED_JSON_KEY))
+        assert item["uid"] == "tasa-cambio-20251019-usd120-eur130.5-mlc118"
+        assert item["updateDate"] == "2025-10-20T00:00:00.0Z"
+        assert item["redirectionUrl"] == SOURCE_URL
+        assert "120.0 pesos" in item["mainText"]
+        assert "130.5" in item["mainText"]
+
+    def test_writes_rss_feed(self, tmp_path):
+        """Test the RSS feed carries the same item and parses as XML."""
+        store = FileSystemObjectStore(tmp_path)
+        make_feed(store).publish(RATES)
+        item = json.loads(store.read_bytes(FEED_JSON_KEY))
+
+        channel = ET.fromstring(store.read_bytes(FEED_RSS_KEY)).find("channel")
+
+        assert channel.findtext("item/guid") == item["uid"]
+        assert channel.findtext("item/description") == item["mainText"]
+        assert channel.findtext("item/pubDate") == "Mon, 20 Oct 2025 00:00:00 +0000"
+
+    def test_skips_unchanged_rates(self):
+        """Test the feed is only rendered again when a rounded rate changes."""
+        store = make_store()
+        feed = make_feed(store)
+
+        assert feed.publish(RATES)
+        assert not feed.publish(dict(RATES, USD=120.001, buy={"USD": 118.0}))
+        assert feed.publish(dict(RATES, USD=121.0))
+
+        assert store.write_bytes.call_count == 4
+
+    def test_uid_is_stable_across_containers(self, tmp_path):
+        """Test a container fetching the published rates does not republish."""
+        store = FileSystemObjectStore(tmp_path)
+        assert make_feed(store).publish(RATES)
+        item = store.read_bytes(FEED_JSON_KEY)
+
+        later = make_feed(store, now=NOW + 3600)
+
+        assert not later.publish(RATES)
+        assert store.read_bytes(FEED_JSON_KEY) == item
+        assert later.publish(RATES | {"USD": 121.0})
+
+    def test_new_day_is_a_new_item(self):
+        """Test the same rates on another day make a new briefing item."""
+        assert get_uid(RATES | {"USD": 120.0}, TODAY) != get_uid(
+            RATES | {"USD": 120.0}, date(2025, 10, 20)
+        )
+
+    def test_store_errors_are_retried(self):
+        """Test a failed write is retried on the next refresh."""
+        store = make_store()
+        store.write_bytes.side_effect = [OSError("disk full"), None, None]
+        feed = make_feed(store)
+
+        assert not feed.publish(RATES)
+        assert feed.publish(RATES)
+
+    def test_rendered_once_per_fetch(self):
+        """Test cached rates are served without rendering the feed again."""
+        store = make_store()
+        cache = RateCache(ttl=60)
+        cache.add_listener(make_feed(store).publish, background=True)
+        fetch = Mock(return_value=RATES)
+
+        for _ in range(5):
+            cache.get_or_fetch(fetch)
+
+        assert cache.wait_for_listeners(timeout=5)
+        assert store.write_bytes.call_count == 2
+
+
+class TestGetBriefingFeed:
+    """Tests for get_briefing_feed function."""
+
+    def test_default_store(self, monkeypatch):
+        """Test the feed is written to the given store by default."""
+        monkeypatch.delenv("BRIEFING_ENABLED", raising=False)
+        monkeypatch.delenv("BRIEFING_DIR", raising=False)
+        store = Mock()
+
+        assert get_briefing_feed(store).store is store
+
+    def test_local_directory(self, monkeypatch, tmp_path):
+        """Test BRIEFING_DIR writes the feed to a local directory."""
+        monkeypatch.delenv("BRIEFING_ENABLED", raising=False)
+        monkeypatch.setenv("BRIEFING_DIR", str(tmp_path))
+
+        get_briefing_feed(Mock()).publish(RATES)
+
+        assert (tmp_path / "briefing" / "feed.json").exists()
+
+    def test_disabled(self, monkeypatch):
+        """Test BRIEFING_ENABLED=false turns the feed off."""
+        monkeypatch.setenv("BRIEFING_ENABLED", "false")
+
+        assert get_briefing_feed(Mock()) is None
@@ -0,0 +1,169 @@
+"""Tests for scripts/build_artifact.py."""
+
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import build_artifact
+from build_artifact import (
+    EXTENSION_SUFFIXES,
+    ZIP_HANDLER,
+    ZIP_NAME,
+    build,
+    classify,
+    get_data_files,
+    get_top_level,
+)
+
+
+def write(path, text=""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    """A fake skill directory and site-packages, with the build pointed at them."""
+    source = tmp_path / "lambda"
+    write(source / "lambda_function.py", "import helper\n")
+    write(source / "helper.py", "VALUE = 1\n")
+    write(source / "__init__.py")
+    write(source / "requirements.txt", "requests\n")
+    write(source / "rates_snapshot.json", "{}")
+
+    site_dir = tmp_path / "site-packages"
+    write(site_dir / "pkg" / "__init__.py", "from pkg import sub\n")
+    write(site_dir / "pkg" / "sub.py", "NAME = 'sub'\n")
+    write(site_dir / "pkg" / "data.json", "{}")
+    write(site_dir / "pkg" / "py.typed")
+    write(site_dir / "pkg" / "sub.pyi", "NAME: str\n")
+    write(site_dir / "single.py", "VALUE = 2\n")
+    write(site_dir / "boto3" / "__init__.py")
+
+    monkeypatch.setattr(build_artifact, "SOURCE_DIR", source.resolve())
+    monkeypatch.setattr(build_artifact, "get_site_dirs", lambda: [site_dir.resolve()])
+    return source.resolve(), site_dir.resolve()
+
+
+class TestGetTopLevel:
+    """Tests for get_top_level function."""
+
+    def test_packages_and_modules(self):
+        """Test packages, modules and extension modules map to import names."""
+        assert get_top_level(Path("requests/api.py")) == "requests"
+        assert get_top_level(Path("six.py")) == "six"
+        extension = Path(f"_cffi_backend{EXTENSION_SUFFIXES[0]}")
+        assert get_top_level(extension) == "_cffi_backend"
+
+
+class TestClassify:
+    """Tests for classify function."""
+
+    def test_splits_skill_and_dependencies(self, tree, tmp_path):
+        """Test runtime-provided packages and the standard library are left out."""
+        source, site_dir = tree
+        files = [
+            source / "lambda_function.py",
+            source / "helper.py",
+            site_dir / "pkg" / "__init__.py",
+            site_dir / "single.py",
+            site_dir / "boto3" / "__init__.py",
+            write(tmp_path / "stdlib" / "json.py"),
+        ]
+
+        own, dependencies = classify(files)
+
+        assert own == [source / "lambda_function.py", source / "helper.py"]
+        assert dependencies == {site_dir: [Path("pkg/__init__.py"), Path("single.py")]}
+
+
+class TestGetDataFiles:
+    """Tests for get_data_files function."""
+
+    def test_non_python_files_of_used_packages(self, tree):
+        """Test data files are kept and stubs and type markers are not."""
+        _, site_dir = tree
+
+        data = get_data_files(site_dir, [Path("pkg/__init__.py"), Path("single.py")])
+
+        assert data == {Path("pkg/data.json")}
+
+
+class TestBuild:
+    """Tests for build function."""
+
+    def dependencies(self, site_dir):
+        return {
+            site_dir: [
+                Path("pkg/__init__.py"),
+                Path("pkg/sub.py"),
+                Path("single.py"),
+            ]
+        }
+
+    def test_directory_layout(self, tree, tmp_path):
+        """Test modules ship with bytecode and the data files they need."""
+        source, site_dir = tree
+        output = tmp_path / "slim"
+        own = [source / "lambda_function.py", source / "helper.py"]
+
+        count = build(output, own, self.dependencies(site_dir), False)
+
+        assert count == 4
+        shipped = {
+            str(path.relative_to(output)).replace("\\", "/")
+            for path in output.rglob("*")
+            if path.is_file()
+        }
+        tag = sys.implementation.cache_tag
+        assert {
+            "lambda_function.py",
+            f"__pycache__/lambda_function.{tag}.pyc",
+            "rates_snapshot.json",
+            "pkg/__init__.py",
+            f"pkg/__pycache__/sub.{tag}.pyc",
+            "pkg/data.json",
+            "single.py",
+        } <= shipped
+        assert "requirements.txt" not in shipped
+        assert "__init__.py" not in shipped
+        assert "pkg/py.typed" not in shipped
+
+    def test_zip_layout(self, tree, tmp_path):
+        """Test pure-Python dependencies are importable from the bundle."""
+        source, site_dir = tree
+        output = tmp_path / "slim"
+
+        build(output, [source / "helper.py"], self.dependencies(site_dir), True)
+
+        with zipfile.ZipFile(output / ZIP_NAME) as archive:
+            assert sorted(archive.namelist()) == [
+                "pkg/__init__.pyc",
+                "pkg/data.json",
+                "pkg/sub.pyc",
+                "single.pyc",
+            ]
+        assert (output / ZIP_HANDLER).is_file()
+        assert not (output / "pkg").exists()
+
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-S",
+                "-c",
+                "import sys; sys.path.insert(0, sys.argv[1]); "
+                "import pkg, single; print(pkg.sub.NAME, single.VALUE)",
+                str(output / ZIP_NAME),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        assert result.stdout.split() == ["sub", "2"]
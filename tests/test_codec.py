@@ -0,0 +1,164 @@
+"""Tests for lambda/codec.py."""
+
+import json
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from codec import (
+    FORMAT_VERSION,
+    HEADER,
+    MAGIC,
+    decode_rates,
+    decode_snapshot,
+    encode_rates,
+    encode_snapshot,
+)
+
+RATES = {"USD": 120.0, "EUR": 130.5, "MLC": 118.25}
+HISTORY = [
+    (1760832000, {"USD": 119.0, "EUR": 129.0, "MLC": 117.0}),
+    (1760745600, {"USD": 118.0, "EUR": 128.0, "MLC": 116.0}),
+    (1760918400, RATES),
+]
+
+
+class TestSnapshot:
+    """Tests for single snapshot encoding."""
+
+    def test_round_trip(self):
+        """Test a snapshot decodes to the same timestamp and rates."""
+        data = encode_snapshot(1760918400, RATES)
+
+        assert decode_snapshot(data) == (1760918400, RATES)
+
+    def test_is_compact(self):
+        """Test the binary snapshot is smaller than its JSON text."""
+        data = encode_snapshot(1760918400, RATES)
+
+        assert data.startswith(MAGIC + bytes([FORMAT_VERSION]))
+        assert len(data) == 56
+        assert len(data) < len(json.dumps({"fetched_at": 1760918400, **RATES}))
+
+    def test_missing_rate_is_omitted(self):
+        """Test rates absent from a snapshot stay absent after decoding."""
+        data = encode_snapshot(1760918400, {"USD": 120.0, "EUR": 130.0})
+
+        assert decode_snapshot(data)[1] == {"USD": 120.0, "EUR": 130.0}
+        assert math.isnan(decode_rates(data).values[2])
+
+    def test_rejects_history(self):
+        """Test decode_snapshot insists on exactly one record."""
+        with pytest.raises(ValueError):
+            decode_snapshot(encode_rates(HISTORY))
+
+
+class TestRates:
+    """Tests for encode_rates and decode_rates."""
+
+    def test_records_are_sorted(self):
+        """Test records come back in timestamp order."""
+        records = decode_rates(encode_rates(HISTORY))
+
+        assert list(records) == sorted(HISTORY, key=lambda record: record[0])
+        assert records[-1] == (1760918400, RATES)
+
+    def test_decoding_is_zero_copy(self):
+        """Test the columns are views over the encoded buffer."""
+        buffer = bytearray(encode_rates(HISTORY))
+        records = decode_rates(buffer)
+
+        assert isinstance(records.timestamps, memoryview)
+        assert records.timestamps.obj is buffer
+        assert records.values.obj is buffer
+
+    def test_find(self):
+        """Test binary search for the latest record at or before a time."""
+        records = decode_rates(encode_rates(HISTORY))
+
+        assert records.find(1760745599) == -1
+        assert records.find(1760745600) == 0
+        assert records.find(1760900000) == 1
+        assert records.find(1800000000) == 2
+
+    def test_custom_codes(self):
+        """Test the code dictionary header carries other currencies."""
+        data = encode_rates([(0, {"CAD": 90.0})], codes=("CAD",))
+
+        records = decode_rates(data)
+
+        assert records.codes == ("CAD",)
+        assert records[0] == (0, {"CAD": 90.0})
+
+    def test_invalid_code(self):
+        """Test codes must fit the fixed-width dictionary."""
+        with pytest.raises(ValueError):
+            encode_rates([(0, {"EURO": 1.0})], codes=("EURO",))
+
+    def test_empty(self):
+        """Test an empty history round-trips."""
+        records = decode_rates(encode_rates([]))
+
+        assert len(records) == 0
+        assert records.find(0) == -1
+
+
+class TestJsonFallback:
+    """Tests for the readable JSON encoding."""
+
+    def test_json_round_trip(self):
+        """Test JSON-encoded records decode like binary ones."""
+        data = encode_rates(HISTORY, binary=False)
+
+        assert json.loads(data)["version"] == FORMAT_VERSION
+        assert list(decode_rates(data)) == list(decode_rates(encode_rates(HISTORY)))
+
+    def test_to_json(self):
+        """Test binary records can be dumped for debugging."""
+        records = decode_rates(encode_snapshot(1760918400, RATES))
+
+        assert json.loads(records.to_json())["records"] == [[1760918400, RATES]]
+
+
+class TestInvalidData:
+    """Tests for rejecting bad input."""
+
+    def test_truncated(self):
+        """Test truncated data is rejected."""
+        data = encode_rates(HISTORY)
+
+        with pytest.raises(ValueError):
+            decode_rates(data[:-1])
+        with pytest.raises(ValueError):
+            decode_rates(data[:4])
+
+    def test_bad_magic(self):
+        """Test foreign data is rejected."""
+        with pytest.raises(ValueError):
+            decode_rates(b"XYZ" + encode_rates(HISTORY)[3:])
+
+    def test_newer_version(self):
+        """Test data from a newer format version is rejected."""
+        data = bytearray(encode_rates(HISTORY))
+        data[len(MAGIC)] = FORMAT_VERSION + 1
+
+        with pytest.raises(ValueError, match="version"):
+            decode_rates(data)
+        with pytest.raises(ValueError, match="version"):
+            decode_rates(
+                json.dumps({"version": 2, "codes": [], "records": []}).encode()
+            )
+
+    def test_invalid_json(self):
+        """Test malformed JSON is reported as a ValueError."""
+        with pytest.raises(ValueError):
+            decode_rates(b'{"version": 1}')
+
+    def test_header_size(self):
+        """Test the header layout is stable."""
+        assert HEADER.size == 9
@@ -0,0 +1,228 @@
+"""Tests for lambda/fast_path.py."""
+
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from fast_path import (
+    FastPath,
+    FastResponseFactory,
+    UnsupportedResponseError,
+    is_fast_path_enabled,
+    parse_envelope,
+)
+from lambda_function import sb
+
+ENVELOPES_DIR = Path(__file__).parent / "envelopes"
+ENVELOPES = sorted(path.name for path in ENVELOPES_DIR.glob("*.json"))
+FAST_PATH_INTENTS = (
+    "ExchangeRateIntent",
+    "ExchangeRateRequestIntent",
+    "ConvertCurrencyIntent",
+    "MyRatesIntent",
+    "HistoricalRateIntent",
+    "MarketRateIntent",
+    "WhyExchangeRateIntent",
+)
+RATES = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+# Launch and help are not fast-path intents; screen devices get APL directives
+FULL_PIPELINE_ENVELOPES = ("launch.json", "help.json", "exchange_rate_show.json")
+
+
+def load_envelope(name):
+    return json.loads((ENVELOPES_DIR / name).read_text(encoding="utf-8"))
+
+
+def run(invoke, event, directory):
+    """Invoke the skill against an isolated attribute store."""
+    adapter = sb.persistence_adapter
+    with patch.object(adapter, "directory", directory):
+        adapter.save_attributes(
+            adapter_envelope(event),
+            {"favorite_currency": "EUR", "default_amount": 20.0},
+        )
+        response = invoke(event, None)
+        stored = adapter.get_attributes(adapter_envelope(event))
+    return json.dumps(response, ensure_ascii=False), stored
+
+
+def adapter_envelope(event):
+    user_id = event["context"]["System"]["user"]["userId"]
+    return SimpleNamespace(
+        context=SimpleNamespace(
+            system=SimpleNamespace(user=SimpleNamespace(user_id=user_id))
+        )
+    )
+
+
+class TestFastResponseFactory:
+    """Tests for FastResponseFactory."""
+
+    def test_speak_only(self):
+        """Test a speech-only response."""
+        response = FastResponseFactory().speak("Saludos broder").response
+
+        assert response == {
+            "outputSpeech": {"type": "SSML", "ssml": "<speak>Saludos broder</speak>"}
+        }
+
+    def test_speak_and_ask(self):
+        """Test reprompts keep the session open."""
+        response = FastResponseFactory().speak("Hola").ask("Dime").response
+
+        assert list(response) == ["outputSpeech", "reprompt", "shouldEndSession"]
+        assert response["shouldEndSession"] is False
+
+    def test_existing_speak_tags_are_trimmed(self):
+        """Test speech already wrapped in <speak> is not double wrapped."""
+        response = FastResponseFactory().speak(" <speak> Hola </speak> ").response
+
+        assert response["outputSpeech"]["ssml"] == "<speak>Hola</speak>"
+
+    def test_unsupported_features(self):
+        """Test features it cannot build are reported, not half-built."""
+        factory = FastResponseFactory()
+
+        with pytest.raises(UnsupportedResponseError):
+            factory.speak("Hola", play_behavior="ENQUEUE")
+        with pytest.raises(UnsupportedResponseError):
+            factory.add_directive(Mock())
+
+
+class TestParseEnvelope:
+    """Tests for parse_envelope function."""
+
+    def test_extracts_slots_and_user(self):
+        """Test the view exposes the fields the handlers read."""
+        envelope = parse_envelope(
+            load_envelope("convert_euros.json"), FAST_PATH_INTENTS
+        )
+
+        assert envelope.request.intent.name == "ConvertCurrencyIntent"
+        assert envelope.request.intent.slots["amount"].value == "50"
+        assert envelope.request.intent.slots["sourceCurrency"].value == "euros"
+        assert envelope.context.system.user.user_id == (
+            "amzn1.ask.account.AHV2EXAMPLEUSER"
+        )
+
+    def test_missing_slot_value(self):
+        """Test slots without a value map to None like the SDK model."""
+        envelope = parse_envelope(
+            load_envelope("request_missing_slot.json"), FAST_PATH_INTENTS
+        )
+
+        assert envelope.request.intent.slots["currency"].value is None
+
+    def test_voice_only_device(self):
+        """Test the view describes a device without APL support."""
+        envelope = parse_envelope(
+            load_envelope("exchange_rate.json"), FAST_PATH_INTENTS
+        )
+
+        interfaces = envelope.context.system.device.supported_interfaces
+        assert interfaces.alexa_presentation_apl is None
+
+    @pytest.mark.parametrize("name", FULL_PIPELINE_ENVELOPES)
+    def test_other_requests_are_declined(self, name):
+        """Test requests outside the fast path go to the full pipeline."""
+        assert parse_envelope(load_envelope(name), FAST_PATH_INTENTS) is None
+
+    def test_malformed_event_is_declined(self):
+        """Test events without a user id go to the full pipeline."""
+        event = load_envelope("exchange_rate.json")
+        del event["context"]
+
+        assert parse_envelope(event, FAST_PATH_INTENTS) is None
+
+
+class TestIsFastPathEnabled:
+    """Tests for is_fast_path_enabled function."""
+
+    def test_enabled_by_default(self, monkeypatch):
+        """Test the fast path is on unless disabled."""
+        monkeypatch.delenv("FAST_PATH_ENABLED", raising=False)
+
+        assert is_fast_path_enabled() is True
+
+    def test_can_be_disabled(self, monkeypatch):
+        """Test the environment toggle turns the fast path off."""
+        monkeypatch.setenv("FAST_PATH_ENABLED", "false")
+
+        assert is_fast_path_enabled() is False
+
+
+@patch(
+    "lambda_function.get_random_exchange_explanation",
+    Mock(return_value="Es la ley de la oferta y la demanda asere."),
+)
+@patch("lambda_function.get_random_greeting", Mock(return_value="En talla"))
+class TestDifferential:
+    """Differential tests: fast path vs full SDK pipeline on recorded envelopes."""
+
+    @pytest.mark.parametrize("rates", [RATES, None], ids=["rates", "api_failure"])
+    @pytest.mark.parametrize("name", ENVELOPES)
+    def test_byte_for_byte_equivalent(self, name, rates, tmp_path):
+        """Test both pipelines produce identical responses and stored state."""
+        full_pipeline = sb.lambda_handler()
+        fast_path = FastPath(sb.create(), FAST_PATH_INTENTS)
+        served_fast = []
+
+        def fast_or_full(event, context):
+            response = fast_path.invoke(event, context)
+            served_fast.append(response is not None)
+            return response or full_pipeline(event, context)
+
+        event = load_envelope(name)
+        with patch("lambda_function.get_rounded_exchange_rates", return_value=rates):
+            expected = run(full_pipeline, event, tmp_path / "full")
+            actual = run(fast_or_full, event, tmp_path / "fast")
+
+        assert actual == expected
+        assert served_fast == [name not in FULL_PIPELINE_ENVELOPES]
+
+    @patch("lambda_function.get_rounded_exchange_rates", Mock(return_value=RATES))
+    def test_event_is_not_mutated(self, tmp_path):
+        """Test session attributes are copied, not shared with the event."""
+        fast_path = FastPath(sb.create(), FAST_PATH_INTENTS)
+        event = load_envelope("request_mlc.json")
+        original = json.dumps(event)
+
+        with patch.object(sb.persistence_adapter, "directory", tmp_path):
+            response = fast_path.invoke(event, None)
+
+        response["sessionAttributes"]["turns"].append(3)
+        assert json.dumps(event) == original
+
+    @patch("lambda_function.get_rounded_exchange_rates", Mock(return_value=RATES))
+    def test_unsupported_response_uses_full_pipeline(self, tmp_path):
+        """Test a handler using a feature the fast path lacks is not broken."""
+        fast_path = FastPath(sb.create(), FAST_PATH_INTENTS)
+
+        def handle(self, handler_input):
+            return handler_input.response_builder.speak("Hola").set_card(Mock())
+
+        with patch.object(sb.persistence_adapter, "directory", tmp_path):
+            with patch("lambda_function.ExchangeRateIntentHandler.handle", handle):
+                response = fast_path.invoke(load_envelope("exchange_rate.json"), None)
+
+        assert response is None
+
+    @patch("lambda_function.get_rounded_exchange_rates", Mock(return_value=RATES))
+    def test_fast_path_skips_sdk_deserialisation(self, tmp_path):
+        """Test hot intents never touch the SDK serializer."""
+        skill = sb.create()
+        fast_path = FastPath(skill, FAST_PATH_INTENTS)
+
+        with patch.object(sb.persistence_adapter, "directory", tmp_path):
+            with patch.object(skill.serializer, "deserialize") as mock_deserialize:
+                response = fast_path.invoke(load_envelope("exchange_rate.json"), None)
+
+        assert response is not None
+        mock_deserialize.assert_not_called()
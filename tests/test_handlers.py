@@ -1,6 +1,7 @@
 """Tests for Alexa skill handlers."""
 
 import sys
+from datetime import date, datetime
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -15,8 +16,13 @@ from lambda_function import (
     ExchangeRateRequestIntentHandler,
     FallbackIntentHandler,
     HelpIntentHandler,
+    HistoricalRateIntentHandler,
     LaunchRequestHandler,
+    MarketRateIntentHandler,
+    MyRatesIntentHandler,
+    RateAlertIntentHandler,
     WhyExchangeRateIntentHandler,
+    describe_alert,
 )
 
 
@@ -27,13 +33,12 @@ class TestLaunchRequestHandler:
         """Test handler can handle LaunchRequest."""
         handler = LaunchRequestHandler()
         handler_input = Mock()
-        handler_input.request_envelope.request.request_type = "LaunchRequest"
+        handler_input.request_envelope.request.object_type = "LaunchRequest"
 
-        with patch("lambda_function.ask_utils.is_request_type") as mock_is_type:
-            mock_is_type.return_value = lambda x: True
-            result = handler.can_handle(handler_input)
+        assert handler.can_handle(handler_input) is True
 
-        assert result is True
+        handler_input.request_envelope.request.object_type = "SessionEndedRequest"
+        assert handler.can_handle(handler_input) is False
 
     def test_handle_returns_welcome_message(self):
         """Test handler returns correct welcome message."""
@@ -85,6 +90,7 @@ class TestExchangeRateIntentHandler:
             handler_input.response_builder.speak.call_args
         )
 
+    @patch("lambda_function.load_bundled_snapshot", Mock(return_value=None))
     @patch("lambda_function.get_rounded_exchange_rates")
     def test_api_failure(self, mock_get_rates):
         """Test handler when API fails."""
@@ -98,6 +104,55 @@ class TestExchangeRateIntentHandler:
             handler_input.response_builder.speak.call_args
         )
 
+    @patch("lambda_function.load_bundled_snapshot")
+    @patch("lambda_function.get_rounded_exchange_rates")
+    def test_api_failure_uses_bundled_snapshot(self, mock_get_rates, mock_snapshot):
+        """Test the bundled snapshot is spoken with its date when offline."""
+        handler = ExchangeRateIntentHandler()
+        handler_input = Mock()
+        mock_get_rates.return_value = None
+        mock_snapshot.return_value = {
+            "rates": {"USD": 120.0, "EUR": 130.0, "MLC": 118.0},
+            "fetched_at": datetime(2026, 10, 19, 12, 0),
+        }
+
+        handler.handle(handler_input)
+
+        speech = str(handler_input.response_builder.speak.call_args)
+        assert "Estas son las tasas del 19 de octubre de 2026" in speech
+        assert "El M. L. C. está en 118.0 pesos" in speech
+        handler_input.response_builder.add_directive.assert_not_called()
+
+    @patch("lambda_function.rates_visual")
+    @patch("lambda_function.get_rounded_exchange_rates")
+    def test_screen_device_gets_rates_screen(self, mock_get_rates, mock_visual):
+        """Test devices with APL get the memoised rates screen."""
+        handler = ExchangeRateIntentHandler()
+        handler_input = Mock()
+        mock_get_rates.return_value = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+
+        handler.handle(handler_input)
+
+        mock_visual.directive.assert_called_once_with(mock_get_rates.return_value)
+        handler_input.response_builder.add_directive.assert_called_once_with(
+            mock_visual.directive.return_value
+        )
+
+    @patch("lambda_function.rates_visual")
+    @patch("lambda_function.get_rounded_exchange_rates")
+    def test_voice_only_device_skips_screen(self, mock_get_rates, mock_visual):
+        """Test voice-only devices get no directive and no rendering."""
+        handler = ExchangeRateIntentHandler()
+        handler_input = Mock()
+        device = handler_input.request_envelope.context.system.device
+        device.supported_interfaces.alexa_presentation_apl = None
+        mock_get_rates.return_value = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+
+        handler.handle(handler_input)
+
+        mock_visual.directive.assert_not_called()
+        handler_input.response_builder.add_directive.assert_not_called()
+
 
 class TestExchangeRateRequestIntentHandler:
     """Tests for ExchangeRateRequestIntentHandler."""
@@ -179,6 +234,67 @@ class TestExchangeRateRequestIntentHandler:
             handler_input.response_builder.speak.call_args
         )
 
+    @patch("lambda_function.get_rounded_exchange_rates")
+    @patch("lambda_function.get_random_greeting")
+    def test_request_misspelled_currency(self, mock_greeting, mock_get_rates):
+        """Test unaccented and slang currency names are understood."""
+        handler = ExchangeRateRequestIntentHandler()
+        mock_get_rates.return_value = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+        mock_greeting.return_value = "En talla asere"
+
+        for value in ("dolares", "fulas", "yuma"):
+            handler_input = Mock()
+            currency_slot = Mock()
+            currency_slot.value = value
+            handler_input.request_envelope.request.intent.slots = {
+                "currency": currency_slot
+            }
+
+            handler.handle(handler_input)
+
+            assert "El U. S. D. anda por los 120.0 pesos" in str(
+                handler_input.response_builder.speak.call_args
+            )
+
+    @patch("lambda_function.get_rounded_exchange_rates")
+    def test_request_ambiguous_currency(self, mock_get_rates):
+        """Test an ambiguous currency gets a clarifying question."""
+        handler = ExchangeRateRequestIntentHandler()
+        handler_input = Mock()
+        mock_get_rates.return_value = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+        currency_slot = Mock()
+        currency_slot.value = "dólar euro"
+        handler_input.request_envelope.request.intent.slots = {
+            "currency": currency_slot
+        }
+
+        handler.handle(handler_input)
+
+        question = "Asere, no te entendí bien. Te refieres al U. S. D. o al Euro?"
+        handler_input.response_builder.speak.assert_called_once_with(question)
+        handler_input.response_builder.speak.return_value.ask.assert_called_once_with(
+            question
+        )
+
+    @patch("lambda_function.rates_visual")
+    @patch("lambda_function.get_rounded_exchange_rates")
+    def test_screen_device_gets_rates_screen(self, mock_get_rates, mock_visual):
+        """Test devices with APL get the rates screen with the answer."""
+        handler = ExchangeRateRequestIntentHandler()
+        handler_input = Mock()
+        mock_get_rates.return_value = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+        currency_slot = Mock()
+        currency_slot.value = "euro"
+        handler_input.request_envelope.request.intent.slots = {
+            "currency": currency_slot
+        }
+
+        handler.handle(handler_input)
+
+        handler_input.response_builder.add_directive.assert_called_once_with(
+            mock_visual.directive.return_value
+        )
+
 
 class TestHelpIntentHandler:
     """Tests for HelpIntentHandler."""
@@ -350,6 +466,7 @@ class TestConvertCurrencyIntentHandler:
             handler_input.response_builder.speak.call_args
         )
 
+    @patch("lambda_function.load_bundled_snapshot", Mock(return_value=None))
     @patch("lambda_function.get_rounded_exchange_rates")
     def test_api_failure(self, mock_get_rates):
         """Test handler when API fails."""
@@ -363,6 +480,201 @@ class TestConvertCurrencyIntentHandler:
             handler_input.response_builder.speak.call_args
         )
 
+    @patch("lambda_function.get_rounded_exchange_rates")
+    @patch("lambda_function.get_random_greeting")
+    def test_convert_remembers_preferences(self, mock_greeting, mock_get_rates):
+        """Test a conversion stores the currency and amount for next time."""
+        handler = ConvertCurrencyIntentHandler()
+        handler_input = Mock()
+        handler_input.attributes_manager.persistent_attributes = {}
+        mock_get_rates.return_value = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+        mock_greeting.return_value = "En talla asere"
+
+        amount_slot = Mock()
+        amount_slot.value = "50"
+        currency_slot = Mock()
+        currency_slot.value = "euro"
+        handler_input.request_envelope.request.intent.slots = {
+            "amount": amount_slot,
+            "sourceCurrency": currency_slot,
+        }
+
+        handler.handle(handler_input)
+
+        preferences = handler_input.attributes_manager.persistent_attributes
+        assert preferences["favorite_currency"] == "EUR"
+        assert preferences["default_amount"] == 50.0
+
+
+class TestMyRatesIntentHandler:
+    """Tests for MyRatesIntentHandler."""
+
+    @patch("lambda_function.get_rounded_exchange_rates")
+    @patch("lambda_function.get_random_greeting")
+    def test_favorite_currency_with_amount(self, mock_greeting, mock_get_rates):
+        """Test answering with the favourite currency and usual amount."""
+        handler = MyRatesIntentHandler()
+        handler_input = Mock()
+        handler_input.attributes_manager.persistent_attributes = {
+            "favorite_currency": "USD",
+            "default_amount": 100,
+            "last_rates": {"USD": 115.0, "EUR": 130.0, "MLC": 118.0},
+        }
+        mock_get_rates.return_value = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+        mock_greeting.return_value = "En talla asere"
+
+        handler.handle(handler_input)
+
+        speech = str(handler_input.response_builder.speak.call_args)
+        assert "El U. S. D. está en 120 pesos" in speech
+        assert "Tus 100 dólares son 12000 pesos cubanos" in speech
+        assert "Subió 5 pesos desde la última vez" in speech
+        assert handler_input.attributes_manager.persistent_attributes["last_rates"] == {
+            "USD": 120.0,
+            "EUR": 130.0,
+            "MLC": 118.0,
+        }
+
+    @patch("lambda_function.get_rounded_exchange_rates")
+    def test_no_favorite_currency(self, mock_get_rates):
+        """Test prompting when the user has no stored preference."""
+        handler = MyRatesIntentHandler()
+        handler_input = Mock()
+        handler_input.attributes_manager.persistent_attributes = {}
+
+        handler.handle(handler_input)
+
+        assert "Todavía no sé qué es lo tuyo" in str(
+            handler_input.response_builder.speak.call_args
+        )
+        mock_get_rates.assert_not_called()
+
+
+def make_historical_input(date_value, currency_value=None):
+    handler_input = Mock()
+    date_slot = Mock()
+    date_slot.value = date_value
+    currency_slot = Mock()
+    currency_slot.value = currency_value
+    handler_input.request_envelope.request.intent.slots = {
+        "date": date_slot,
+        "currency": currency_slot,
+    }
+    return handler_input
+
+
+@patch("lambda_function.get_today", Mock(return_value=date(2026, 10, 19)))
+@patch("lambda_function.get_random_greeting", Mock(return_value="En talla"))
+class TestHistoricalRateIntentHandler:
+    """Tests for HistoricalRateIntentHandler."""
+
+    @patch("lambda_function.rate_history")
+    def test_rate_on_recorded_day(self, mock_history):
+        """Test answering with the rate recorded on the asked day."""
+        mock_history.lookup.return_value = (
+            date(2026, 10, 18),
+            {"USD": 119.5, "EUR": 131.0, "MLC": 117.0},
+        )
+        handler_input = make_historical_input("2026-10-18", "dólar")
+
+        HistoricalRateIntentHandler().handle(handler_input)
+
+        mock_history.lookup.assert_called_once_with(date(2026, 10, 18))
+        speech = str(handler_input.response_builder.speak.call_args)
+        assert "El 18 de octubre de 2026 el U. S. D. estaba en 119.5 pesos" in speech
+
+    @patch("lambda_function.rate_history")
+    def test_all_rates_from_earlier_day(self, mock_history):
+        """Test falling back to the closest earlier record for all currencies."""
+        mock_history.lookup.return_value = (
+            date(2026, 10, 15),
+            {"USD": 119.0, "EUR": 131.0, "MLC": 117.0},
+        )
+        handler_input = make_historical_input("2026-10-17")
+
+        HistoricalRateIntentHandler().handle(handler_input)
+
+        speech = str(handler_input.response_builder.speak.call_args)
+        assert "Del 17 de octubre de 2026 no tengo nada" in speech
+        assert "el 15 de octubre de 2026 el U. S. D. estaba en 119" in speech
+        assert "el Euro en 131 y el M. L. C. en 117 pesos" in speech
+
+    @patch("lambda_function.rate_history")
+    def test_nothing_recorded(self, mock_history):
+        """Test dates before the first record."""
+        mock_history.lookup.return_value = None
+        handler_input = make_historical_input("2020-01-01", "euro")
+
+        HistoricalRateIntentHandler().handle(handler_input)
+
+        assert "No tengo apuntadas las tasas del 1 de enero de 2020" in str(
+            handler_input.response_builder.speak.call_args
+        )
+
+    @patch("lambda_function.rate_history")
+    @patch("lambda_function.get_rounded_exchange_rates")
+    def test_today_gets_current_rates(self, mock_get_rates, mock_history):
+        """Test asking for today answers with the current rates."""
+        mock_get_rates.return_value = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+        handler_input = make_historical_input("2026-10-19", "dólar")
+
+        HistoricalRateIntentHandler().handle(handler_input)
+
+        speech = str(handler_input.response_builder.speak.call_args)
+        assert "Hoy el U. S. D. está en 120 pesos" in speech
+        mock_history.lookup.assert_not_called()
+
+    @patch("lambda_function.rate_history")
+    @patch("lambda_function.get_rounded_exchange_rates", Mock(return_value=None))
+    def test_today_without_current_rates(self, mock_history):
+        """Test today's record is used when the rates cannot be fetched."""
+        mock_history.lookup.return_value = (
+            date(2026, 10, 19),
+            {"USD": 119.5, "EUR": 131.0, "MLC": 117.0},
+        )
+        handler_input = make_historical_input("2026-10-19", "euro")
+
+        HistoricalRateIntentHandler().handle(handler_input)
+
+        mock_history.lookup.assert_called_once_with(date(2026, 10, 19))
+        assert "el Euro estaba en 131 pesos" in str(
+            handler_input.response_builder.speak.call_args
+        )
+
+    @patch("lambda_function.rate_history")
+    def test_future(self, mock_history):
+        """Test future days are not looked up."""
+        handler_input = make_historical_input("2026-10-20", "euro")
+
+        HistoricalRateIntentHandler().handle(handler_input)
+
+        assert "yo no adivino el futuro" in str(
+            handler_input.response_builder.speak.call_args
+        )
+        mock_history.lookup.assert_not_called()
+
+    @patch("lambda_function.rate_history")
+    def test_missing_date_reprompts(self, mock_history):
+        """Test asking for the date when the slot is empty."""
+        handler_input = make_historical_input(None, "euro")
+
+        HistoricalRateIntentHandler().handle(handler_input)
+
+        handler_input.response_builder.speak.return_value.ask.assert_called_once()
+        mock_history.lookup.assert_not_called()
+
+    @patch("lambda_function.rate_history")
+    def test_unknown_currency(self, mock_history):
+        """Test an unknown currency is reported before any lookup."""
+        handler_input = make_historical_input("2026-10-18", "yenes")
+
+        HistoricalRateIntentHandler().handle(handler_input)
+
+        assert "No conozco ningún yenes" in str(
+            handler_input.response_builder.speak.call_args
+        )
+        mock_history.lookup.assert_not_called()
+
 
 class TestWhyExchangeRateIntentHandler:
     """Tests for WhyExchangeRateIntentHandler."""
@@ -408,3 +720,253 @@ class TestCatchAllExceptionHandler:
         assert "Asere lo siento, tuve un problemilla ahí" in str(
             handler_input.response_builder.speak.call_args
         )
+
+
+def make_market_input(market_value, currency_value=None):
+    handler_input = Mock()
+    market_slot = Mock()
+    market_slot.value = market_value
+    currency_slot = Mock()
+    currency_slot.value = currency_value
+    handler_input.request_envelope.request.intent.slots = {
+        "market": market_slot,
+        "currency": currency_slot,
+    }
+    return handler_input
+
+
+@patch("lambda_function.get_random_greeting", Mock(return_value="En talla"))
+@patch.dict(
+    "os.environ",
+    {
+        "SPREAD_RATES_URL": "http://proxy.test/spread",
+        "OFFICIAL_RATES_URL": "http://proxy.test/official",
+    },
+)
+class TestMarketRateIntentHandler:
+    """Tests for MarketRateIntentHandler."""
+
+    @patch("lambda_function.get_rounded_exchange_rates")
+    def test_unconfigured_market_is_unavailable(self, mock_get_rates):
+        """Test a market without a source is reported, not fetched."""
+        handler_input = make_market_input("oficial")
+
+        with patch.dict("os.environ", {"OFFICIAL_RATES_URL": ""}):
+            MarketRateIntentHandler().handle(handler_input)
+
+        mock_get_rates.assert_not_called()
+        handler_input.response_builder.speak.assert_called_once_with(
+            "Asere, la tasa oficial del Banco Central no la tengo disponible. "
+            "Te puedo decir la de la calle."
+        )
+
+    @patch("lambda_function.get_rounded_exchange_rates")
+    def test_buy_rate_for_currency(self, mock_get_rates):
+        """Test 'a cómo compran el dólar'."""
+        mock_get_rates.return_value = {"USD": 118.0, "EUR": 128.5}
+        handler_input = make_market_input("compran", "dólar")
+
+        MarketRateIntentHandler().handle(handler_input)
+
+        mock_get_rates.assert_called_once_with("buy")
+        handler_input.response_builder.speak.assert_called_once_with(
+            "En talla. Te compran el U. S. D. a 118 pesos."
+        )
+
+    @patch("lambda_function.get_rounded_exchange_rates")
+    def test_official_rates_skip_missing_currencies(self, mock_get_rates):
+        """Test 'tasa oficial' lists only the currencies the market quotes."""
+        mock_get_rates.return_value = {"USD": 120.0, "EUR": 132.46}
+        handler_input = make_market_input("oficial")
+
+        MarketRateIntentHandler().handle(handler_input)
+
+        mock_get_rates.assert_called_once_with("official")
+        handler_input.response_builder.speak.assert_called_once_with(
+            "En talla. En el Banco Central tienen el U. S. D. a 120 "
+            "y el Euro a 132.46 pesos."
+        )
+
+    @patch("lambda_function.get_rounded_exchange_rates")
+    def test_informal_market_uses_mid_rates(self, mock_get_rates):
+        """Test the informal market answers from the usual rates."""
+        mock_get_rates.return_value = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+        handler_input = make_market_input("la calle")
+
+        MarketRateIntentHandler().handle(handler_input)
+
+        mock_get_rates.assert_called_once_with()
+        handler_input.response_builder.speak.assert_called_once_with(
+            "En talla. En la calle está el U. S. D. a 120, el Euro a 130 "
+            "y el M. L. C. a 118 pesos."
+        )
+
+    @patch("lambda_function.get_rounded_exchange_rates")
+    def test_unavailable_market(self, mock_get_rates):
+        """Test a market whose source did not answer."""
+        mock_get_rates.return_value = None
+        handler_input = make_market_input("venta", "euro")
+
+        MarketRateIntentHandler().handle(handler_input)
+
+        handler_input.response_builder.speak.assert_called_once_with(
+            "Asere, ahora mismo no tengo la tasa de venta del Euro. "
+            "Prueba en un ratito."
+        )
+
+    @patch("lambda_function.get_rounded_exchange_rates")
+    def test_currency_missing_from_market(self, mock_get_rates):
+        """Test asking for a currency the market does not quote."""
+        mock_get_rates.return_value = {"USD": 120.0}
+        handler_input = make_market_input("oficial", "mlc")
+
+        MarketRateIntentHandler().handle(handler_input)
+
+        assert "no tengo la tasa oficial del Banco Central del M. L. C." in str(
+            handler_input.response_builder.speak.call_args
+        )
+
+    @patch("lambda_function.get_rounded_exchange_rates")
+    def test_unknown_market_reprompts(self, mock_get_rates):
+        """Test asking which market when the slot is empty or unknown."""
+        for market_value in (None, "trueque"):
+            handler_input = make_market_input(market_value, "euro")
+
+            MarketRateIntentHandler().handle(handler_input)
+
+            handler_input.response_builder.speak.return_value.ask.assert_called_once()
+        mock_get_rates.assert_not_called()
+
+    @patch("lambda_function.get_rounded_exchange_rates")
+    def test_unknown_currency(self, mock_get_rates):
+        """Test an unknown currency is reported before fetching."""
+        handler_input = make_market_input("compra", "yen")
+
+        MarketRateIntentHandler().handle(handler_input)
+
+        assert "No conozco ningún yen" in str(
+            handler_input.response_builder.speak.call_args
+        )
+        mock_get_rates.assert_not_called()
+
+
+def make_alert_input(currency_value, threshold_value, permissions=None):
+    handler_input = Mock()
+    currency_slot = Mock()
+    currency_slot.value = currency_value
+    threshold_slot = Mock()
+    threshold_slot.value = threshold_value
+    handler_input.request_envelope.request.intent.slots = {
+        "currency": currency_slot,
+        "threshold": threshold_slot,
+    }
+    system = handler_input.request_envelope.context.system
+    system.user.user_id = "amzn1.ask.account.ALERTS"
+    system.user.permissions = permissions
+    return handler_input
+
+
+@patch(
+    "lambda_function.get_rounded_exchange_rates",
+    Mock(return_value={"USD": 390.0, "EUR": 410.0, "MLC": 250.0}),
+)
+class TestRateAlertIntentHandler:
+    """Tests for RateAlertIntentHandler."""
+
+    @patch("lambda_function.rate_alerts")
+    def test_subscribes_above_the_rate(self, mock_alerts):
+        """Test 'avísame cuando el dólar pase de 400'."""
+        mock_alerts.subscribe.return_value = "above"
+        handler_input = make_alert_input("dólar", "400", permissions=Mock())
+
+        RateAlertIntentHandler().handle(handler_input)
+
+        mock_alerts.subscribe.assert_called_once_with(
+            "amzn1.ask.account.ALERTS", "USD", 400.0, 390.0
+        )
+        handler_input.response_builder.speak.assert_called_once_with(
+            "Dale asere, te aviso cuando el U. S. D. pase de 400 pesos. "
+            "Ahora está en 390."
+        )
+        handler_input.response_builder.set_card.assert_not_called()
+
+    @patch("lambda_function.rate_alerts")
+    def test_subscribes_below_the_rate(self, mock_alerts):
+        """Test a threshold under the current rate waits for it to fall."""
+        mock_alerts.subscribe.return_value = "below"
+        handler_input = make_alert_input("euro", "380", permissions=Mock())
+
+        RateAlertIntentHandler().handle(handler_input)
+
+        assert "cuando el Euro baje de 380 pesos" in str(
+            handler_input.response_builder.speak.call_args
+        )
+
+    @patch("lambda_function.rate_alerts")
+    def test_asks_for_notification_permission(self, mock_alerts):
+        """Test users who have not granted notifications get a consent card."""
+        mock_alerts.subscribe.return_value = "above"
+        handler_input = make_alert_input("dólar", "400")
+
+        RateAlertIntentHandler().handle(handler_input)
+
+        (card,), _ = handler_input.response_builder.set_card.call_args
+        assert card.permissions == ["alexa::devices:all:notifications:write"]
+        assert "activa las notificaciones" in str(
+            handler_input.response_builder.speak.call_args
+        )
+
+    @patch("lambda_function.rate_alerts")
+    def test_missing_threshold_reprompts(self, mock_alerts):
+        """Test an empty or invalid threshold asks for the number."""
+        for threshold_value in (None, "mucho", "0"):
+            handler_input = make_alert_input("dólar", threshold_value)
+
+            RateAlertIntentHandler().handle(handler_input)
+
+            handler_input.response_builder.speak.return_value.ask.assert_called_once()
+        mock_alerts.subscribe.assert_not_called()
+
+    @patch("lambda_function.rate_alerts")
+    def test_threshold_equal_to_the_rate(self, mock_alerts):
+        """Test a threshold the rate is already at is not stored."""
+        handler_input = make_alert_input("dólar", "390")
+
+        RateAlertIntentHandler().handle(handler_input)
+
+        handler_input.response_builder.speak.assert_called_once_with(
+            "Asere, el U. S. D. ya está en 390 pesos."
+        )
+        mock_alerts.subscribe.assert_not_called()
+
+    @patch("lambda_function.rate_alerts")
+    def test_store_failure(self, mock_alerts):
+        """Test an alert that could not be stored is reported."""
+        mock_alerts.subscribe.return_value = None
+        handler_input = make_alert_input("dólar", "400")
+
+        RateAlertIntentHandler().handle(handler_input)
+
+        assert "no pude guardar la alerta" in str(
+            handler_input.response_builder.speak.call_args
+        )
+
+    @patch("lambda_function.rate_alerts", None)
+    def test_alerts_unavailable(self):
+        """Test the skill says so when notifications are not configured."""
+        handler_input = make_alert_input("dólar", "400")
+
+        RateAlertIntentHandler().handle(handler_input)
+
+        handler_input.response_builder.speak.assert_called_once_with(
+            "Asere, las alertas no están disponibles ahora mismo."
+        )
+
+    def test_describe_alert(self):
+        """Test the notification text names the currency and the threshold."""
+        assert describe_alert("USD", 400.0, "above", 402.456) == (
+            "Tasa de Cambio Cubana: el U. S. D. pasó de 400 pesos y está en 402.46"
+        )
+        assert describe_alert("EUR", 380.5, "below", 379.0) == (
+            "Tasa de Cambio Cubana: el Euro bajó de 380.5 pesos y está en 379"
+        )
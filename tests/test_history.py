@@ -0,0 +1,245 @@
+"""Tests for lambda/history.py."""
+
+import sys
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from codec import decode_rates
+from history import RateHistory, get_shard_key, parse_date_slot, timestamp_to_day
+from persistence import FileSystemObjectStore
+
+TODAY = date(2026, 10, 19)
+RATES = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+
+
+def make_history(tmp_path, days=()):
+    history = RateHistory(FileSystemObjectStore(tmp_path), max_cached_dates=2)
+    for day, usd in days:
+        history.record(dict(RATES, USD=usd), day=day)
+    history.clear_cache()
+    return history
+
+
+def read_shard(history, day):
+    return decode_rates(history.store.read_bytes(get_shard_key(day)))
+
+
+class TestParseDateSlot:
+    """Tests for parse_date_slot function."""
+
+    def test_day(self):
+        """Test a specific day ("ayer")."""
+        assert parse_date_slot("2026-10-18", TODAY) == date(2026, 10, 18)
+
+    def test_week_resolves_to_sunday(self):
+        """Test a week ("la semana pasada") resolves to its last day."""
+        assert parse_date_slot("2026-W41", TODAY) == date(2026, 10, 11)
+        assert parse_date_slot("2026-W41-WE", TODAY) == date(2026, 10, 11)
+
+    def test_month_resolves_to_last_day(self):
+        """Test a month resolves to its last day."""
+        assert parse_date_slot("2026-09", TODAY) == date(2026, 9, 30)
+
+    def test_current_period_is_capped_at_today(self):
+        """Test the current month or week never resolves to the future."""
+        assert parse_date_slot("2026-10", TODAY) == TODAY
+        assert parse_date_slot("2026-W43", TODAY) == TODAY
+
+    def test_unsupported_values(self):
+        """Test vague or invalid values are rejected."""
+        assert parse_date_slot(None, TODAY) is None
+        assert parse_date_slot("2026-WI", TODAY) is None
+        assert parse_date_slot("2026-13", TODAY) is None
+        assert parse_date_slot("PRESENT_REF", TODAY) is None
+
+
+class TestRateHistory:
+    """Tests for RateHistory."""
+
+    def test_exact_day(self, tmp_path):
+        """Test the record of the asked day is returned."""
+        history = make_history(
+            tmp_path, [(date(2026, 10, 17), 119.0), (date(2026, 10, 18), 120.0)]
+        )
+
+        assert history.lookup(date(2026, 10, 17)) == (
+            date(2026, 10, 17),
+            dict(RATES, USD=119.0),
+        )
+
+    def test_gap_uses_latest_earlier_record(self, tmp_path):
+        """Test days without a record get the closest earlier one."""
+        history = make_history(
+            tmp_path, [(date(2026, 10, 10), 119.0), (date(2026, 10, 18), 120.0)]
+        )
+
+        day, rates = history.lookup(date(2026, 10, 15))
+
+        assert day == date(2026, 10, 10)
+        assert rates["USD"] == 119.0
+
+    def test_falls_back_to_previous_month(self, tmp_path):
+        """Test a day before its month's first record uses the previous month."""
+        history = make_history(
+            tmp_path, [(date(2026, 8, 30), 110.0), (date(2026, 10, 5), 120.0)]
+        )
+
+        assert history.lookup(date(2026, 10, 2))[0] == date(2026, 8, 30)
+        assert history.lookup(date(2026, 9, 15))[0] == date(2026, 8, 30)
+
+    def test_before_first_record(self, tmp_path):
+        """Test days before the history starts."""
+        history = make_history(tmp_path, [(date(2026, 10, 5), 120.0)])
+
+        assert history.lookup(date(2026, 10, 4)) is None
+        assert history.lookup(date(2025, 1, 1)) is None
+
+    def test_reads_only_one_month(self, tmp_path):
+        """Test a lookup reads a single monthly document, not the history."""
+        history = make_history(
+            tmp_path,
+            [(date(2026, month, 1), 100.0 + month) for month in range(1, 11)],
+        )
+
+        with patch.object(
+            history.store, "read_bytes", wraps=history.store.read_bytes
+        ) as read:
+            history.lookup(date(2026, 6, 15))
+
+        read.assert_called_once_with(get_shard_key(date(2026, 6, 15)))
+
+    def test_warm_dates_skip_io(self, tmp_path):
+        """Test recently asked dates are served from memory."""
+        history = make_history(tmp_path, [(date(2026, 10, 18), 120.0)])
+        history.lookup(date(2026, 10, 18))
+
+        with patch.object(history.store, "read_bytes") as read:
+            with patch.object(history.store, "list_keys") as list_keys:
+                history.lookup(date(2026, 10, 18))
+
+        read.assert_not_called()
+        list_keys.assert_not_called()
+
+    def test_cache_is_bounded(self, tmp_path):
+        """Test the least recently asked date is evicted."""
+        history = make_history(tmp_path, [(date(2026, 10, 1), 120.0)])
+        for day in (2, 3, 2, 4):
+            history.lookup(date(2026, 10, day))
+
+        with patch.object(
+            history.store, "read_bytes", wraps=history.store.read_bytes
+        ) as read:
+            history.lookup(date(2026, 10, 2))
+            history.lookup(date(2026, 10, 3))
+
+        read.assert_called_once_with(get_shard_key(date(2026, 10, 3)))
+
+    def test_record_replaces_same_day(self, tmp_path):
+        """Test later fetches on the same day replace its rates."""
+        history = make_history(tmp_path)
+
+        assert history.record(RATES, day=date(2026, 10, 18)) is True
+        assert history.record(RATES, day=date(2026, 10, 18)) is False
+        assert history.lookup(date(2026, 10, 18))[1] == RATES
+        assert history.record(dict(RATES, USD=121.0), day=date(2026, 10, 18))
+
+        assert history.lookup(date(2026, 10, 18))[1]["USD"] == 121.0
+        assert len(read_shard(history, date(2026, 10, 18))) == 1
+
+    def test_record_keeps_informal_rates_only(self, tmp_path):
+        """Test other markets in a snapshot do not cause extra writes."""
+        history = make_history(tmp_path)
+        snapshot = dict(RATES, buy={"USD": 118.0}, official={"USD": 120.0})
+
+        assert history.record(snapshot, day=date(2026, 10, 18)) is True
+        history.clear_cache()
+        history._last_recorded = None
+        assert history.record(snapshot, day=date(2026, 10, 18)) is False
+        assert history.lookup(date(2026, 10, 18))[1] == RATES
+
+    def test_records_stay_sorted(self, tmp_path):
+        """Test out-of-order records are inserted in date order."""
+        history = make_history(
+            tmp_path,
+            [
+                (date(2026, 10, 18), 120.0),
+                (date(2026, 10, 2), 118.0),
+                (date(2026, 10, 9), 119.0),
+            ],
+        )
+
+        records = read_shard(history, date(2026, 10, 1))
+
+        assert [timestamp_to_day(timestamp) for timestamp, _ in records] == [
+            date(2026, 10, 2),
+            date(2026, 10, 9),
+            date(2026, 10, 18),
+        ]
+        assert [rates["USD"] for _, rates in records] == [118.0, 119.0, 120.0]
+
+    def test_json_encoding_for_debugging(self, tmp_path):
+        """Test months can be written as readable JSON and still looked up."""
+        history = RateHistory(FileSystemObjectStore(tmp_path), binary=False)
+        history.record(RATES, day=date(2026, 10, 18))
+
+        data = history.store.read_bytes(get_shard_key(date(2026, 10, 18)))
+
+        assert data.startswith(b"{")
+        assert history.lookup(date(2026, 10, 19)) == (date(2026, 10, 18), RATES)
+
+    def test_new_month_seen_by_lookups(self, tmp_path):
+        """Test months recorded after the listing are still found."""
+        history = make_history(tmp_path, [(date(2026, 9, 30), 118.0)])
+        assert history.lookup(date(2026, 10, 2))[0] == date(2026, 9, 30)
+
+        other_container = make_history(tmp_path)
+        other_container.record(RATES, day=date(2026, 10, 1))
+
+        assert history.lookup(date(2026, 10, 3))[0] == date(2026, 10, 1)
+
+    def test_recent_days_across_months(self, tmp_path):
+        """Test the last days before a date are returned oldest first."""
+        history = make_history(
+            tmp_path,
+            [
+                (date(2026, 8, 31), 116.0),
+                (date(2026, 9, 29), 117.0),
+                (date(2026, 9, 30), 118.0),
+                (date(2026, 10, 1), 119.0),
+                (date(2026, 10, 3), 120.0),
+            ],
+        )
+
+        recent = history.recent(date(2026, 10, 2), 3)
+
+        assert recent == [
+            (date(2026, 9, 29), dict(RATES, USD=117.0)),
+            (date(2026, 9, 30), dict(RATES, USD=118.0)),
+            (date(2026, 10, 1), dict(RATES, USD=119.0)),
+        ]
+        assert [day for day, _ in history.recent(date(2026, 10, 19), 10)] == [
+            date(2026, 8, 31),
+            date(2026, 9, 29),
+            date(2026, 9, 30),
+            date(2026, 10, 1),
+            date(2026, 10, 3),
+        ]
+        assert history.recent(date(2026, 8, 30), 3) == []
+
+    def test_recent_stops_at_enough_days(self, tmp_path):
+        """Test older months are not read once enough days were found."""
+        history = make_history(
+            tmp_path, [(date(2026, 9, 30), 118.0), (date(2026, 10, 18), 120.0)]
+        )
+        history.shard_keys
+
+        with patch.object(
+            history.store, "read_bytes", wraps=history.store.read_bytes
+        ) as mock_read:
+            assert len(history.recent(date(2026, 10, 19), 1)) == 1
+
+        mock_read.assert_called_once_with(get_shard_key(date(2026, 10, 18)))
@@ -0,0 +1,152 @@
+"""Tests for lambda/markets.py."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import requests
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from markets import (
+    fetch_concurrently,
+    get_fetch_deadline,
+    get_market_url,
+    get_official_rates,
+    get_spread_rates,
+    parse_rates,
+)
+from tracing import Tracer
+
+from tests.conftest import ListExporter
+
+
+def mock_response(data):
+    response = Mock(status_code=200)
+    response.json.return_value = data
+    return response
+
+
+class TestFetchConcurrently:
+    """Tests for fetch_concurrently function."""
+
+    def test_fetches_in_parallel(self):
+        """Test fetchers run at the same time, not one after another."""
+        barrier = threading.Barrier(3, timeout=2)
+
+        def fetch(timeout):
+            barrier.wait()
+            return timeout
+
+        assert fetch_concurrently([fetch, fetch, fetch], 2) == [2, 2, 2]
+
+    def test_partial_results(self):
+        """Test late, failing and empty fetchers leave None in their place."""
+
+        def slow(timeout):
+            time.sleep(0.5)
+            return "late"
+
+        def broken(timeout):
+            raise RuntimeError("boom")
+
+        start = time.perf_counter()
+        results = fetch_concurrently(
+            [lambda timeout: "fast", slow, broken, lambda timeout: None], 0.1
+        )
+
+        assert results == ["fast", None, None, None]
+        assert time.perf_counter() - start < 0.4
+
+    def test_spans_follow_the_fetchers(self, monkeypatch):
+        """Test spans opened in the fetch threads join the caller's trace."""
+        exporter = ListExporter()
+        test_tracer = Tracer(exporter, sample_rate=1)
+        monkeypatch.setattr("markets.tracer", test_tracer)
+
+        def fetch(timeout):
+            with test_tracer.span("rates.http"):
+                return 1
+
+        with test_tracer.start_trace("lambda_handler"):
+            fetch_concurrently([fetch, fetch], 1)
+
+        spans = [span for span in exporter.spans if span["name"] == "rates.http"]
+        (markets_span,) = [
+            span for span in exporter.spans if span["name"] == "rates.markets"
+        ]
+        assert len(spans) == 2
+        assert all(span["parent_id"] == markets_span["span_id"] for span in spans)
+        assert markets_span["attributes"]["markets.missing"] == 0
+
+
+class TestMarketSources:
+    """Tests for the buy/sell and official rate sources."""
+
+    def test_parse_rates(self):
+        """Test currencies are read by lowercase code and missing ones skipped."""
+        assert parse_rates({"usd": 120, "eur": "130.5", "mlc": None}) == {
+            "USD": 120.0,
+            "EUR": 130.5,
+        }
+
+    @patch("markets.session.get")
+    def test_official_rates(self, mock_get, monkeypatch):
+        """Test the official rates come from OFFICIAL_RATES_URL."""
+        monkeypatch.setenv("OFFICIAL_RATES_URL", "http://proxy.test/official")
+        mock_get.return_value = mock_response({"usd": 120, "eur": 132})
+
+        assert get_official_rates(timeout=2) == {
+            "official": {"USD": 120.0, "EUR": 132.0}
+        }
+        mock_get.assert_called_once_with("http://proxy.test/official", timeout=2)
+
+    @patch("markets.session.get")
+    def test_spread_rates(self, mock_get, monkeypatch):
+        """Test buy and sell quotes are split into their own markets."""
+        monkeypatch.setenv("SPREAD_RATES_URL", "http://proxy.test/spread")
+        mock_get.return_value = mock_response(
+            {"usd": {"buy": 118, "sell": 122}, "eur": {"buy": 128}}
+        )
+
+        assert get_spread_rates() == {
+            "buy": {"USD": 118.0, "EUR": 128.0},
+            "sell": {"USD": 122.0},
+        }
+
+    @patch("markets.session.get")
+    def test_unconfigured_markets_are_off(self, mock_get, monkeypatch):
+        """Test markets without a source URL make no request."""
+        monkeypatch.delenv("SPREAD_RATES_URL", raising=False)
+        monkeypatch.delenv("OFFICIAL_RATES_URL", raising=False)
+
+        assert get_market_url("buy") is None
+        assert get_official_rates() is None
+        assert get_spread_rates() is None
+        mock_get.assert_not_called()
+
+    @patch("markets.session.get")
+    def test_failures(self, mock_get, monkeypatch):
+        """Test failed or malformed sources return None."""
+        monkeypatch.setenv("SPREAD_RATES_URL", "http://proxy.test/spread")
+        monkeypatch.setenv("OFFICIAL_RATES_URL", "http://proxy.test/official")
+        mock_get.side_effect = requests.Timeout("timeout")
+        assert get_official_rates() is None
+        assert get_spread_rates() is None
+
+        mock_get.side_effect = None
+        mock_get.return_value = mock_response({"usd": "n/a"})
+        assert get_official_rates() is None
+        mock_get.return_value = mock_response({"usd": 120})
+        assert get_spread_rates() is None
+
+    def test_deadline(self, monkeypatch):
+        """Test RATES_DEADLINE configures the fetch deadline."""
+        monkeypatch.setenv("RATES_DEADLINE", "2.5")
+        assert get_fetch_deadline() == 2.5
+
+        monkeypatch.setenv("RATES_DEADLINE", "soon")
+        assert get_fetch_deadline() == 4.0
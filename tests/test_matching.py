@@ -0,0 +1,98 @@
+"""Tests for lambda/matching.py."""
+
+import sys
+import timeit
+from pathlib import Path
+
+import pytest
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from lambda_function import CURRENCY_ALIASES, currency_matcher
+from matching import AliasMatcher, get_ngrams, normalize
+
+
+class TestNormalize:
+    """Tests for normalize and get_ngrams."""
+
+    def test_strips_accents_case_and_punctuation(self):
+        """Test spoken variants normalize to the same text."""
+        assert normalize("Dólares") == "dolares"
+        assert normalize(" U. S. D. ") == "u s d"
+        assert normalize("¡Euro!") == "euro"
+
+    def test_ngrams_are_padded(self):
+        """Test word boundaries are part of the n-grams."""
+        assert get_ngrams("usd") == {" us", "usd", "sd "}
+        assert get_ngrams("") == {"  "}
+
+
+class TestAliasMatcher:
+    """Tests for AliasMatcher."""
+
+    @pytest.mark.parametrize(
+        "value, code",
+        [
+            ("dólares", "USD"),
+            ("dolares", "USD"),
+            ("DOLAR", "USD"),
+            ("dollar", "USD"),
+            ("dolaress", "USD"),
+            ("fula", "USD"),
+            ("yumas", "USD"),
+            ("euross", "EUR"),
+            ("el euro", "EUR"),
+            ("m l c", "MLC"),
+            ("emelece", "MLC"),
+            ("pesos convertibles", "MLC"),
+            ("peso convertible", "MLC"),
+            ("dolares estadounidenses", "USD"),
+            ("u s d", "USD"),
+        ],
+    )
+    def test_matches_currency_vocabulary(self, value, code):
+        """Test accents, typos and slang resolve to the right currency."""
+        assert currency_matcher.match(value) == (code, [])
+
+    @pytest.mark.parametrize("value", ["libra", "yen", "pesos", "bitcoin", "", None])
+    def test_unknown_values(self, value):
+        """Test values far from every alias do not match."""
+        assert currency_matcher.match(value) == (None, [])
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "dólar canadiense",
+            "dolares canadienses",
+            "dólar australiano",
+            "dólar de hong kong",
+            "euro digital",
+            "usdt",
+            "usdc",
+        ],
+    )
+    def test_other_currencies_are_not_taken_for_ours(self, value):
+        """Test a known word next to an unknown one, or a near code, is no match."""
+        assert currency_matcher.match(value) == (None, [])
+
+    def test_ambiguous_values(self):
+        """Test a value close to two currencies asks which one."""
+        assert currency_matcher.match("dólar euro") == (None, ["USD", "EUR"])
+
+    def test_threshold(self):
+        """Test the threshold bounds how loose a match may be."""
+        matcher = AliasMatcher({"dólar": "USD"}, threshold=0.9)
+
+        assert matcher.match("dolar") == ("USD", [])
+        assert matcher.match("dolares") == (None, [])
+
+    def test_sub_millisecond(self):
+        """Test a fuzzy lookup stays well under a millisecond."""
+        matcher = AliasMatcher(CURRENCY_ALIASES)
+
+        seconds = min(
+            timeit.repeat(lambda: matcher.match("pesos convertible"), number=200)
+        )
+
+        assert seconds / 200 < 0.001
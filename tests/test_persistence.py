@@ -0,0 +1,335 @@
+"""Tests for lambda/persistence.py."""
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from ask_sdk_core.attributes_manager import AttributesManager
+from ask_sdk_core.exceptions import AttributesManagerException
+from botocore.exceptions import ClientError, EndpointConnectionError
+from persistence import (
+    FileSystemObjectStore,
+    FileSystemPersistenceAdapter,
+    S3ObjectStore,
+    S3PersistenceAdapter,
+    SavePersistentAttributesResponseInterceptor,
+    TrackedAttributes,
+    get_persistence_adapter,
+    get_preferences,
+    get_user_key,
+    remember_preferences,
+)
+
+
+def make_envelope(user_id="amzn1.ask.account.TEST"):
+    envelope = Mock()
+    envelope.context.system.user.user_id = user_id
+    return envelope
+
+
+class TestTrackedAttributes:
+    """Tests for TrackedAttributes dirty tracking."""
+
+    def test_new_attributes_are_clean(self):
+        """Test freshly loaded attributes are not dirty."""
+        attributes = TrackedAttributes({"favorite_currency": "USD"})
+
+        assert attributes.dirty is False
+
+    def test_setting_same_value_stays_clean(self):
+        """Test assigning an unchanged value does not mark it dirty."""
+        attributes = TrackedAttributes({"favorite_currency": "USD"})
+
+        attributes["favorite_currency"] = "USD"
+        attributes.update(favorite_currency="USD")
+
+        assert attributes.dirty is False
+
+    def test_changed_value_is_dirty(self):
+        """Test assigning a new value marks only that key dirty."""
+        attributes = TrackedAttributes({"favorite_currency": "USD"})
+
+        attributes.update({"favorite_currency": "EUR", "default_amount": 100})
+
+        assert attributes.dirty_keys == {"favorite_currency", "default_amount"}
+
+    def test_delete_is_dirty(self):
+        """Test removing a key marks it dirty."""
+        attributes = TrackedAttributes({"favorite_currency": "USD"})
+
+        attributes.pop("favorite_currency")
+
+        assert attributes.dirty_keys == {"favorite_currency"}
+
+
+class TestGetUserKey:
+    """Tests for get_user_key function."""
+
+    def test_key_is_stable_and_hashed(self):
+        """Test the same user always maps to the same opaque key."""
+        key = get_user_key(make_envelope())
+
+        assert key == get_user_key(make_envelope())
+        assert key.startswith("users/")
+        assert "amzn1" not in key
+
+    def test_users_get_different_keys(self):
+        """Test different users do not share a key."""
+        assert get_user_key(make_envelope("a")) != get_user_key(make_envelope("b"))
+
+
+class TestFileSystemPersistenceAdapter:
+    """Tests for FileSystemPersistenceAdapter."""
+
+    def test_missing_user_returns_empty(self, tmp_path):
+        """Test unknown users start with empty attributes."""
+        adapter = FileSystemPersistenceAdapter(tmp_path)
+
+        assert adapter.get_attributes(make_envelope()) == {}
+
+    def test_round_trip(self, tmp_path):
+        """Test saved attributes are loaded back."""
+        adapter = FileSystemPersistenceAdapter(tmp_path)
+        envelope = make_envelope()
+
+        attributes = adapter.get_attributes(envelope)
+        attributes["favorite_currency"] = "EUR"
+        adapter.save_attributes(envelope, attributes)
+
+        assert adapter.get_attributes(envelope) == {"favorite_currency": "EUR"}
+        assert attributes.dirty is False
+
+    def test_unchanged_attributes_are_not_written(self, tmp_path):
+        """Test a clean attribute set does not hit the backend."""
+        adapter = FileSystemPersistenceAdapter(tmp_path)
+        envelope = make_envelope()
+
+        with patch.object(adapter, "write") as mock_write:
+            attributes = adapter.get_attributes(envelope)
+            attributes["favorite_currency"] = "USD"
+            adapter.save_attributes(envelope, attributes)
+            adapter.save_attributes(envelope, attributes)
+
+        mock_write.assert_called_once()
+
+    def test_delete(self, tmp_path):
+        """Test deleting a user's attributes."""
+        adapter = FileSystemPersistenceAdapter(tmp_path)
+        envelope = make_envelope()
+        adapter.save_attributes(envelope, {"default_amount": 50})
+
+        adapter.delete_attributes(envelope)
+        adapter.delete_attributes(envelope)
+
+        assert adapter.get_attributes(envelope) == {}
+
+
+class TestS3PersistenceAdapter:
+    """Tests for S3PersistenceAdapter."""
+
+    def test_writes_json_object(self):
+        """Test dirty attributes are written as a JSON object."""
+        adapter = S3PersistenceAdapter("bucket")
+        adapter._client = Mock()
+        envelope = make_envelope()
+
+        attributes = TrackedAttributes()
+        attributes["favorite_currency"] = "MLC"
+        adapter.save_attributes(envelope, attributes)
+
+        kwargs = adapter._client.put_object.call_args.kwargs
+        assert kwargs["Bucket"] == "bucket"
+        assert kwargs["Key"] == get_user_key(envelope)
+        assert kwargs["Body"] == b'{"favorite_currency": "MLC"}'
+
+    def test_missing_object_returns_empty(self):
+        """Test a missing S3 object is treated as a new user."""
+        from botocore.exceptions import ClientError
+
+        adapter = S3PersistenceAdapter("bucket")
+        adapter._client = Mock()
+        adapter._client.get_object.side_effect = ClientError(
+            {"Error": {"Code": "NoSuchKey"}}, "GetObject"
+        )
+
+        assert adapter.get_attributes(make_envelope()) == {}
+
+
+class TestObjectStores:
+    """Tests for listing and conditionally writing documents in the stores."""
+
+    def test_filesystem_list_keys(self, tmp_path):
+        """Test keys are listed sorted and filtered by prefix."""
+        store = FileSystemObjectStore(tmp_path)
+        store.write("history/2026-10.json", {})
+        store.write("history/2026-09.json", {})
+        store.write("users/abc.json", {})
+
+        assert store.list_keys("history/") == [
+            "history/2026-09.json",
+            "history/2026-10.json",
+        ]
+        assert FileSystemObjectStore(tmp_path / "missing").list_keys("") == []
+
+    def test_s3_list_keys(self):
+        """Test every page of the S3 listing is collected."""
+        store = S3ObjectStore("bucket")
+        store._client = Mock()
+        store._client.get_paginator.return_value.paginate.return_value = [
+            {"Contents": [{"Key": "history/2026-10.json"}]},
+            {"Contents": [{"Key": "history/2026-09.json"}]},
+            {},
+        ]
+
+        assert store.list_keys("history/") == [
+            "history/2026-09.json",
+            "history/2026-10.json",
+        ]
+        store._client.get_paginator.return_value.paginate.assert_called_once_with(
+            Bucket="bucket", Prefix="history/"
+        )
+
+    def test_filesystem_write_if_version(self, tmp_path):
+        """Test a write only succeeds against the version that was read."""
+        store = FileSystemObjectStore(tmp_path)
+
+        assert store.read_versioned("throttle/bucket.json") == (None, None)
+        assert store.write_if_version("throttle/bucket.json", b"1", None)
+        assert not store.write_if_version("throttle/bucket.json", b"2", None)
+
+        data, version = store.read_versioned("throttle/bucket.json")
+        assert data == b"1"
+        assert store.write_if_version("throttle/bucket.json", b"2", version)
+        assert not store.write_if_version("throttle/bucket.json", b"3", version)
+        assert store.read_bytes("throttle/bucket.json") == b"2"
+        assert store.list_keys("throttle/") == ["throttle/bucket.json"]
+
+    def test_s3_write_if_version(self):
+        """Test S3 writes are conditional on the ETag, or on absence."""
+        store = S3ObjectStore("bucket")
+        store._client = Mock()
+
+        assert store.write_if_version("key", b"1", None)
+        store._client.put_object.assert_called_with(
+            Bucket="bucket", Key="key", Body=b"1", IfNoneMatch="*"
+        )
+
+        store._client.put_object.side_effect = ClientError(
+            {"Error": {"Code": "PreconditionFailed"}}, "PutObject"
+        )
+        assert not store.write_if_version("key", b"2", '"etag"')
+        store._client.put_object.assert_called_with(
+            Bucket="bucket", Key="key", Body=b"2", IfMatch='"etag"'
+        )
+
+    def test_s3_read_versioned(self):
+        """Test the ETag is returned with the object, and missing objects."""
+        store = S3ObjectStore("bucket")
+        store._client = Mock()
+        store._client.get_object.return_value = {
+            "Body": Mock(read=Mock(return_value=b"1")),
+            "ETag": '"etag"',
+        }
+
+        assert store.read_versioned("key") == (b"1", '"etag"')
+
+        store._client.get_object.side_effect = ClientError(
+            {"Error": {"Code": "NoSuchKey"}}, "GetObject"
+        )
+        assert store.read_versioned("key") == (None, None)
+
+
+class TestGetPersistenceAdapter:
+    """Tests for get_persistence_adapter function."""
+
+    def test_uses_s3_when_bucket_configured(self, monkeypatch):
+        """Test the S3 adapter is used on Alexa-hosted deployments."""
+        monkeypatch.setenv("S3_PERSISTENCE_BUCKET", "bucket")
+
+        assert isinstance(get_persistence_adapter(), S3PersistenceAdapter)
+
+    def test_uses_filesystem_locally(self, monkeypatch, tmp_path):
+        """Test the local directory adapter is used without a bucket."""
+        monkeypatch.delenv("S3_PERSISTENCE_BUCKET", raising=False)
+        monkeypatch.setenv("PERSISTENCE_DIR", str(tmp_path))
+
+        adapter = get_persistence_adapter()
+
+        assert isinstance(adapter, FileSystemPersistenceAdapter)
+        assert adapter.directory == tmp_path
+
+
+class TestPreferences:
+    """Tests for preference helpers and the flushing interceptor."""
+
+    def test_preferences_load_lazily(self, tmp_path):
+        """Test attributes are only read when a handler touches them."""
+        adapter = FileSystemPersistenceAdapter(tmp_path)
+        handler_input = Mock()
+        handler_input.attributes_manager = AttributesManager(
+            make_envelope(), persistence_adapter=adapter
+        )
+
+        with patch.object(adapter, "read", return_value={}) as mock_read:
+            SavePersistentAttributesResponseInterceptor().process(handler_input, None)
+            mock_read.assert_not_called()
+
+            remember_preferences(handler_input, favorite_currency="USD")
+            mock_read.assert_called_once()
+
+    def test_interceptor_flushes_once(self, tmp_path):
+        """Test remembered preferences are persisted by the interceptor."""
+        adapter = FileSystemPersistenceAdapter(tmp_path)
+        envelope = make_envelope()
+        handler_input = Mock()
+        handler_input.attributes_manager = AttributesManager(
+            envelope, persistence_adapter=adapter
+        )
+
+        remember_preferences(handler_input, favorite_currency="USD", default_amount=5)
+        remember_preferences(handler_input, default_amount=10)
+        SavePersistentAttributesResponseInterceptor().process(handler_input, None)
+
+        assert adapter.get_attributes(envelope) == {
+            "favorite_currency": "USD",
+            "default_amount": 10,
+        }
+
+    def test_missing_adapter_returns_empty(self):
+        """Test preferences degrade to empty without persistence."""
+        handler_input = Mock()
+        type(handler_input.attributes_manager).persistent_attributes = property(
+            Mock(side_effect=AttributesManagerException("no adapter"))
+        )
+
+        assert get_preferences(handler_input) == {}
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            EndpointConnectionError(endpoint_url="https://s3.amazonaws.com"),
+            ClientError({"Error": {"Code": "AccessDenied"}}, "GetObject"),
+            ValueError("Expecting value"),
+        ],
+        ids=["unreachable", "access_denied", "corrupt"],
+    )
+    def test_store_errors_do_not_escape(self, tmp_path, error):
+        """Test a failing store degrades to empty preferences and no write."""
+        adapter = FileSystemPersistenceAdapter(tmp_path)
+        handler_input = Mock()
+        handler_input.attributes_manager = AttributesManager(
+            make_envelope(), persistence_adapter=adapter
+        )
+
+        with patch.object(adapter, "read_bytes", side_effect=error):
+            assert get_preferences(handler_input) == {}
+            remember_preferences(handler_input, favorite_currency="USD")
+
+        with patch.object(adapter, "write_bytes", side_effect=error):
+            handler_input.attributes_manager.persistent_attributes = {"a": 1}
+            SavePersistentAttributesResponseInterceptor().process(handler_input, None)
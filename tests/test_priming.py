@@ -0,0 +1,152 @@
+"""Tests for lambda/priming.py and the skill's priming hooks."""
+
+import random
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+import lambda_function
+import priming
+from priming import (
+    after_restore,
+    before_snapshot,
+    is_pre_initialized,
+    run_after_restore,
+    run_before_snapshot,
+)
+from rate_cache import rate_cache
+
+RATES = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+
+
+@pytest.fixture
+def isolated_hooks(monkeypatch):
+    """Register hooks in empty lists, leaving the skill's hooks alone."""
+    monkeypatch.setattr(priming, "_before_snapshot_hooks", [])
+    monkeypatch.setattr(priming, "_after_restore_hooks", [])
+
+
+class TestIsPreInitialized:
+    """Tests for is_pre_initialized function."""
+
+    @pytest.mark.parametrize(
+        "init_type, expected",
+        [
+            ("snap-start", True),
+            ("provisioned-concurrency", True),
+            ("on-demand", False),
+            (None, False),
+        ],
+    )
+    def test_initialization_type(self, monkeypatch, init_type, expected):
+        """Test containers initialised ahead of their requests are primed."""
+        monkeypatch.delenv("PRIME_ON_INIT", raising=False)
+        if init_type is None:
+            monkeypatch.delenv("AWS_LAMBDA_INITIALIZATION_TYPE", raising=False)
+        else:
+            monkeypatch.setenv("AWS_LAMBDA_INITIALIZATION_TYPE", init_type)
+
+        assert is_pre_initialized() is expected
+
+    def test_override(self, monkeypatch):
+        """Test PRIME_ON_INIT overrides the initialization type."""
+        monkeypatch.setenv("AWS_LAMBDA_INITIALIZATION_TYPE", "snap-start")
+        monkeypatch.setenv("PRIME_ON_INIT", "false")
+        assert not is_pre_initialized()
+
+        monkeypatch.setenv("AWS_LAMBDA_INITIALIZATION_TYPE", "on-demand")
+        monkeypatch.setenv("PRIME_ON_INIT", "true")
+        assert is_pre_initialized()
+
+
+class TestHooks:
+    """Tests for registering and running the hooks."""
+
+    def test_run_in_order(self, isolated_hooks):
+        """Test hooks run in registration order, each phase separately."""
+        calls = []
+        before_snapshot(lambda: calls.append("flush"))
+        after_restore(lambda: calls.append("reconnect"))
+        after_restore(lambda: calls.append("reseed"))
+
+        assert run_before_snapshot() == 0
+        assert calls == ["flush"]
+        assert run_after_restore() == 0
+        assert calls == ["flush", "reconnect", "reseed"]
+
+    def test_failures_do_not_stop_other_hooks(self, isolated_hooks):
+        """Test a failing hook is counted and the rest still run."""
+        hook = Mock()
+        after_restore(Mock(side_effect=RuntimeError("boom")))
+        after_restore(hook)
+
+        assert run_after_restore() == 1
+        hook.assert_called_once_with()
+
+    def test_decorator_returns_hook(self, isolated_hooks):
+        """Test the registration functions work as decorators."""
+
+        @after_restore
+        def reconnect():
+            return "reconnected"
+
+        assert reconnect() == "reconnected"
+
+
+class TestSkillHooks:
+    """Tests for the hooks the skill registers."""
+
+    @pytest.fixture(autouse=True)
+    def clear_rate_cache(self, monkeypatch):
+        monkeypatch.setattr(rate_cache, "_listeners", [])
+        monkeypatch.setattr(rate_cache, "throttle", None)
+        rate_cache.clear()
+        yield
+        rate_cache.clear()
+
+    def test_restore_reconnects_and_reseeds(self, monkeypatch):
+        """Test a restored container opens new connections and new random state."""
+        session = Mock()
+        monkeypatch.setattr("markets.session", session)
+        random.seed(42)
+        state = random.getstate()
+
+        assert run_after_restore() == 0
+
+        session.close.assert_called_once_with()
+        assert random.getstate() != state
+
+    def test_restore_drops_stale_rates(self, monkeypatch):
+        """Test rates older than the TTL by the wall clock are dropped."""
+        monkeypatch.setattr("markets.session", Mock())
+        rate_cache.set(RATES, age=rate_cache.ttl + 1)
+
+        run_after_restore()
+
+        assert rate_cache.get() is None
+        assert rate_cache._rates is None
+
+    def test_restore_keeps_fresh_rates(self, monkeypatch):
+        """Test rates still within the TTL survive the restore."""
+        monkeypatch.setattr("markets.session", Mock())
+        rate_cache.set(RATES)
+
+        run_after_restore()
+
+        assert rate_cache.get() == RATES
+
+    def test_prime_container(self, monkeypatch):
+        """Test priming loads the rates and runs a request end to end."""
+        get_rates = Mock(return_value=RATES)
+        monkeypatch.setattr(lambda_function, "get_rounded_exchange_rates", get_rates)
+
+        lambda_function.prime_container()
+
+        get_rates.assert_called_once_with()
+        response = lambda_function.lambda_handler(lambda_function.PRIMING_EVENT, None)
+        assert "Qué bolá asere" in response["response"]["outputSpeech"]["ssml"]
@@ -0,0 +1,134 @@
+"""Tests for lambda/profiling.py."""
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from botocore.exceptions import EndpointConnectionError
+from persistence import FileSystemObjectStore
+from profiling import InvocationProfiler, get_profiler, get_request_labels
+
+EVENT = {
+    "request": {
+        "type": "IntentRequest",
+        "requestId": "amzn1.echo-api.request.abc-123",
+        "intent": {"name": "ExchangeRateIntent"},
+    }
+}
+REPORT_KEY = "profiles/ExchangeRateIntent/amzn1.echo-api.request.abc-123.txt"
+
+
+def handler(event, context):
+    return {"allocated": [str(i) for i in range(1000)]}
+
+
+class TestGetRequestLabels:
+    """Tests for get_request_labels function."""
+
+    def test_intent_request(self):
+        """Test intent requests are labelled by intent name."""
+        assert get_request_labels(EVENT) == (
+            "amzn1.echo-api.request.abc-123",
+            "ExchangeRateIntent",
+        )
+
+    def test_other_request_and_unsafe_characters(self):
+        """Test other requests use their type and keys stay path-safe."""
+        event = {"request": {"type": "LaunchRequest", "requestId": "a/../b"}}
+
+        assert get_request_labels(event) == ("a_.._b", "LaunchRequest")
+        assert get_request_labels({}) == ("unknown-request", "unknown")
+
+
+class TestInvocationProfiler:
+    """Tests for InvocationProfiler."""
+
+    def test_writes_report(self, tmp_path):
+        """Test a profiled invocation writes a report keyed by request."""
+        store = FileSystemObjectStore(tmp_path)
+
+        result = InvocationProfiler(store).run(handler, EVENT, None)
+
+        assert len(result["allocated"]) == 1000
+        report = store.read_bytes(REPORT_KEY).decode("utf-8")
+        assert "intent ExchangeRateIntent" in report
+        assert "function calls" in report
+        assert "allocations by line" in report
+        assert "test_profiling.py" in report
+
+    def test_writes_report_on_error(self, tmp_path):
+        """Test failing invocations are profiled too."""
+        store = FileSystemObjectStore(tmp_path)
+
+        with pytest.raises(RuntimeError):
+            InvocationProfiler(store).run(
+                Mock(side_effect=RuntimeError("boom")), EVENT, None
+            )
+
+        assert store.read_bytes(REPORT_KEY) is not None
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            OSError("read-only file system"),
+            EndpointConnectionError(endpoint_url="https://s3.invalid"),
+        ],
+    )
+    def test_store_errors_are_logged(self, error):
+        """Test a failing store never breaks the response."""
+        store = Mock()
+        store.write_bytes.side_effect = error
+
+        assert InvocationProfiler(store).run(handler, EVENT, None)
+
+    def test_sampling(self, monkeypatch):
+        """Test only the sampled fraction of invocations is profiled."""
+        profiler = InvocationProfiler(Mock(), sample_rate=0.25)
+        monkeypatch.setattr("profiling.random.random", Mock(side_effect=[0.1, 0.5]))
+
+        assert profiler.should_profile() is True
+        assert profiler.should_profile() is False
+
+
+class TestGetProfiler:
+    """Tests for get_profiler function."""
+
+    @pytest.fixture(autouse=True)
+    def clear_env(self, monkeypatch):
+        for name in ("PROFILE_ENABLED", "PROFILE_SAMPLE_RATE", "PROFILE_DIR"):
+            monkeypatch.delenv(name, raising=False)
+
+    def test_disabled_by_default(self):
+        """Test profiling is off unless configured."""
+        assert get_profiler(Mock()) is None
+
+    def test_enabled(self, monkeypatch):
+        """Test PROFILE_ENABLED profiles every invocation."""
+        monkeypatch.setenv("PROFILE_ENABLED", "true")
+        store = Mock()
+
+        profiler = get_profiler(store)
+
+        assert profiler.sample_rate == 1.0
+        assert profiler.store is store
+
+    def test_sample_rate_and_directory(self, monkeypatch, tmp_path):
+        """Test sampled profiling with reports in a local directory."""
+        monkeypatch.setenv("PROFILE_SAMPLE_RATE", "0.01")
+        monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+
+        profiler = get_profiler(Mock())
+
+        assert profiler.sample_rate == 0.01
+        assert profiler.store.directory == tmp_path
+
+    def test_invalid_sample_rate(self, monkeypatch):
+        """Test a malformed sample rate leaves profiling off."""
+        monkeypatch.setenv("PROFILE_SAMPLE_RATE", "often")
+
+        assert get_profiler(Mock()) is None
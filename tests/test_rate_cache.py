@@ -0,0 +1,177 @@
+"""Tests for lambda/rate_cache.py."""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from rate_cache import RateCache
+
+from tests.conftest import FakeClock
+
+RATES = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+
+
+class TestRateCache:
+    """Tests for RateCache."""
+
+    def test_fetches_on_miss_and_caches(self):
+        """Test the first call fetches and later calls are served from memory."""
+        cache = RateCache(ttl=60, clock=FakeClock())
+        fetch = Mock(return_value=RATES)
+
+        assert cache.get_or_fetch(fetch) == RATES
+        assert cache.get_or_fetch(fetch) == RATES
+        fetch.assert_called_once()
+
+    def test_expires_after_ttl(self):
+        """Test stale rates are fetched again."""
+        clock = FakeClock()
+        cache = RateCache(ttl=60, clock=clock)
+        fetch = Mock(return_value=RATES)
+
+        cache.get_or_fetch(fetch)
+        clock.now = 60
+        cache.get_or_fetch(fetch)
+
+        assert fetch.call_count == 2
+
+    def test_failures_are_not_cached(self):
+        """Test a failed fetch is retried on the next call."""
+        cache = RateCache(ttl=60, clock=FakeClock())
+        fetch = Mock(side_effect=[None, RATES])
+
+        assert cache.get_or_fetch(fetch) is None
+        assert cache.get_or_fetch(fetch) == RATES
+
+    def test_clear(self):
+        """Test clearing drops the cached snapshot."""
+        cache = RateCache(ttl=60, clock=FakeClock())
+        cache.set(RATES)
+
+        cache.clear()
+
+        assert cache.get() is None
+
+    def test_drop_stale_uses_the_wall_clock(self):
+        """Test a restored snapshot is aged by the wall clock, not the monotonic one."""
+        wall_clock = FakeClock()
+        cache = RateCache(ttl=60, clock=FakeClock(), wall_clock=wall_clock)
+        cache.set(RATES, age=10)
+
+        wall_clock.now += 49
+        assert not cache.drop_stale()
+        assert cache.get() == RATES
+
+        # Hours pass while snapshotted; the monotonic clock does not see them
+        wall_clock.now += 3600
+        assert cache.drop_stale()
+        assert cache.get() is None
+        assert not cache.drop_stale()
+
+    def test_concurrent_misses_fetch_once(self):
+        """Test threads sharing a worker's cache collapse into one fetch."""
+        cache = RateCache(ttl=60)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.05)
+            return RATES
+
+        threads = [
+            threading.Thread(target=cache.get_or_fetch, args=(fetch,)) for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+
+    def test_listeners_see_fresh_fetches_only(self):
+        """Test listeners are called once per successful upstream fetch."""
+        cache = RateCache(ttl=60, clock=FakeClock())
+        listener = Mock()
+        cache.add_listener(listener)
+        fetch = Mock(side_effect=[None, RATES])
+
+        cache.get_or_fetch(fetch)
+        cache.get_or_fetch(fetch)
+        cache.get_or_fetch(fetch)
+
+        listener.assert_called_once_with(RATES)
+
+    def test_listener_errors_do_not_break_fetch(self):
+        """Test a failing listener does not hide the fetched rates."""
+        cache = RateCache(ttl=60, clock=FakeClock())
+        cache.add_listener(Mock(side_effect=OSError("disk full")))
+        second = Mock()
+        cache.add_listener(second)
+
+        assert cache.get_or_fetch(Mock(return_value=RATES)) == RATES
+        second.assert_called_once_with(RATES)
+
+    def test_listeners_run_outside_the_lock(self):
+        """Test listeners may read the cache they are notified by."""
+        cache = RateCache(ttl=60, clock=FakeClock())
+        seen = []
+        cache.add_listener(lambda rates: seen.append(cache._lock.acquire(False)))
+
+        cache.get_or_fetch(Mock(return_value=RATES))
+
+        assert seen == [True]
+        cache._lock.release()
+
+    def test_background_listeners(self):
+        """Test background listeners run off the fetching thread."""
+        cache = RateCache(ttl=60, clock=FakeClock())
+        started = threading.Event()
+        release = threading.Event()
+        threads = []
+
+        def listener(rates):
+            threads.append(threading.current_thread())
+            started.set()
+            release.wait(5)
+
+        cache.add_listener(listener, background=True)
+
+        assert cache.get_or_fetch(Mock(return_value=RATES)) == RATES
+        assert started.wait(5)
+        assert threads != [threading.current_thread()]
+        assert not cache.wait_for_listeners(timeout=0.01)
+
+        release.set()
+        assert cache.wait_for_listeners(timeout=5)
+
+    def test_rejected_snapshot_keeps_previous(self):
+        """Test a quarantined snapshot is replaced by the previous one."""
+        clock = FakeClock()
+        validator = Mock()
+        validator.accept.side_effect = [True, False]
+        cache = RateCache(ttl=60, clock=clock, validator=validator)
+        listener = Mock()
+        cache.add_listener(listener)
+        bad_rates = dict(RATES, USD=1200.0)
+        fetch = Mock(side_effect=[RATES, bad_rates])
+
+        cache.get_or_fetch(fetch)
+        clock.now = 60
+
+        assert cache.get_or_fetch(fetch) == RATES
+        assert cache.get() == RATES
+        listener.assert_called_once_with(RATES)
+
+    def test_rejected_first_snapshot(self):
+        """Test a quarantined snapshot with nothing to fall back on."""
+        validator = Mock()
+        validator.accept.return_value = False
+        cache = RateCache(ttl=60, clock=FakeClock(), validator=validator)
+
+        assert cache.get_or_fetch(Mock(return_value=RATES)) is None
+        assert cache.get() is None
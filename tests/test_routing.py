@@ -0,0 +1,217 @@
+"""Tests for lambda/routing.py."""
+
+import json
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from ask_sdk_core.attributes_manager import AttributesManager
+from ask_sdk_core.handler_input import HandlerInput
+from ask_sdk_core.serialize import DefaultSerializer
+from ask_sdk_model import RequestEnvelope
+from ask_sdk_runtime.dispatch_components.request_components import (
+    GenericRequestHandlerChain,
+    GenericRequestMapper,
+)
+from lambda_function import (
+    ConvertCurrencyIntentHandler,
+    IntentReflectorHandler,
+    LaunchRequestHandler,
+    lambda_handler,
+    sb,
+)
+from rate_cache import RateCache
+from routing import RoutingRequestMapper, get_route_key
+
+
+def make_event(request_type, intent_name=None, slots=None):
+    request = {
+        "type": request_type,
+        "requestId": "amzn1.echo-api.request.test",
+        "timestamp": "2026-01-01T00:00:00Z",
+        "locale": "es-US",
+    }
+    if intent_name:
+        request["intent"] = {
+            "name": intent_name,
+            "slots": {
+                name: {"name": name, "value": value}
+                for name, value in (slots or {}).items()
+            },
+        }
+    return {
+        "version": "1.0",
+        "context": {"System": {"user": {"userId": "amzn1.ask.account.test"}}},
+        "request": request,
+    }
+
+
+def make_handler_input(request_type, intent_name=None):
+    envelope = DefaultSerializer().deserialize(
+        json.dumps(make_event(request_type, intent_name)), RequestEnvelope
+    )
+    return HandlerInput(
+        request_envelope=envelope, attributes_manager=AttributesManager(envelope)
+    )
+
+
+REQUESTS = [
+    ("LaunchRequest", None),
+    ("IntentRequest", "ExchangeRateIntent"),
+    ("IntentRequest", "ExchangeRateRequestIntent"),
+    ("IntentRequest", "ConvertCurrencyIntent"),
+    ("IntentRequest", "MyRatesIntent"),
+    ("IntentRequest", "WhyExchangeRateIntent"),
+    ("IntentRequest", "AMAZON.HelpIntent"),
+    ("IntentRequest", "AMAZON.CancelIntent"),
+    ("IntentRequest", "AMAZON.StopIntent"),
+    ("IntentRequest", "AMAZON.FallbackIntent"),
+    ("IntentRequest", "AMAZON.NavigateHomeIntent"),
+    ("SessionEndedRequest", None),
+]
+
+
+class TestGetRouteKey:
+    """Tests for get_route_key function."""
+
+    def test_intent_request(self):
+        """Test intent requests are keyed by intent name."""
+        handler_input = make_handler_input("IntentRequest", "ExchangeRateIntent")
+
+        key = get_route_key(handler_input.request_envelope.request)
+
+        assert key == ("IntentRequest", "ExchangeRateIntent")
+
+    def test_non_intent_request(self):
+        """Test other requests are keyed by type only."""
+        handler_input = make_handler_input("LaunchRequest")
+
+        assert get_route_key(handler_input.request_envelope.request) == (
+            "LaunchRequest",
+            None,
+        )
+
+
+class TestRoutingRequestMapper:
+    """Tests for RoutingRequestMapper."""
+
+    @pytest.mark.parametrize("request_type,intent_name", REQUESTS)
+    def test_matches_linear_chain(self, request_type, intent_name):
+        """Test the routing table picks the same handler as can_handle."""
+        chains = sb.runtime_configuration_builder.request_handler_chains
+        handler_input = make_handler_input(request_type, intent_name)
+
+        expected = GenericRequestMapper(chains).get_request_handler_chain(handler_input)
+        actual = RoutingRequestMapper(chains).get_request_handler_chain(handler_input)
+
+        assert actual is expected
+
+    def test_order_does_not_matter(self):
+        """Test the wildcard reflector does not shadow specific intents."""
+        chains = [
+            GenericRequestHandlerChain(IntentReflectorHandler()),
+            GenericRequestHandlerChain(ConvertCurrencyIntentHandler()),
+        ]
+        mapper = RoutingRequestMapper(chains)
+
+        convert = mapper.get_request_handler_chain(
+            make_handler_input("IntentRequest", "ConvertCurrencyIntent")
+        )
+        other = mapper.get_request_handler_chain(
+            make_handler_input("IntentRequest", "OtherIntent")
+        )
+
+        assert isinstance(convert.request_handler, ConvertCurrencyIntentHandler)
+        assert isinstance(other.request_handler, IntentReflectorHandler)
+
+    def test_unrouted_handler_falls_back_to_can_handle(self):
+        """Test handlers without routes are still reachable."""
+        handler = Mock(spec=["can_handle", "handle"])
+        handler.can_handle.return_value = True
+        chain = GenericRequestHandlerChain(LaunchRequestHandler())
+        chain.request_handler = handler
+        mapper = RoutingRequestMapper([chain])
+
+        result = mapper.get_request_handler_chain(make_handler_input("LaunchRequest"))
+
+        assert result is chain
+
+    def test_no_match_returns_none(self):
+        """Test unknown request types have no handler."""
+        mapper = RoutingRequestMapper(
+            [GenericRequestHandlerChain(LaunchRequestHandler())]
+        )
+
+        assert (
+            mapper.get_request_handler_chain(make_handler_input("SessionEndedRequest"))
+            is None
+        )
+
+    def test_duplicate_route_raises(self):
+        """Test two handlers cannot claim the same route."""
+        chains = [
+            GenericRequestHandlerChain(LaunchRequestHandler()),
+            GenericRequestHandlerChain(LaunchRequestHandler()),
+        ]
+
+        with pytest.raises(ValueError):
+            RoutingRequestMapper(chains)
+
+
+class TestLambdaHandler:
+    """Tests for the routed lambda_handler entry point."""
+
+    @patch("lambda_function.get_rounded_exchange_rates")
+    @patch("lambda_function.get_random_greeting")
+    def test_end_to_end(self, mock_greeting, mock_get_rates, tmp_path):
+        """Test a full invocation through the routing table."""
+        mock_get_rates.return_value = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+        mock_greeting.return_value = "En talla asere"
+        event = make_event(
+            "IntentRequest",
+            "ConvertCurrencyIntent",
+            {"amount": "10", "sourceCurrency": "euros"},
+        )
+
+        with patch.object(sb.persistence_adapter, "directory", tmp_path):
+            response = lambda_handler(event, None)
+
+        assert response["response"]["outputSpeech"]["ssml"] == (
+            "<speak>En talla asere. 10 euros son 1300 pesos cubanos.</speak>"
+        )
+
+    def test_background_listeners_are_drained(self):
+        """Test the handler returns only once queued listeners have run."""
+        cache = RateCache(ttl=60)
+        release = threading.Event()
+        done = []
+        cache.add_listener(lambda rates: done.append(release.wait(5)), background=True)
+        cache.get_or_fetch(Mock(return_value={"USD": 120.0}))
+        context = Mock()
+        context.get_remaining_time_in_millis.return_value = 3000
+
+        with patch("lambda_function.rate_cache", cache):
+            threading.Timer(0.05, release.set).start()
+            lambda_handler(make_event("SessionEndedRequest"), context)
+
+        assert done == [True]
+
+    def test_profiler_wraps_sampled_invocations(self):
+        """Test sampled invocations go through the profiler."""
+        profiler = Mock()
+        profiler.should_profile.side_effect = [True, False]
+        profiler.run.side_effect = lambda handle, event, context: handle(event, context)
+        handler = sb.lambda_handler(profiler=profiler)
+        event = make_event("SessionEndedRequest")
+
+        first = handler(event, None)
+        second = handler(event, None)
+
+        assert first == second
+        profiler.run.assert_called_once()
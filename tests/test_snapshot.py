@@ -0,0 +1,106 @@
+"""Tests for lambda/snapshot.py."""
+
+import json
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from snapshot import format_spanish_date, load_bundled_snapshot, refresh_snapshot
+
+
+@pytest.fixture(autouse=True)
+def clear_snapshot_cache():
+    """Reload the snapshot in every test."""
+    load_bundled_snapshot.cache_clear()
+    yield
+    load_bundled_snapshot.cache_clear()
+
+
+class TestFormatSpanishDate:
+    """Tests for format_spanish_date function."""
+
+    def test_formats_date(self):
+        """Test dates are spoken in Spanish."""
+        assert format_spanish_date(date(2026, 1, 5)) == "5 de enero de 2026"
+        assert format_spanish_date(date(2026, 12, 31)) == "31 de diciembre de 2026"
+
+
+class TestLoadBundledSnapshot:
+    """Tests for load_bundled_snapshot function."""
+
+    def test_loads_rounded_rates(self, tmp_path):
+        """Test the snapshot is parsed and rounded like live rates."""
+        path = tmp_path / "rates_snapshot.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "fetched_at": "2026-10-19T12:00:00+00:00",
+                    "rates": {"USD": 120.456, "EUR": 130.0, "MLC": 118.0},
+                }
+            )
+        )
+
+        snapshot = load_bundled_snapshot(path)
+
+        assert snapshot["rates"] == {"USD": 120.46, "EUR": 130.0, "MLC": 118.0}
+        assert snapshot["fetched_at"].date() == date(2026, 10, 19)
+
+    def test_missing_file(self, tmp_path):
+        """Test a missing snapshot disables the fallback tier."""
+        assert load_bundled_snapshot(tmp_path / "missing.json") is None
+
+    def test_invalid_file(self, tmp_path):
+        """Test a corrupt snapshot is ignored."""
+        path = tmp_path / "rates_snapshot.json"
+        path.write_text('{"rates": {"USD": 120.0}}')
+
+        assert load_bundled_snapshot(path) is None
+
+    def test_loaded_once(self, tmp_path):
+        """Test the file is only read on first use."""
+        path = tmp_path / "rates_snapshot.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "fetched_at": "2026-10-19T12:00:00+00:00",
+                    "rates": {"USD": 1, "EUR": 2, "MLC": 3},
+                }
+            )
+        )
+
+        first = load_bundled_snapshot(path)
+        path.unlink()
+
+        assert load_bundled_snapshot(path) is first
+
+
+class TestRefreshSnapshot:
+    """Tests for refresh_snapshot function."""
+
+    @patch("snapshot.get_exchange_rates")
+    def test_writes_snapshot(self, mock_get_rates, tmp_path):
+        """Test fresh rates are written and picked up on next load."""
+        mock_get_rates.return_value = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+        path = tmp_path / "rates_snapshot.json"
+
+        assert refresh_snapshot(path) is True
+
+        snapshot = load_bundled_snapshot(path)
+        assert snapshot["rates"] == {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+        assert isinstance(snapshot["fetched_at"], datetime)
+
+    @patch("snapshot.get_exchange_rates")
+    def test_keeps_old_snapshot_on_failure(self, mock_get_rates, tmp_path):
+        """Test a failed fetch does not overwrite the snapshot."""
+        mock_get_rates.return_value = None
+        path = tmp_path / "rates_snapshot.json"
+        path.write_text("old")
+
+        assert refresh_snapshot(path) is False
+        assert path.read_text() == "old"
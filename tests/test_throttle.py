@@ -0,0 +1,258 @@
+"""Tests for lambda/throttle.py."""
+
+import multiprocessing
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from botocore.exceptions import EndpointConnectionError
+from codec import encode_snapshot
+from persistence import FileSystemObjectStore
+from rate_cache import RateCache
+from throttle import (
+    SHARED_RATES_KEY,
+    UpstreamThrottle,
+    get_upstream_throttle,
+)
+
+from tests.conftest import FakeClock
+
+RATES = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+
+
+def take_tokens(directory, attempts, results):
+    """Take tokens from a bucket that never refills, in another process."""
+    throttle = UpstreamThrottle(
+        FileSystemObjectStore(directory), rate=1e-9, burst=10, max_attempts=100
+    )
+    results.put(sum(throttle.acquire() for _ in range(attempts)))
+
+
+class TestUpstreamThrottle:
+    """Tests for UpstreamThrottle."""
+
+    def test_burst_then_refill(self, tmp_path):
+        """Test the bucket allows a burst, then refills at the rate."""
+        clock = FakeClock()
+        throttle = UpstreamThrottle(
+            FileSystemObjectStore(tmp_path), rate=0.5, burst=2, clock=clock
+        )
+
+        assert throttle.acquire()
+        assert throttle.acquire()
+        assert not throttle.acquire()
+
+        clock.now += 1
+        assert not throttle.acquire()
+        clock.now += 1
+        assert throttle.acquire()
+        assert not throttle.acquire()
+
+        clock.now += 3600
+        assert throttle.acquire()
+        assert throttle.acquire()
+        assert not throttle.acquire()
+
+    def test_bucket_is_shared(self, tmp_path):
+        """Test throttles on the same store draw from one bucket."""
+        clock = FakeClock()
+        first, second = (
+            UpstreamThrottle(
+                FileSystemObjectStore(tmp_path), rate=1, burst=1, clock=clock
+            )
+            for _ in range(2)
+        )
+
+        assert first.acquire()
+        assert not second.acquire()
+
+    def test_processes_never_overdraw(self, tmp_path):
+        """Test concurrent processes take exactly the bucket's capacity."""
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        processes = [
+            context.Process(target=take_tokens, args=(tmp_path, 5, results))
+            for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        taken = sum(results.get(timeout=30) for _ in processes)
+        for process in processes:
+            process.join()
+
+        assert taken == 10
+
+    def test_lost_races_count_as_empty(self):
+        """Test a bucket that stays contended does not hand out a token."""
+        store = Mock()
+        store.read_versioned.return_value = (None, None)
+        store.write_if_version.return_value = False
+
+        assert not UpstreamThrottle(store, max_attempts=3).acquire()
+        assert store.write_if_version.call_count == 3
+
+    def test_store_errors_allow_calls(self):
+        """Test an unreachable store does not stop the rates from refreshing."""
+        store = Mock()
+        store.read_versioned.side_effect = OSError("disk full")
+        store.read_bytes.side_effect = OSError("disk full")
+        throttle = UpstreamThrottle(store)
+
+        assert throttle.acquire()
+        assert throttle.read_shared() == (None, None)
+
+    def test_unreachable_store_allows_calls(self):
+        """Test botocore connection errors are store errors too."""
+        store = Mock()
+        error = EndpointConnectionError(endpoint_url="https://s3.invalid")
+        store.read_versioned.side_effect = error
+        store.read_bytes.side_effect = error
+        store.write_bytes.side_effect = error
+        throttle = UpstreamThrottle(store)
+        cache = RateCache(ttl=60, clock=FakeClock(), throttle=throttle)
+        cache.add_listener(throttle.publish)
+
+        assert cache.get_or_fetch(Mock(return_value=RATES)) == RATES
+
+    def test_failing_throttle_falls_through_to_fetch(self):
+        """Test a throttle that raises does not hide the upstream rates."""
+        throttle = Mock()
+        throttle.read_shared.side_effect = RuntimeError("bug")
+        cache = RateCache(ttl=60, clock=FakeClock(), throttle=throttle)
+        fetch = Mock(return_value=RATES)
+
+        assert cache.get_or_fetch(fetch) == RATES
+        fetch.assert_called_once()
+
+    def test_publish_and_read_shared(self, tmp_path):
+        """Test a published snapshot is read back with its age."""
+        clock = FakeClock()
+        throttle = UpstreamThrottle(
+            FileSystemObjectStore(tmp_path), max_shared_age=600, clock=clock
+        )
+
+        assert throttle.read_shared() == (None, None)
+        throttle.publish(RATES)
+        clock.now += 30
+        assert throttle.read_shared() == (RATES, 30)
+        clock.now += 600
+        assert throttle.read_shared() == (None, None)
+
+    def test_shared_snapshot_keeps_markets(self, tmp_path):
+        """Test buy, sell and official rates are shared with the mid rates."""
+        snapshot = dict(RATES, buy={"USD": 118.0}, official={"USD": 120.0})
+        for binary in (True, False):
+            throttle = UpstreamThrottle(
+                FileSystemObjectStore(tmp_path), clock=FakeClock(), binary=binary
+            )
+
+            throttle.publish(snapshot)
+
+            assert throttle.read_shared() == (snapshot, 0)
+
+    def test_corrupt_shared_snapshot_is_ignored(self, tmp_path):
+        """Test an unreadable shared snapshot is treated as missing."""
+        store = FileSystemObjectStore(tmp_path)
+        store.write_bytes(SHARED_RATES_KEY, b"garbage")
+
+        assert UpstreamThrottle(store).read_shared() == (None, None)
+
+
+class TestRateCacheWithThrottle:
+    """Tests for RateCache sharing the upstream through a throttle."""
+
+    def make_cache(self, tmp_path, clock, burst=1):
+        throttle = UpstreamThrottle(
+            FileSystemObjectStore(tmp_path), rate=0.001, burst=burst, clock=clock
+        )
+        cache = RateCache(ttl=60, clock=clock, throttle=throttle)
+        cache.add_listener(throttle.publish)
+        return cache
+
+    def test_fresh_shared_snapshot_skips_upstream(self, tmp_path):
+        """Test a container picks up what another one fetched."""
+        clock = FakeClock()
+        first = self.make_cache(tmp_path, clock)
+        second = self.make_cache(tmp_path, clock)
+        fetch = Mock(return_value=RATES)
+
+        assert first.get_or_fetch(fetch) == RATES
+        clock.now += 20
+        assert second.get_or_fetch(fetch) == RATES
+
+        fetch.assert_called_once()
+        # The shared snapshot keeps its age: it expires with the original
+        clock.now += 40
+        assert second.get() is None
+
+    def test_throttled_container_serves_stale_rates(self, tmp_path):
+        """Test a container without a token serves cached rates."""
+        clock = FakeClock()
+        cache = self.make_cache(tmp_path, clock)
+        fetch = Mock(return_value=RATES)
+
+        cache.get_or_fetch(fetch)
+        clock.now += 120
+        assert cache.get_or_fetch(Mock(return_value=None)) == RATES
+
+        fetch.assert_called_once()
+        assert cache.get() == RATES
+
+    def test_throttled_without_any_rates(self, tmp_path):
+        """Test a throttled cold container reports no rates."""
+        clock = FakeClock()
+        store = FileSystemObjectStore(tmp_path)
+        UpstreamThrottle(store, burst=1, clock=clock).acquire()
+        cache = self.make_cache(tmp_path, clock)
+        fetch = Mock(return_value=RATES)
+
+        assert cache.get_or_fetch(fetch) is None
+        fetch.assert_not_called()
+
+    def test_throttled_container_prefers_shared_snapshot(self, tmp_path):
+        """Test a stale shared snapshot is served before nothing at all."""
+        clock = FakeClock()
+        store = FileSystemObjectStore(tmp_path)
+        store.write_bytes(SHARED_RATES_KEY, encode_snapshot(clock.now - 300, RATES))
+        UpstreamThrottle(store, burst=1, clock=clock).acquire()
+        cache = self.make_cache(tmp_path, clock)
+        fetch = Mock(return_value=None)
+
+        assert cache.get_or_fetch(fetch) == RATES
+        fetch.assert_not_called()
+
+
+class TestGetUpstreamThrottle:
+    """Tests for get_upstream_throttle function."""
+
+    def test_defaults(self, monkeypatch, tmp_path):
+        """Test the throttle is on by default."""
+        for name in ("UPSTREAM_RATE_LIMIT", "UPSTREAM_BURST", "SHARED_RATES_MAX_AGE"):
+            monkeypatch.delenv(name, raising=False)
+
+        throttle = get_upstream_throttle(FileSystemObjectStore(tmp_path))
+
+        assert (throttle.rate, throttle.burst) == (1.0, 5)
+
+    def test_configured(self, monkeypatch, tmp_path):
+        """Test the environment sets the rate and burst."""
+        monkeypatch.setenv("UPSTREAM_RATE_LIMIT", "0.2")
+        monkeypatch.setenv("UPSTREAM_BURST", "3")
+        monkeypatch.setenv("SHARED_RATES_MAX_AGE", "900")
+
+        throttle = get_upstream_throttle(FileSystemObjectStore(tmp_path))
+
+        assert (throttle.rate, throttle.burst, throttle.max_shared_age) == (
+            0.2,
+            3,
+            900,
+        )
+
+    def test_disabled(self, monkeypatch, tmp_path):
+        """Test a zero rate turns the throttle off."""
+        monkeypatch.setenv("UPSTREAM_RATE_LIMIT", "0")
+
+        assert get_upstream_throttle(FileSystemObjectStore(tmp_path)) is None
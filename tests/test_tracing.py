@@ -0,0 +1,214 @@
+"""Tests for lambda/tracing.py."""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from rate_cache import rate_cache
+from tracing import NOOP_SPAN, BatchingExporter, Tracer, get_tracer, tracer
+from validation import RateValidator
+
+from tests.conftest import ListExporter
+
+
+class TestTracer:
+    """Tests for Tracer."""
+
+    def test_unsampled_traces_are_noops(self):
+        """Test nothing is recorded when the trace is not sampled."""
+        exporter = ListExporter()
+        test_tracer = Tracer(exporter, sample_rate=0)
+
+        with test_tracer.start_trace("lambda_handler") as root:
+            with test_tracer.span("rates.get") as child:
+                child.set_attribute("rates.source", "live")
+
+        assert root is NOOP_SPAN
+        assert child is NOOP_SPAN
+        assert exporter.spans == []
+
+    def test_spans_outside_a_trace_are_noops(self):
+        """Test child spans need an active sampled trace."""
+        assert Tracer(ListExporter(), sample_rate=1).span("rates.get") is NOOP_SPAN
+
+    def test_sampled_trace(self):
+        """Test nested spans share the trace and link to their parent."""
+        exporter = ListExporter()
+        test_tracer = Tracer(exporter, sample_rate=1)
+
+        with test_tracer.start_trace("lambda_handler", intent="X") as root:
+            with test_tracer.span("rates.get") as child:
+                child.set_attribute("rates.source", "live")
+            with test_tracer.span("speech.render"):
+                pass
+
+        child_span, render_span, root_span = exporter.spans
+        assert root_span["name"] == "lambda_handler"
+        assert root_span["parent_id"] is None
+        assert root_span["attributes"] == {"intent": "X"}
+        assert child_span["attributes"] == {"rates.source": "live"}
+        assert child_span["parent_id"] == root.span_id
+        assert render_span["parent_id"] == root.span_id
+        assert {span["trace_id"] for span in exporter.spans} == {root.trace_id}
+        assert root_span["duration_ms"] >= child_span["duration_ms"]
+
+    def test_head_based_sampling(self, monkeypatch):
+        """Test the sampling decision is made once per trace."""
+        test_tracer = Tracer(ListExporter(), sample_rate=0.5)
+        monkeypatch.setattr("tracing.random.random", Mock(side_effect=[0.7, 0.2]))
+
+        assert test_tracer.start_trace("lambda_handler") is NOOP_SPAN
+        assert test_tracer.start_trace("lambda_handler") is not NOOP_SPAN
+
+    def test_errors_are_recorded(self):
+        """Test a span closed by an exception is marked as failed."""
+        exporter = ListExporter()
+        test_tracer = Tracer(exporter, sample_rate=1)
+
+        with pytest.raises(KeyError):
+            with test_tracer.start_trace("lambda_handler"):
+                raise KeyError("usd")
+
+        assert exporter.spans[0]["status"] == "error"
+        assert exporter.spans[0]["attributes"]["error.type"] == "KeyError"
+
+
+class TestBatchingExporter:
+    """Tests for BatchingExporter."""
+
+    def test_writes_full_batches(self, tmp_path):
+        """Test spans are written once a batch is full."""
+        path = tmp_path / "spans.jsonl"
+        exporter = BatchingExporter(str(path), max_batch_size=2)
+
+        exporter.export({"name": "a"})
+        assert not path.exists()
+        exporter.export({"name": "b"})
+
+        lines = path.read_text().splitlines()
+        assert [json.loads(line)["name"] for line in lines] == ["a", "b"]
+
+    def test_flushes_after_delay(self, tmp_path, monkeypatch):
+        """Test a partial batch is written once it is old enough."""
+        path = tmp_path / "spans.jsonl"
+        exporter = BatchingExporter(str(path), max_delay=5)
+        clock = Mock(return_value=100.0)
+        monkeypatch.setattr("tracing.time.monotonic", clock)
+
+        exporter.export({"name": "a"})
+        exporter.maybe_flush()
+        assert not path.exists()
+
+        clock.return_value = 105.0
+        exporter.maybe_flush()
+        assert len(path.read_text().splitlines()) == 1
+
+    def test_stdout(self, capsys):
+        """Test '-' writes JSON lines to stdout."""
+        exporter = BatchingExporter("-")
+        exporter.export({"name": "a"})
+        exporter.flush()
+
+        assert json.loads(capsys.readouterr().out) == {"name": "a"}
+
+    def test_write_errors_are_logged(self, tmp_path):
+        """Test an unwritable collector never breaks a request."""
+        exporter = BatchingExporter(str(tmp_path / "missing" / "spans.jsonl"))
+        exporter.export({"name": "a"})
+
+        exporter.flush()
+
+
+class TestGetTracer:
+    """Tests for get_tracer function."""
+
+    def test_off_by_default(self, monkeypatch):
+        """Test tracing is off unless a sample rate is configured."""
+        monkeypatch.delenv("TRACE_SAMPLE_RATE", raising=False)
+
+        assert get_tracer().sample_rate == 0
+
+    def test_configured(self, monkeypatch, tmp_path):
+        """Test the sample rate and collector file come from the environment."""
+        monkeypatch.setenv("TRACE_SAMPLE_RATE", "0.1")
+        monkeypatch.setenv("TRACE_FILE", str(tmp_path / "spans.jsonl"))
+
+        configured = get_tracer()
+
+        assert configured.sample_rate == 0.1
+        assert configured.exporter.path == str(tmp_path / "spans.jsonl")
+
+
+class TestInstrumentation:
+    """Tests for the spans emitted by a real invocation."""
+
+    def test_exchange_rate_request(self, monkeypatch, tmp_path):
+        """Test a 'cuánto está el euro' request is traced end to end."""
+        from lambda_function import lambda_handler, sb
+
+        exporter = ListExporter()
+        monkeypatch.setattr(tracer, "exporter", exporter)
+        monkeypatch.setattr(tracer, "sample_rate", 1.0)
+        monkeypatch.setattr(rate_cache, "validator", RateValidator())
+        monkeypatch.setenv("SPREAD_RATES_URL", "http://proxy.test/spread")
+        monkeypatch.setenv("OFFICIAL_RATES_URL", "http://proxy.test/official")
+        rate_cache.clear()
+        event = json.loads(
+            (Path(__file__).parent / "envelopes" / "request_usd.json").read_text()
+        )
+        event["request"]["intent"]["slots"]["currency"]["value"] = "euro"
+        rates = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+
+        with patch.object(sb.persistence_adapter, "directory", tmp_path):
+            with patch("utils.get_exchange_rates", Mock(return_value=rates)):
+                with patch("utils.get_spread_rates", Mock(return_value=None)):
+                    with patch("utils.get_official_rates", Mock(return_value=None)):
+                        lambda_handler(event, None)
+        rate_cache.clear()
+
+        spans = {span["name"]: span for span in exporter.spans}
+        assert list(spans) == [
+            "rates.markets",
+            "rates.cache",
+            "rates.get",
+            "slots.resolve",
+            "speech.render",
+            "lambda_handler",
+        ]
+        assert spans["lambda_handler"]["attributes"]["intent"] == (
+            "ExchangeRateRequestIntent"
+        )
+        assert spans["lambda_handler"]["attributes"]["dispatch.path"] == "fast"
+        assert spans["rates.cache"]["attributes"]["cache.tier"] == "upstream"
+        assert spans["rates.cache"]["parent_id"] == spans["rates.get"]["span_id"]
+        assert spans["rates.markets"]["attributes"]["markets.missing"] == 2
+        assert spans["rates.get"]["attributes"]["rates.source"] == "live"
+        assert spans["slots.resolve"]["attributes"]["currency"] == "EUR"
+
+    def test_http_fetch(self, monkeypatch):
+        """Test the proxy call records its status and time to headers."""
+        from datetime import timedelta
+
+        from utils import get_exchange_rates
+
+        exporter = ListExporter()
+        test_tracer = Tracer(exporter, sample_rate=1)
+        monkeypatch.setattr("markets.tracer", test_tracer)
+        response = Mock(status_code=200, elapsed=timedelta(milliseconds=80))
+        response.json.return_value = {"usd": 120, "eur": 130, "mlc": 118}
+
+        with patch("markets.session.get", return_value=response):
+            with test_tracer.start_trace("lambda_handler"):
+                get_exchange_rates()
+
+        http_span, parse_span, _ = exporter.spans
+        assert http_span["name"] == "rates.http"
+        assert http_span["attributes"]["http.status_code"] == 200
+        assert http_span["attributes"]["http.headers_ms"] == 80
+        assert parse_span["name"] == "rates.parse"
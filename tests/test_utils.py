@@ -4,23 +4,41 @@ import sys
 from pathlib import Path
 from unittest.mock import Mock, patch
 
+import pytest
 import requests
 
 # Add lambda directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
 
+from rate_cache import rate_cache
 from utils import (
+    get_env_flag,
     get_exchange_rates,
+    get_market_rates,
     get_random_exchange_explanation,
     get_random_greeting,
     get_rounded_exchange_rates,
 )
+from validation import RateValidator
+
+
+@pytest.fixture(autouse=True)
+def clear_rate_cache(monkeypatch):
+    """Start every test without cached rates, validator state or listeners."""
+    monkeypatch.setattr(rate_cache, "_listeners", [])
+    monkeypatch.setattr(rate_cache, "throttle", None)
+    monkeypatch.setattr("utils.get_spread_rates", Mock(return_value=None))
+    monkeypatch.setattr("utils.get_official_rates", Mock(return_value=None))
+    monkeypatch.setattr(rate_cache, "validator", RateValidator())
+    rate_cache.clear()
+    yield
+    rate_cache.clear()
 
 
 class TestGetExchangeRates:
     """Tests for get_exchange_rates function."""
 
-    @patch("utils.requests.get")
+    @patch("markets.session.get")
     def test_successful_fetch(self, mock_get):
         """Test successful API call returns correct data."""
         mock_response = Mock()
@@ -42,7 +60,7 @@ class TestGetExchangeRates:
             "https://tasa-cambio-cuba.vercel.app/api/exchange-rate", timeout=5
         )
 
-    @patch("utils.requests.get")
+    @patch("markets.session.get")
     def test_api_timeout(self, mock_get):
         """Test timeout returns None."""
         mock_get.side_effect = requests.Timeout("Connection timeout")
@@ -51,7 +69,7 @@ class TestGetExchangeRates:
 
         assert result is None
 
-    @patch("utils.requests.get")
+    @patch("markets.session.get")
     def test_api_connection_error(self, mock_get):
         """Test connection error returns None."""
         mock_get.side_effect = requests.ConnectionError("Connection failed")
@@ -60,7 +78,7 @@ class TestGetExchangeRates:
 
         assert result is None
 
-    @patch("utils.requests.get")
+    @patch("markets.session.get")
     def test_http_error(self, mock_get):
         """Test HTTP error returns None."""
         mock_response = Mock()
@@ -71,7 +89,7 @@ class TestGetExchangeRates:
 
         assert result is None
 
-    @patch("utils.requests.get")
+    @patch("markets.session.get")
     def test_invalid_json(self, mock_get):
         """Test invalid JSON returns None."""
         mock_response = Mock()
@@ -82,7 +100,7 @@ class TestGetExchangeRates:
 
         assert result is None
 
-    @patch("utils.requests.get")
+    @patch("markets.session.get")
     def test_missing_keys(self, mock_get):
         """Test missing keys in response returns None."""
         mock_response = Mock()
@@ -123,6 +141,100 @@ class TestGetRoundedExchangeRates:
 
         assert result is None
 
+    @patch("utils.get_exchange_rates")
+    def test_served_from_cache(self, mock_get_rates):
+        """Test repeated calls within the TTL hit the proxy once."""
+        mock_get_rates.return_value = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+
+        get_rounded_exchange_rates()
+        result = get_rounded_exchange_rates()
+
+        assert result == {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+        mock_get_rates.assert_called_once()
+
+
+class TestGetMarketRates:
+    """Tests for get_market_rates function."""
+
+    @patch("utils.get_official_rates")
+    @patch("utils.get_spread_rates")
+    @patch("utils.get_exchange_rates")
+    def test_markets_in_one_snapshot(
+        self, mock_mid, mock_spread, mock_official, monkeypatch
+    ):
+        """Test every market that answers ends up in one snapshot."""
+        monkeypatch.setenv("SPREAD_RATES_URL", "http://proxy.test/spread")
+        monkeypatch.setenv("OFFICIAL_RATES_URL", "http://proxy.test/official")
+        mock_mid.return_value = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+        mock_spread.return_value = {"buy": {"USD": 118.0}, "sell": {"USD": 122.0}}
+        mock_official.return_value = None
+
+        assert get_market_rates() == {
+            "USD": 120.0,
+            "EUR": 130.0,
+            "MLC": 118.0,
+            "buy": {"USD": 118.0},
+            "sell": {"USD": 122.0},
+        }
+
+    @patch("utils.get_spread_rates")
+    @patch("utils.get_exchange_rates", Mock(return_value=None))
+    def test_informal_rates_required(self, mock_spread, monkeypatch):
+        """Test the snapshot is dropped without the informal rates."""
+        monkeypatch.setenv("SPREAD_RATES_URL", "http://proxy.test/spread")
+        mock_spread.return_value = {"buy": {"USD": 118.0}}
+
+        assert get_market_rates() is None
+
+    @patch("utils.get_spread_rates")
+    @patch("utils.get_exchange_rates")
+    def test_rounded_market(self, mock_mid, mock_spread, monkeypatch):
+        """Test one market is served rounded from the cached snapshot."""
+        monkeypatch.setenv("SPREAD_RATES_URL", "http://proxy.test/spread")
+        mock_mid.return_value = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+        mock_spread.return_value = {"buy": {"USD": 118.456}}
+
+        assert get_rounded_exchange_rates("buy") == {"USD": 118.46}
+        assert get_rounded_exchange_rates("sell") is None
+        assert get_rounded_exchange_rates() == {
+            "USD": 120.0,
+            "EUR": 130.0,
+            "MLC": 118.0,
+        }
+        mock_mid.assert_called_once()
+
+    @patch("utils.get_official_rates")
+    @patch("utils.get_spread_rates")
+    @patch("utils.get_exchange_rates")
+    def test_unconfigured_markets_not_fetched(
+        self, mock_mid, mock_spread, mock_official, monkeypatch
+    ):
+        """Test a refresh only calls the sources that are configured."""
+        monkeypatch.delenv("SPREAD_RATES_URL", raising=False)
+        monkeypatch.delenv("OFFICIAL_RATES_URL", raising=False)
+        mock_mid.return_value = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+
+        assert get_market_rates() == {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+        mock_spread.assert_not_called()
+        mock_official.assert_not_called()
+
+
+class TestGetEnvFlag:
+    """Tests for get_env_flag function."""
+
+    def test_default_when_unset(self, monkeypatch):
+        """Test the default is used for unset variables."""
+        monkeypatch.delenv("SOME_FLAG", raising=False)
+
+        assert get_env_flag("SOME_FLAG") is True
+        assert get_env_flag("SOME_FLAG", default=False) is False
+
+    def test_false_values(self, monkeypatch):
+        """Test the usual spellings of false."""
+        for value in ("0", "false", "No", "OFF"):
+            monkeypatch.setenv("SOME_FLAG", value)
+            assert get_env_flag("SOME_FLAG") is False
+
 
 class TestGetRandomGreeting:
     """Tests for get_random_greeting function."""
@@ -0,0 +1,134 @@
+"""Tests for lambda/validation.py."""
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from validation import RateValidator, RollingWindow
+
+RATES = {"USD": 120.0, "EUR": 130.0, "MLC": 118.0}
+
+
+def warm_validator(**kwargs):
+    validator = RateValidator(**kwargs)
+    for usd in (119.0, 120.0, 121.0, 120.0, 119.5):
+        assert validator.accept(dict(RATES, USD=usd))
+    return validator
+
+
+class TestRollingWindow:
+    """Tests for RollingWindow."""
+
+    def test_median_and_mad(self):
+        """Test the statistics over the window."""
+        window = RollingWindow(size=5)
+        for value in (1, 2, 3, 4, 100):
+            window.add(value)
+
+        assert window.median() == 3
+        assert window.mad() == 1
+
+    def test_even_number_of_values(self):
+        """Test the median of an even-sized window."""
+        window = RollingWindow(size=4)
+        for value in (4, 1, 3, 2):
+            window.add(value)
+
+        assert window.median() == 2.5
+
+    def test_oldest_value_is_dropped(self):
+        """Test the window never grows beyond its size."""
+        window = RollingWindow(size=3)
+        for value in (50, 1, 2, 3):
+            window.add(value)
+
+        assert len(window) == 3
+        assert window.median() == 2
+
+
+class TestRateValidator:
+    """Tests for RateValidator."""
+
+    def test_accepts_normal_moves(self):
+        """Test small market moves pass."""
+        validator = warm_validator()
+
+        assert validator.accept(dict(RATES, USD=123.0)) is True
+
+    @pytest.mark.parametrize(
+        "rates",
+        [
+            dict(RATES, USD=0),
+            dict(RATES, EUR=-130.0),
+            dict(RATES, MLC=float("nan")),
+            dict(RATES, USD="120"),
+            {"USD": 120.0, "EUR": 130.0},
+        ],
+        ids=["zero", "negative", "nan", "string", "missing"],
+    )
+    def test_rejects_invalid_values(self, rates):
+        """Test impossible values are rejected even on a cold validator."""
+        assert RateValidator().accept(rates) is False
+
+    @pytest.mark.parametrize(
+        "rates",
+        [
+            dict(RATES, EUR=1300.0),
+            {"USD": 400.0, "EUR": 440.0, "MLC": 3800.0},
+            {"USD": 400.0, "EUR": 440.0, "MLC": 38.0},
+        ],
+        ids=["eur", "mlc-high", "mlc-low"],
+    )
+    def test_rejects_implausible_ratios(self, rates):
+        """Test the cross-currency checks on a cold validator."""
+        assert RateValidator().accept(rates) is False
+
+    def test_rejects_outlier(self):
+        """Test an outlier is quarantined and not added to the window."""
+        validator = warm_validator()
+
+        assert validator.accept(dict(RATES, MLC=170.0)) is False
+        assert list(validator.quarantined) == [dict(RATES, MLC=170.0)]
+        assert validator.windows["MLC"].median() == 118.0
+
+    def test_seeded_validator_checks_the_first_snapshot(self):
+        """Test a fresh validator starts from the recorded snapshots."""
+        recorded = [RATES, dict(RATES, USD=121.0), {"USD": 0}, dict(RATES, USD=119.0)]
+        seed = Mock(return_value=recorded)
+        validator = RateValidator(seed=seed)
+
+        assert validator.accept(dict(RATES, MLC=170.0)) is False
+        assert validator.accept(dict(RATES, USD=122.0)) is True
+        assert len(validator.windows["USD"]) == 4
+        seed.assert_called_once_with()
+
+    def test_failing_seed_starts_empty(self):
+        """Test an unreadable history leaves the windows empty."""
+        validator = RateValidator(seed=Mock(side_effect=OSError("disk full")))
+
+        assert validator.accept(dict(RATES, MLC=170.0)) is True
+
+    def test_isolated_outliers_do_not_shift_level(self):
+        """Test disagreeing bad payloads are never accepted."""
+        validator = warm_validator()
+
+        for usd in (1200.0, 12.0, 1200.0, 12.0):
+            assert validator.accept(dict(RATES, USD=usd, EUR=usd * 1.08)) is False
+
+    def test_confirmed_level_shift_is_accepted(self):
+        """Test the validator follows a genuine, sustained market move."""
+        validator = warm_validator(confirm_after=3)
+        moved = {"USD": 150.0, "EUR": 160.0, "MLC": 140.0}
+
+        assert validator.accept(moved) is False
+        assert validator.accept(dict(moved, USD=150.5)) is False
+        assert validator.accept(dict(moved, USD=151.0)) is True
+
+        assert validator.windows["USD"].median() == 151.0
+        assert len(validator.quarantined) == 0
+        assert validator.accept(dict(moved, USD=151.5)) is True
@@ -0,0 +1,139 @@
+"""Tests for lambda/visual.py."""
+
+import sys
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from history import RateHistory
+from persistence import FileSystemObjectStore
+from visual import (
+    APL_TOKEN,
+    DOCUMENT,
+    TREND_COLORS,
+    RatesVisual,
+    render_item,
+    sparkline_path,
+    supports_apl,
+)
+
+TODAY = date(2026, 10, 19)
+RATES = {"USD": 415.0, "EUR": 445.0, "MLC": 201.5}
+
+
+def make_input(apl=None, device=True):
+    interfaces = SimpleNamespace(alexa_presentation_apl=apl)
+    return SimpleNamespace(
+        request_envelope=SimpleNamespace(
+            context=SimpleNamespace(
+                system=SimpleNamespace(
+                    device=(
+                        SimpleNamespace(supported_interfaces=interfaces)
+                        if device
+                        else None
+                    )
+                )
+            )
+        )
+    )
+
+
+class TestSupportsApl:
+    """Tests for supports_apl function."""
+
+    def test_screen_device(self):
+        """Test devices announcing the APL interface get the screen."""
+        assert supports_apl(make_input(apl=object())) is True
+
+    def test_voice_only_device(self):
+        """Test devices without APL, or without a device, are voice only."""
+        assert supports_apl(make_input()) is False
+        assert supports_apl(make_input(device=False)) is False
+
+
+class TestSparklinePath:
+    """Tests for sparkline_path function."""
+
+    def test_values_span_the_box(self):
+        """Test the extremes touch the margins and points are evenly spaced."""
+        path = sparkline_path([410.0, 420.0, 415.0], width=100, height=50, margin=5)
+
+        assert path == "M0,45L50,5L100,25"
+
+    def test_constant_values(self):
+        """Test unchanged rates are drawn through the middle."""
+        assert sparkline_path([410.0, 410.0], width=100, height=50) == "M0,25L100,25"
+
+    def test_too_few_values(self):
+        """Test a single day draws nothing."""
+        assert sparkline_path([410.0]) == ""
+        assert sparkline_path([]) == ""
+
+
+class TestRenderItem:
+    """Tests for render_item function."""
+
+    def test_change_since_previous_day(self):
+        """Test the row shows the rate and its signed change."""
+        item = render_item("USD", [410.0, 412.0, 415.5])
+
+        assert item["label"] == "Dólar"
+        assert item["value"] == "415.5"
+        assert item["change"] == "+3.5"
+        assert item["color"] == TREND_COLORS["up"]
+
+        assert render_item("MLC", [205.0, 201.0])["change"] == "-4"
+        assert render_item("EUR", [445.0])["change"] == "="
+
+
+class TestRatesVisual:
+    """Tests for RatesVisual."""
+
+    def test_trend_ends_with_current_rates(self, tmp_path):
+        """Test sparklines use the recorded days followed by the current rate."""
+        history = RateHistory(FileSystemObjectStore(tmp_path))
+        history.record({"USD": 410.0, "EUR": 440.0}, day=date(2026, 10, 17))
+        history.record({"USD": 412.0, "EUR": 445.0, "MLC": 205.0}, day=TODAY)
+        visual = RatesVisual(history, days=3)
+
+        directive = visual.directive(RATES, day=TODAY)
+
+        assert directive.token == APL_TOKEN
+        assert directive.document is DOCUMENT
+        rates = directive.datasources["rates"]
+        assert rates["subtitle"] == "19 de octubre de 2026"
+        items = {item["code"]: item for item in rates["items"]}
+        assert items["USD"]["change"] == "+5"
+        assert items["USD"]["sparkline"] == "M0,45L160,3"
+        # Today's record is replaced by the current rates; MLC has no past
+        assert items["MLC"]["change"] == "="
+        assert items["MLC"]["sparkline"] == ""
+
+    def test_rendered_once_per_snapshot(self):
+        """Test screen devices share one rendering until the rates change."""
+        history = Mock()
+        history.recent.return_value = []
+        visual = RatesVisual(history)
+
+        first = visual.directive(RATES, day=TODAY)
+        assert visual.directive(dict(RATES), day=TODAY) is first
+        assert history.recent.call_count == 1
+
+        changed = visual.directive(dict(RATES, USD=416.0), day=TODAY)
+        assert changed is not first
+        assert visual.directive(dict(RATES, USD=416.0), day=date(2026, 10, 20))
+        assert history.recent.call_count == 3
+
+    def test_unreadable_history(self):
+        """Test the rates are still shown when the trend cannot be read."""
+        history = Mock()
+        history.recent.side_effect = OSError("disk full")
+
+        items = RatesVisual(history).render(RATES, TODAY)["rates"]["items"]
+
+        assert [item["value"] for item in items] == ["415", "445", "201.5"]
+        assert all(item["sparkline"] == "" for item in items)
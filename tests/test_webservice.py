@@ -0,0 +1,129 @@
+"""Tests for lambda/webservice.py."""
+
+import io
+import json
+import sys
+from pathlib import Path
+
+# Add lambda directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "lambda"))
+
+from lambda_function import sb
+from webservice import SkillWebService, create_app, get_request_headers
+
+ENVELOPES_DIR = Path(__file__).parent / "envelopes"
+
+
+def call(app, method="POST", body=b"", headers=None):
+    environ = {
+        "REQUEST_METHOD": method,
+        "CONTENT_LENGTH": str(len(body)),
+        "CONTENT_TYPE": "application/json",
+        "wsgi.input": io.BytesIO(body),
+    }
+    for name, value in (headers or {}).items():
+        environ["HTTP_" + name.upper().replace("-", "_")] = value
+
+    captured = {}
+
+    def start_response(status, response_headers):
+        captured["status"] = status
+        captured["headers"] = dict(response_headers)
+
+    payload = b"".join(app(environ, start_response))
+    return captured["status"], json.loads(payload)
+
+
+class TestGetRequestHeaders:
+    """Tests for get_request_headers function."""
+
+    def test_converts_wsgi_names(self):
+        """Test WSGI header keys are turned back into HTTP header names."""
+        headers = get_request_headers(
+            {
+                "HTTP_SIGNATURE_256": "sig",
+                "HTTP_SIGNATURECERTCHAINURL": "https://s3.amazonaws.com/echo.api/x",
+                "CONTENT_TYPE": "application/json",
+                "REQUEST_METHOD": "POST",
+            }
+        )
+
+        assert headers == {
+            "Signature-256": "sig",
+            "Signaturecertchainurl": "https://s3.amazonaws.com/echo.api/x",
+            "Content-Type": "application/json",
+        }
+
+
+class TestSkillWebService:
+    """Tests for SkillWebService."""
+
+    def test_dispatches_to_skill_handlers(self, tmp_path, monkeypatch):
+        """Test a POSTed envelope is handled by the Lambda skill handlers."""
+        monkeypatch.setattr(sb.persistence_adapter, "directory", tmp_path)
+        app = SkillWebService(
+            sb.create(), verify_signature=False, verify_timestamp=False
+        )
+        body = (ENVELOPES_DIR / "launch.json").read_bytes()
+
+        status, payload = call(app, body=body)
+
+        assert status == "200 OK"
+        assert payload["response"]["outputSpeech"]["ssml"] == (
+            "<speak>Qué bola asere? Dime que quieres saber?</speak>"
+        )
+
+    def test_rejects_unsigned_requests(self):
+        """Test signature verification is on by default."""
+        app = SkillWebService(sb.create(), verify_timestamp=False)
+        body = (ENVELOPES_DIR / "launch.json").read_bytes()
+
+        status, payload = call(app, body=body)
+
+        assert status == "400 Bad Request"
+        assert payload == {"error": "Invalid request"}
+
+    def test_rejects_stale_timestamp(self):
+        """Test old recorded envelopes fail timestamp verification."""
+        app = SkillWebService(sb.create(), verify_signature=False)
+        body = (ENVELOPES_DIR / "launch.json").read_bytes()
+
+        status, _ = call(app, body=body)
+
+        assert status == "400 Bad Request"
+
+    def test_health_check(self):
+        """Test GET answers as a health check."""
+        app = SkillWebService(sb.create())
+
+        assert call(app, method="GET") == ("200 OK", {"status": "ok"})
+
+    def test_method_not_allowed(self):
+        """Test other methods are rejected."""
+        app = SkillWebService(sb.create())
+
+        status, _ = call(app, method="PUT")
+
+        assert status == "405 Method Not Allowed"
+
+
+class TestCreateApp:
+    """Tests for create_app function."""
+
+    def test_verification_toggles(self, monkeypatch):
+        """Test the environment can switch verification off for local tests."""
+        monkeypatch.setenv("VERIFY_SIGNATURE", "false")
+        monkeypatch.setenv("VERIFY_TIMESTAMP", "false")
+
+        app = create_app()
+
+        assert app.skill_handler._verifiers == []
+
+    def test_verification_on_by_default(self, monkeypatch):
+        """Test both verifiers are enabled without configuration."""
+        monkeypatch.delenv("VERIFY_SIGNATURE", raising=False)
+        monkeypatch.delenv("VERIFY_TIMESTAMP", raising=False)
+
+        app = create_app()
+
+        assert len(app.skill_handler._verifiers) == 2